@@ -0,0 +1,114 @@
+# api_response.py
+import gzip
+import logging
+from flask import request
+from flask.json.provider import DefaultJSONProvider
+
+# Optional accelerators; the stdlib is used when they are missing
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# --------------------------
+# Configuration
+# --------------------------
+COMPRESS_MIN_BYTES = 1024
+COMPRESSIBLE_MIMETYPES = {'application/json', 'text/plain', 'text/html', 'text/csv', 'text/css',
+                          'application/javascript', 'text/javascript'}
+GZIP_LEVEL = 3      # Most of level 6's ratio at well under half the CPU
+BROTLI_QUALITY = 4  # Fast setting suited to dynamic responses
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider that serializes with orjson when it is installed.
+    Output matches the default provider (sorted keys, Flask's handling of
+    dates/decimals/UUIDs); anything orjson rejects falls back to the stdlib.
+    """
+
+    def _orjson_options(self, indent=False):
+        options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps_bytes(self, obj, indent=False):
+        if orjson is not None:
+            try:
+                return orjson.dumps(obj, default=self.default, option=self._orjson_options(indent))
+            except TypeError:
+                pass  # e.g. integers beyond 64 bits
+        if indent:
+            return super().dumps(obj, indent=2).encode('utf-8')
+        return super().dumps(obj, separators=(',', ':')).encode('utf-8')
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(self.dumps_bytes(obj, indent) + b'\n', mimetype=self.mimetype)
+
+
+def choose_encoding(accept_encoding):
+    """Best supported content coding from an Accept-Encoding header, or None"""
+    if brotli is not None and accept_encoding['br']:
+        return 'br'
+    if accept_encoding['gzip']:
+        return 'gzip'
+    return None
+
+
+def compress_body(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL)
+
+
+def compress_response(response):
+    """
+    after_request hook: gzip/brotli-compress buffered responses above the
+    size threshold. Streams (SSE, send_file) and partial responses are
+    left alone.
+    """
+    if (response.direct_passthrough or response.is_streamed
+            or response.status_code != 200
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    encoding = choose_encoding(request.accept_encodings)
+    if encoding is None:
+        return response
+
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_BYTES:
+        return response
+
+    try:
+        compressed = compress_body(data, encoding)
+    except Exception as e:
+        logging.warning(f"Response compression failed: {e}")
+        return response
+
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = encoding
+    # The compressed body is a different representation of the same content
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def init_app(app):
+    """Install the fast JSON provider and response compression"""
+    app.json_provider_class = FastJSONProvider
+    app.json = FastJSONProvider(app)
+    app.after_request(compress_response)
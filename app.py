@@ -1,34 +1,89 @@
 # app.py
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, request, jsonify, send_file, Response, stream_with_context, g
 from flask_cors import CORS
 import os
 import json
-import glob
 import logging
-import hashlib
+import base64
 from datetime import datetime, timedelta, timezone
 from werkzeug.utils import secure_filename
 import subprocess
 import sys
+import queue
+import time
+from collections import deque
 from googleapiclient.errors import HttpError
+from calendar_availability import (
+    compute_available_slots, parse_calendar_time, DEFAULT_HORIZON_DAYS, DEFAULT_DURATION_MINUTES,
+    DEFAULT_GRANULARITY_MINUTES, DEFAULT_WORK_HOURS
+)
+from panel_scheduler import PanelScheduler, DEFAULT_PANEL_HORIZON_DAYS
+from calendar_cache import calendar_cache
+from candidate_store import candidate_repository
+from candidate_snapshot import boot_repository, save_repository_snapshot
+from candidate_search import search_index, sort_index, key_index, SORT_KEYS
+from candidate_stats import candidate_stats, folder_counter
+from candidate_ranking import ranking_index, DEFAULT_TOP_K
+from job_queue import job_queue, FAILED as JOB_FAILED
+from progress_events import progress_bus, parse_progress_line, PROGRESS_ENV
+from resume_text_cache import resume_text_cache
+from interview_store import interview_store
+from metrics import registry as metrics_registry, MetricsRegistry, parse_metrics_line, item_failures, write_run_report
+from pipeline_dag import PipelineScheduler, PIPELINE_DAG
+from tracing import install_trace_logging, span, new_trace_id, trace_index, read_trace, summarize_trace
+from profiling import ProfileSession, profiled_call, parse_profile_line, is_enabled, PROFILE_ENV, API_PROFILE_ENV, PROFILE_HEADER
+import api_response
+from near_duplicates import load_near_duplicates
+from resume_uploads import UploadRequest, UploadHashIndex, save_upload, MAX_FILE_SIZE, MAX_UPLOAD_FILES
 
 # --------------------------
 # Flask App Setup
 # --------------------------
 app = Flask(__name__)
+app.request_class = UploadRequest  # Uploads are hashed while they are received
 CORS(app)  # Enable CORS for frontend
+api_response.init_app(app)  # orjson serialization + gzip/brotli compression
 
 # Configure upload settings
 UPLOAD_FOLDER = 'resumes'
 ALLOWED_EXTENSIONS = {'pdf', 'docx', 'doc'}
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+app.config['MAX_CONTENT_LENGTH'] = 512 * 1024 * 1024  # Whole request (bulk uploads); MAX_FILE_SIZE applies per file
+MAX_AVAILABILITY_DAYS = 90
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+STAGE_OUTPUT_TAIL_LINES = 200   # Subprocess output lines kept for the stage result
+SSE_HEARTBEAT_SECONDS = 15
+RESUME_CACHE_SECONDS = 300      # Browsers may reuse a resume this long before revalidating
+
+# Background job types. They all read and write the pipeline's folders and
+# tracking files, so they share one slot: one job at a time, the rest queue
+JOB_PIPELINE = 'pipeline'   # Full runs and single stages
+JOB_GMAIL = 'gmail_fetch'
+JOB_PARSE = 'parse_resumes'
+JOB_AI_PARSE = 'ai_parse'
+JOB_ENRICH = 'enrich_candidates'
+JOB_SCHEDULE = 'schedule_interviews'
+JOB_STAGE_SLOT = 'pipeline_stages'
+job_queue.share_limit(JOB_STAGE_SLOT, JOB_PIPELINE, JOB_GMAIL, JOB_PARSE, JOB_AI_PARSE, JOB_ENRICH, JOB_SCHEDULE)
 
 # Setup logging
 logging.basicConfig(
     format="%(asctime)s [%(levelname)s] %(message)s",
     level=logging.INFO
 )
+install_trace_logging()  # JSON-lines copy of every record, with trace IDs
+
+# Warm start from the last snapshot; the first refresh re-reads only files changed since
+boot_repository(candidate_repository)
+
+# Keep the search and sort indexes in step with the candidate repository
+candidate_repository.add_listener(search_index.on_change)
+candidate_repository.add_listener(sort_index.on_change)
+candidate_repository.add_listener(candidate_stats.on_change)
+candidate_repository.add_listener(key_index.on_change)
+candidate_repository.add_listener(ranking_index.on_change)
+ranking_index.warm_in_background()  # Reads every resume's text; don't leave it to the first query
 
 # --------------------------
 # Import Our Modules (with error handling)
@@ -50,76 +105,181 @@ except ImportError as e:
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-def calculate_file_hash(file_path):
-    """Calculate MD5 hash of file content for duplicate detection"""
-    hasher = hashlib.md5()
-    with open(file_path, 'rb') as f:
-        buf = f.read()
-        hasher.update(buf)
-    return hasher.hexdigest()
+def is_json_file(filename):
+    return filename.endswith('.json')
+
+def is_interview_record(filename):
+    return filename.endswith('.json') and not filename.startswith('summary_')
+
+# Content hashes of stored resumes for upload duplicate detection
+upload_hash_index = UploadHashIndex(UPLOAD_FOLDER, accept=allowed_file)
+
+def send_resume(filepath, download_name, mimetype, as_attachment):
+    """
+    send_file with conditional handling: Range requests (206), and
+    If-None-Match / If-Modified-Since (304) against a strong ETag taken
+    from the file's content hash.
+    """
+    response = send_file(
+        os.path.abspath(filepath),  # Relative paths would resolve against the app root, not the cwd
+        mimetype=mimetype,
+        as_attachment=as_attachment,
+        download_name=download_name,
+        conditional=True,
+        etag=resume_text_cache.digest(filepath),
+        last_modified=os.path.getmtime(filepath)
+    )
+    # Resumes are personal data: never cache in shared proxies
+    response.headers['Cache-Control'] = f'private, max-age={RESUME_CACHE_SECONDS}, must-revalidate'
+    return response
+
+def interview_start_time(interview):
+    """Aware start datetime of an interview record (datetime.min if missing)"""
+    try:
+        return parse_calendar_time(interview['start_time'])
+    except (KeyError, TypeError, ValueError):
+        return datetime.min.replace(tzinfo=timezone.utc)
 
 def get_all_candidates():
-    """Get all candidates from enriched_json folder"""
-    candidates = []
-    enriched_folder = "enriched_json"
-    parsed_folder = "parsed_json"
-    
-    # First try enriched folder, fallback to parsed
-    folder = enriched_folder if os.path.exists(enriched_folder) else parsed_folder
-    
-    if not os.path.exists(folder):
-        return candidates
-    
-    for filename in os.listdir(folder):
-        if filename.endswith('.json'):
-            try:
-                with open(os.path.join(folder, filename), 'r', encoding='utf-8') as f:
-                    candidate = json.load(f)
-                    candidate['id'] = filename.replace('.json', '')
-                    candidate['filename'] = filename
-                    
-                    # Try to find matching resume file
-                    base_name = filename.replace('.json', '')
-                    for ext in ['pdf', 'docx', 'doc']:
-                        resume_path = os.path.join(UPLOAD_FOLDER, f"{base_name}.{ext}")
-                        if os.path.exists(resume_path):
-                            candidate['resume_filename'] = f"{base_name}.{ext}"
-                            break
-                    
-                    candidates.append(candidate)
-            except Exception as e:
-                logging.error(f"Error loading candidate {filename}: {e}")
-    
-    return candidates
+    """Get all candidates from the shared in-memory repository"""
+    return candidate_repository.all()
 
 def find_resume_file(candidate_id):
     """Find the resume file for a given candidate ID"""
-    for ext in ['pdf', 'docx', 'doc']:
-        filepath = os.path.join(UPLOAD_FOLDER, f"{candidate_id}.{ext}")
-        if os.path.exists(filepath):
-            return f"{candidate_id}.{ext}"
-    return None
-
-def run_pipeline_stage(script_name, description):
-    """Run a pipeline stage with proper error handling"""
+    return candidate_repository.resume_for(candidate_id)
+
+def encode_cursor(entry, sort):
+    """Opaque pagination cursor for the last (key, candidate_id) entry of a page"""
+    payload = json.dumps([sort, entry[0], entry[1]], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+def decode_cursor(cursor, sort):
+    """Decode a cursor produced by encode_cursor for the same sort order"""
+    try:
+        cursor_sort, key, candidate_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if cursor_sort != sort:
+        raise ValueError('Cursor was issued for a different sort order')
+    return (key, candidate_id)
+
+def project_candidate(candidate, fields):
+    """Keep only the requested fields (plus id) of a candidate"""
+    projected = {'id': candidate.get('id')}
+    for field in fields:
+        if field in candidate:
+            projected[field] = candidate[field]
+    return projected
+
+def wants_wait():
+    """Whether the client asked to block until a job finishes instead of polling"""
+    if request.args.get('wait', '').lower() in ('1', 'true', 'yes'):
+        return True
+    data = request.get_json(silent=True) or {}
+    return data.get('wait') is True
+
+def profile_requested():
+    """Whether this request (or the whole API, via API_PROFILE) is profiled"""
+    return is_enabled(request.headers.get(PROFILE_HEADER)) or is_enabled(os.environ.get(API_PROFILE_ENV))
+
+def profile_job(job_type, work):
+    """Wrap an in-process job so it is profiled in the worker thread that runs it"""
+    def run(job, *args):
+        result, summary = profiled_call(f'job_{job_type}', work, job, *args)
+        if isinstance(result, dict):
+            result['profile'] = summary
+        return result
+    return run
+
+def dispatch_job(job_type, work, *args):
+    """
+    Run `work(job, *args)` through the job queue so concurrency limits
+    always apply. The job ID comes back immediately (202) and the client
+    polls /api/jobs/<id>; scripts that pass `wait=true` get the result
+    in the response instead.
+    """
+    if job_type != JOB_PIPELINE and profile_requested():
+        # Pipeline jobs profile their stage subprocesses instead
+        work = profile_job(job_type, work)
+    job = job_queue.submit(job_type, work, *args)
+    if wants_wait():
+        job.wait()
+        if job.status == JOB_FAILED:
+            return jsonify({'success': False, 'error': job.error}), 500
+        return jsonify(job.result)
+    
+    return jsonify({
+        'success': True,
+        'job_id': job.job_id,
+        'status': job.status,
+        'status_url': f'/api/jobs/{job.job_id}'
+    }), 202
+
+def run_pipeline_stage(script_name, description, run_metrics=None, profile=False):
+    """
+    Run a pipeline stage with proper error handling.
+    Output is read line by line while the stage runs: progress events are
+    relayed to the progress bus, the stage's metrics snapshot is merged
+    into the process registry (and `run_metrics`, if given), everything
+    else is kept as a bounded tail. With `profile` (or PIPELINE_PROFILE
+    set for the server) the stage's profile summary is returned too.
+    `item_failures` counts items the stage reported it could not process.
+    """
     logging.info(f"🚀 Starting: {description}")
     
+    env = dict(os.environ, PYTHONUNBUFFERED='1')
+    env[PROGRESS_ENV] = 'stdout'
+    if profile:
+        env[PROFILE_ENV] = '1'
+    started = time.perf_counter()
+    profile_summary = None
+    failures = 0
     try:
-        result = subprocess.run([sys.executable, script_name], 
-                              capture_output=True, text=True, check=True)
-        logging.info(f"✅ Completed: {description}")
-        return {
-            'success': True,
-            'description': description,
-            'output': result.stdout[-1000:]  # Last 1000 chars
-        }
-    except subprocess.CalledProcessError as e:
-        logging.error(f"❌ Failed: {description}")
-        return {
-            'success': False,
-            'description': description,
-            'error': e.stderr
-        }
+        tail = deque(maxlen=STAGE_OUTPUT_TAIL_LINES)
+        with subprocess.Popen([sys.executable, script_name], stdout=subprocess.PIPE,
+                              stderr=subprocess.STDOUT, text=True, env=env) as process:
+            for line in process.stdout:
+                event = parse_progress_line(line)
+                if event is not None:
+                    progress_bus.publish(event)
+                    continue
+                snapshot = parse_metrics_line(line)
+                if snapshot is not None:
+                    metrics_registry.merge(snapshot)
+                    if run_metrics is not None:
+                        run_metrics.merge(snapshot)
+                    failures += item_failures(snapshot)
+                    continue
+                summary = parse_profile_line(line)
+                if summary is not None:
+                    profile_summary = summary
+                    continue
+                tail.append(line)
+            returncode = process.wait()
+
+        output = ''.join(tail)
+        seconds = round(time.perf_counter() - started, 3)
+        STAGE_SECONDS.observe(seconds, stage=script_name, status='ok' if returncode == 0 else 'failed')
+        if returncode != 0:
+            logging.error(f"❌ Failed: {description}")
+            result = {
+                'success': False,
+                'description': description,
+                'seconds': seconds,
+                'error': output[-1000:]
+            }
+        else:
+            logging.info(f"✅ Completed: {description}")
+            result = {
+                'success': True,
+                'description': description,
+                'seconds': seconds,
+                'output': output[-1000:]  # Last 1000 chars
+            }
+        result['item_failures'] = failures
+        if profile_summary is not None:
+            result['profile'] = profile_summary
+        return result
     except Exception as e:
         logging.error(f"❌ Unexpected error in {description}: {e}")
         return {
@@ -128,6 +288,54 @@ def run_pipeline_stage(script_name, description):
             'error': str(e)
         }
 
+# --------------------------
+# Request metrics
+# --------------------------
+HTTP_LATENCY = metrics_registry.histogram(
+    'http_request_seconds', 'API request latency', ['method', 'endpoint', 'status'])
+STAGE_SECONDS = metrics_registry.histogram(
+    'pipeline_stage_seconds', 'Pipeline stage subprocess duration', ['stage', 'status'],
+    buckets=(1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600))
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_latency(response):
+    started = g.pop('request_started', None)
+    if started is not None:
+        # The URL rule, not the raw path, keeps label cardinality bounded
+        endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+        HTTP_LATENCY.observe(time.perf_counter() - started, method=request.method,
+                             endpoint=endpoint, status=response.status_code)
+    return response
+
+# --------------------------
+# Opt-in profiling
+# --------------------------
+@app.before_request
+def start_request_profile():
+    if profile_requested():
+        g.profile_session = ProfileSession(f'route_{request.endpoint or "unmatched"}').start()
+
+@app.after_request
+def finish_request_profile(response):
+    session = g.pop('profile_session', None)
+    if session is not None:
+        summary = session.stop()
+        response.headers['X-Profile-Peak-Memory'] = str(summary['peak_memory_bytes'])
+        if 'stats_file' in summary:
+            response.headers['X-Profile-File'] = summary['stats_file']
+    return response
+
+@app.teardown_request
+def discard_request_profile(exc):
+    # after_request is skipped when a request fails; never leave a profiler running
+    session = g.pop('profile_session', None)
+    if session is not None:
+        session.stop()
+
 # --------------------------
 # API Routes
 # --------------------------
@@ -146,50 +354,114 @@ def health_check():
 # Pipeline Control Routes
 # --------------------------
 
+def run_pipeline_job(job, profile=False):
+    """
+    Job: run the pipeline DAG. Independent stages run concurrently, stages
+    whose inputs are unchanged are skipped, and a failed stage doesn't stop
+    the stages below it (see PipelineScheduler).
+    """
+    start_time = datetime.now()
+    job.update(current=0, total=len(PIPELINE_DAG))
+    
+    run_metrics = MetricsRegistry()
+    finished = []
+    
+    def run_stage(script, description):
+        job.update(message=description)
+        return run_pipeline_stage(script, description, run_metrics, profile)
+    
+    def stage_finished(result):
+        finished.append(result)
+        job.update(current=len(finished))
+    
+    scheduler = PipelineScheduler(run_stage, on_result=stage_finished)
+    results, schedule = scheduler.run()
+    
+    # Summary
+    success_count = sum(1 for r in results if r['success'])
+    end_time = datetime.now()
+    duration = end_time - start_time
+    
+    # Output tails stay in the API response, not the report
+    stages = [{key: value for key, value in r.items() if key not in ('output', 'error')}
+              for r in results]
+    report_file = write_run_report(stages, start_time, end_time, run_metrics, schedule=schedule)
+    
+    # Snapshot the refreshed corpus so the next API start is warm
+    candidate_repository.refresh(force=True)
+    try:
+        save_repository_snapshot(candidate_repository)
+    except OSError as e:
+        logging.warning(f"⚠️ Could not write candidate snapshot: {e}")
+    
+    return {
+        'success': True,
+        'results': results,
+        'report_file': report_file,
+        'summary': {
+            'completed_stages': success_count,
+            'total_stages': len(results),
+            'skipped_stages': len(schedule['skipped']),
+            'critical_path': schedule['critical_path'],
+            'duration_seconds': duration.total_seconds(),
+            'start_time': start_time.isoformat(),
+            'end_time': end_time.isoformat()
+        }
+    }
+
 @app.route('/api/pipeline/run', methods=['POST'])
 def run_complete_pipeline():
     """Run the complete resume processing pipeline"""
     try:
-        start_time = datetime.now()
-        
-        # Pipeline stages
-        stages = [
-            ("fetch_resumes.py", "1. Fetch resumes from Gmail"),
-            ("parse_resumes.py", "2. Parse resume files to text"),
-            ("gemini_parser.py", "3. Extract structured data with Gemini"),
-            ("linkedin_enricher.py", "4. Enrich candidate data"),
-            ("schedule_interviews.py", "5. Schedule interviews")
-        ]
-        
-        results = []
-        for script, description in stages:
-            result = run_pipeline_stage(script, description)
-            results.append(result)
-            
-            if not result['success']:
-                break  # Stop pipeline on failure
-        
-        # Summary
-        success_count = sum(1 for r in results if r['success'])
-        end_time = datetime.now()
-        duration = end_time - start_time
-        
-        return jsonify({
-            'success': True,
-            'results': results,
-            'summary': {
-                'completed_stages': success_count,
-                'total_stages': len(stages),
-                'duration_seconds': duration.total_seconds(),
-                'start_time': start_time.isoformat(),
-                'end_time': end_time.isoformat()
-            }
-        })
-        
+        return dispatch_job(JOB_PIPELINE, run_pipeline_job, profile_requested())
     except Exception as e:
         logging.error(f"Error running pipeline: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Counters and latency histograms in Prometheus text format"""
+    return Response(metrics_registry.render_prometheus(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/traces/<trace_id>', methods=['GET'])
+def get_trace(trace_id):
+    """Per-stage spans for one resume, with end-to-end latency and the slowest stage"""
+    spans = read_trace(trace_id)
+    if not spans:
+        return jsonify({'success': False, 'error': 'Trace not found'}), 404
+    return jsonify({
+        'success': True,
+        'trace_id': trace_id,
+        'summary': summarize_trace(spans),
+        'spans': spans
+    })
+
+@app.route('/api/pipeline/events', methods=['GET'])
+def pipeline_events():
+    """Live pipeline progress as Server-Sent Events"""
+    subscription = progress_bus.subscribe()
+
+    def generate():
+        try:
+            yield f"event: snapshot\ndata: {json.dumps(progress_bus.snapshot(), default=str)}\n\n"
+            while True:
+                try:
+                    event = subscription.get(timeout=SSE_HEARTBEAT_SECONDS)
+                except queue.Empty:
+                    yield ": heartbeat\n\n"
+                    continue
+                yield f"event: progress\ndata: {json.dumps(event, default=str)}\n\n"
+        finally:
+            progress_bus.unsubscribe(subscription)
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/api/pipeline/progress', methods=['GET'])
+def pipeline_progress():
+    """Progress counters and throughput per stage"""
+    return jsonify(progress_bus.snapshot())
+
 @app.route('/api/pipeline/stages', methods=['GET'])
 def get_pipeline_stages():
     """Get available pipeline stages"""
@@ -231,6 +503,16 @@ def get_pipeline_stages():
         'stages': stages
     })
 
+def run_stage_job(job, script, description, profile=False):
+    """Job: run a single pipeline stage"""
+    job.update(current=0, total=1, message=description)
+    result = run_pipeline_stage(script, description, profile=profile)
+    job.update(current=1)
+    return {
+        'success': result['success'],
+        'result': result
+    }
+
 @app.route('/api/pipeline/run-stage', methods=['POST'])
 def run_single_stage():
     """Run a single pipeline stage"""
@@ -253,12 +535,7 @@ def run_single_stage():
             }), 400
         
         script, description = stage_map[stage_id]
-        result = run_pipeline_stage(script, description)
-        
-        return jsonify({
-            'success': result['success'],
-            'result': result
-        })
+        return dispatch_job(JOB_PIPELINE, run_stage_job, script, description, profile_requested())
         
     except Exception as e:
         logging.error(f"Error running pipeline stage: {e}")
@@ -268,6 +545,34 @@ def run_single_stage():
 # Gmail Integration Routes
 # --------------------------
 
+def gmail_fetch_job(job, query):
+    """Job: fetch matching emails and download their resume attachments"""
+    job.update(message='Authenticating with Gmail')
+    logging.info("Authenticating with Gmail...")
+    service = authenticate_gmail()
+    
+    job.update(message=f'Fetching emails with query: {query}')
+    logging.info(f"Fetching emails with query: {query}")
+    emails = fetch_resume_emails(service, query)
+    
+    if not emails:
+        return {
+            'success': True,
+            'message': 'No new emails found with attachments',
+            'count': 0
+        }
+    
+    job.update(total=len(emails), message='Downloading attachments')
+    logging.info("Downloading attachments...")
+    results = download_attachments(service, emails)
+    candidate_repository.invalidate()
+    
+    return {
+        'success': True,
+        'message': f'Successfully processed {len(emails)} emails',
+        'results': results
+    }
+
 @app.route('/api/gmail/fetch', methods=['POST'])
 def fetch_from_gmail():
     """Fetch resumes from Gmail"""
@@ -277,28 +582,7 @@ def fetch_from_gmail():
     try:
         data = request.json or {}
         query = data.get('query', 'has:attachment')
-        
-        logging.info("Authenticating with Gmail...")
-        service = authenticate_gmail()
-        
-        logging.info(f"Fetching emails with query: {query}")
-        emails = fetch_resume_emails(service, query)
-        
-        if not emails:
-            return jsonify({
-                'success': True,
-                'message': 'No new emails found with attachments',
-                'count': 0
-            })
-        
-        logging.info("Downloading attachments...")
-        results = download_attachments(service, emails)
-        
-        return jsonify({
-            'success': True,
-            'message': f'Successfully processed {len(emails)} emails',
-            'results': results
-        })
+        return dispatch_job(JOB_GMAIL, gmail_fetch_job, query)
     except Exception as e:
         logging.error(f"Error fetching from Gmail: {e}")
         return jsonify({
@@ -312,60 +596,74 @@ def fetch_from_gmail():
 
 @app.route('/api/resumes/upload', methods=['POST'])
 def upload_resume():
-    """Upload a resume file with duplicate detection"""
+    """
+    Upload resume files with duplicate detection.
+    A single `file` part keeps the original response; several files (in
+    `files` and/or repeated `file` parts) return per-file results.
+    """
     try:
-        if 'file' not in request.files:
+        files = request.files.getlist('file') + request.files.getlist('files')
+        if not files:
             return jsonify({'success': False, 'error': 'No file provided'}), 400
+        if len(files) > MAX_UPLOAD_FILES:
+            return jsonify({'success': False, 'error': f'At most {MAX_UPLOAD_FILES} files per upload'}), 400
         
-        file = request.files['file']
-        
-        if file.filename == '':
-            return jsonify({'success': False, 'error': 'No file selected'}), 400
+        # Create folder if it doesn't exist
+        os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
         
-        if file and allowed_file(file.filename):
-            filename = secure_filename(file.filename)
-            filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-            
-            # Create folder if it doesn't exist
-            os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
-            
-            # Check for duplicate file content
-            file_data = file.read()
-            file_hash = hashlib.md5(file_data).hexdigest()
-            
-            # Check existing files for duplicates
-            existing_hashes = set()
-            if os.path.exists(UPLOAD_FOLDER):
-                for existing_file in os.listdir(UPLOAD_FOLDER):
-                    if allowed_file(existing_file):
-                        existing_path = os.path.join(UPLOAD_FOLDER, existing_file)
-                        try:
-                            existing_hash = calculate_file_hash(existing_path)
-                            existing_hashes.add(existing_hash)
-                        except Exception as e:
-                            logging.warning(f"Could not calculate hash for {existing_file}: {e}")
-            
-            if file_hash in existing_hashes:
+        results = []
+        with upload_hash_index.lock:
+            upload_hash_index.refresh()
+            for file in files:
+                if file.filename == '':
+                    results.append({'filename': '', 'status': 'invalid', 'error': 'No file selected'})
+                elif not allowed_file(file.filename):
+                    results.append({'filename': file.filename, 'status': 'invalid',
+                                    'error': 'Invalid file type. Only PDF and DOCX allowed'})
+                else:
+                    filename = secure_filename(file.filename)
+                    trace_id = new_trace_id()
+                    with span('upload', trace_id, resume=filename) as trace:
+                        result = save_upload(file, filename, upload_hash_index)
+                        trace['status'] = result['status']
+                        if result['status'] == 'uploaded':
+                            # Ingestion: later stages find this resume's trace by its name
+                            result['trace_id'] = trace_index.assign(filename, trace_id, source='upload')
+                    results.append(result)
+        
+        uploaded = sum(1 for r in results if r['status'] == 'uploaded')
+        if uploaded:
+            candidate_repository.invalidate()
+        
+        if len(files) == 1 and 'files' not in request.files:
+            result = results[0]
+            if result['status'] == 'uploaded':
+                return jsonify({
+                    'success': True,
+                    'message': 'File uploaded successfully',
+                    'filename': result['filename'],
+                    'file_hash': result['file_hash'],
+                    'trace_id': result['trace_id']
+                })
+            if result['status'] == 'duplicate':
                 return jsonify({
                     'success': False,
                     'error': 'Duplicate resume file detected'
                 }), 409  # Conflict status code
-            
-            # Save the file
-            file.seek(0)  # Reset file pointer
-            file.save(filepath)
-            
-            return jsonify({
-                'success': True,
-                'message': 'File uploaded successfully',
-                'filename': filename,
-                'file_hash': file_hash
-            })
-        else:
-            return jsonify({
-                'success': False,
-                'error': 'Invalid file type. Only PDF and DOCX allowed'
-            }), 400
+            if result['status'] == 'too_large':
+                return jsonify({
+                    'success': False,
+                    'error': f'File too large (max {MAX_FILE_SIZE // (1024 * 1024)}MB)'
+                }), 413
+            return jsonify({'success': False, 'error': result['error']}), 400
+        
+        return jsonify({
+            'success': uploaded > 0,
+            'uploaded': uploaded,
+            'duplicates': sum(1 for r in results if r['status'] == 'duplicate'),
+            'rejected': sum(1 for r in results if r['status'] in ('invalid', 'too_large')),
+            'results': results
+        })
             
     except Exception as e:
         logging.error(f"Error uploading file: {e}")
@@ -374,37 +672,58 @@ def upload_resume():
 
 @app.route('/api/interviews/schedule-single', methods=['POST'])
 def schedule_single_interview():
-    """Schedule interview for a single candidate"""
+    """Schedule interview for a single candidate, optionally with an interviewer panel"""
     try:
         data = request.json
         
         candidate_id = data.get('candidate_id')
         start_time_str = data.get('start_time')
         duration_minutes = data.get('duration_minutes', 45)
+        interviewers = data.get('interviewers') or []
+        panel_size = data.get('panel_size')
         
-        if not candidate_id or not start_time_str:
+        if not candidate_id or not (start_time_str or interviewers):
             return jsonify({
                 'success': False,
-                'error': 'candidate_id and start_time required'
+                'error': 'candidate_id and start_time (or interviewers) required'
             }), 400
         
         # Get candidate
-        filepath = os.path.join('enriched_json', f"{candidate_id}.json")
-        if not os.path.exists(filepath):
-            filepath = os.path.join('parsed_json', f"{candidate_id}.json")
-        
-        if not os.path.exists(filepath):
+        candidate = candidate_repository.get(candidate_id)
+        if candidate is None:
             return jsonify({'success': False, 'error': 'Candidate not found'}), 404
         
-        with open(filepath, 'r') as f:
-            candidate = json.load(f)
-        
         # Parse start time
-        start_time = datetime.fromisoformat(start_time_str.replace('Z', '+00:00'))
+        start_time = None
+        if start_time_str:
+            start_time = datetime.fromisoformat(start_time_str.replace('Z', '+00:00'))
         
         # Get calendar service and schedule
         service = get_calendar_service()
-        end_time = schedule_interview(service, candidate, start_time, duration_minutes=duration_minutes)
+        panel = None
+        if interviewers:
+            scheduler = PanelScheduler.from_service(
+                service,
+                interviewers,
+                start=start_time or datetime.now(timezone.utc),
+                horizon_days=data.get('horizon_days', DEFAULT_PANEL_HORIZON_DAYS),
+                panel_size=panel_size,
+                duration_minutes=duration_minutes
+            )
+            if start_time:
+                panel = scheduler.panel_at(start_time)
+            else:
+                assignments = scheduler.assign([candidate])
+                if assignments:
+                    _, start_time, _, panel = assignments[0]
+            
+            if not panel:
+                return jsonify({
+                    'success': False,
+                    'error': 'No interviewer panel is free for the requested time'
+                }), 409
+        
+        end_time = schedule_interview(service, candidate, start_time, duration_minutes=duration_minutes, interviewers=panel)
         
         if end_time:
             return jsonify({
@@ -412,7 +731,8 @@ def schedule_single_interview():
                 'message': 'Interview scheduled successfully',
                 'candidate': candidate.get('full_name'),
                 'start_time': start_time.isoformat(),
-                'end_time': end_time.isoformat()
+                'end_time': end_time.isoformat(),
+                'interviewers': panel or []
             })
         else:
             return jsonify({
@@ -465,27 +785,26 @@ def download_resume(filename):
             logging.error(f"File not found: {filepath}")
             return jsonify({'success': False, 'error': f'File not found: {safe_filename}'}), 404
         
-        return send_file(
-            filepath,
-            as_attachment=True,
-            download_name=safe_filename,
-            mimetype='application/octet-stream'
-        )
+        return send_resume(filepath, safe_filename, 'application/octet-stream', as_attachment=True)
     except Exception as e:
         logging.error(f"Error downloading file {filename}: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+def parse_all_resumes_job(job):
+    """Job: extract text from every resume in the upload folder"""
+    job.update(message='Parsing resumes')
+    results = parse_resumes_module()
+    return {
+        'success': True,
+        'message': 'Resume parsing completed',
+        'results': results
+    }
+
 @app.route('/api/resumes/parse-all', methods=['POST'])
 def parse_all_resumes():
     """Parse all resumes in the upload folder"""
     try:
-        results = parse_resumes_module()
-        
-        return jsonify({
-            'success': True,
-            'message': 'Resume parsing completed',
-            'results': results
-        })
+        return dispatch_job(JOB_PARSE, parse_all_resumes_job)
     except Exception as e:
         logging.error(f"Error parsing all resumes: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -496,72 +815,159 @@ def parse_all_resumes():
 
 @app.route('/api/candidates', methods=['GET'])
 def get_candidates():
-    """Get all candidates with filtering"""
+    """
+    Get candidates with filtering, sorting and pagination.
+    `search` matches name/email/company substrings; `skill` (or a
+    comma-separated `skills` list with `skill_mode=all|any`) matches skill
+    names by word prefix. Filters are answered from the search index.
+
+    Passing `limit`, `cursor`, `sort` or `fields` switches to paged mode:
+    `sort` is one of name, completeness, experience (prefix with `-` for
+    descending), `fields` projects each candidate to the listed keys, and
+    `next_cursor` fetches the following page. Without them every match is
+    returned, as before.
+    """
     try:
-        candidates = get_all_candidates()
+        candidate_repository.refresh()
         
         # Apply filters if provided
         search = request.args.get('search', '').lower()
         skill = request.args.get('skill', '').lower()
+        skills = [s for s in request.args.get('skills', '').lower().split(',') if s.strip()]
+        skill_mode = request.args.get('skill_mode', 'all').lower()
         status = request.args.get('status', '').lower()
         
-        filtered_candidates = candidates
+        if skill:
+            skills.append(skill)
         
+        matched = None
         if search:
-            filtered_candidates = [c for c in filtered_candidates if 
-                                 search in c.get('full_name', '').lower() or
-                                 search in c.get('email', '').lower() or
-                                 search in c.get('current_company', '').lower()]
-        
-        if skill:
-            filtered_candidates = [c for c in filtered_candidates if 
-                                 skill in ' '.join(c.get('skills', [])).lower()]
+            matched = search_index.search(search)
+        if skills:
+            skill_matches = search_index.match_skills(skills, mode=skill_mode)
+            matched = skill_matches if matched is None else matched & skill_matches
         
         if status == 'scheduled':
-            # Get scheduled interviews
-            scheduled_folder = 'scheduled_interviews'
-            scheduled_candidates = set()
-            if os.path.exists(scheduled_folder):
-                for filename in os.listdir(scheduled_folder):
-                    if filename.endswith('.json') and not filename.startswith('summary_'):
-                        candidate_name = filename.split('_')[0]
-                        scheduled_candidates.add(candidate_name.lower())
-            
-            filtered_candidates = [c for c in filtered_candidates if 
-                                 c.get('full_name', '').lower().replace(' ', '_') in scheduled_candidates]
+            # Candidates with a scheduled interview, joined by email or full name
+            emails, names = interview_store.candidate_keys()
+            scheduled_ids = key_index.match(emails, names)
+            matched = scheduled_ids if matched is None else matched & scheduled_ids
+        
+        total = len(candidate_repository)
+        paged = any(arg in request.args for arg in ('limit', 'cursor', 'sort', 'fields'))
+        
+        if not paged:
+            filtered_candidates = get_all_candidates() if matched is None else candidate_repository.get_many(sorted(matched))
+            return jsonify({
+                'success': True,
+                'candidates': filtered_candidates,
+                'count': len(filtered_candidates),
+                'total': total
+            })
+        
+        sort = request.args.get('sort', '-completeness')
+        descending = sort.startswith('-')
+        sort_key = sort.lstrip('-')
+        if sort_key not in SORT_KEYS:
+            return jsonify({'success': False, 'error': f'Invalid sort key: {sort_key}. Use one of {sorted(SORT_KEYS)}'}), 400
+        
+        limit = request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+        if not (1 <= limit <= MAX_PAGE_SIZE):
+            return jsonify({'success': False, 'error': f'limit must be between 1 and {MAX_PAGE_SIZE}'}), 400
+        
+        cursor = request.args.get('cursor')
+        after = None
+        if cursor:
+            try:
+                after = decode_cursor(cursor, sort)
+            except ValueError as e:
+                return jsonify({'success': False, 'error': str(e)}), 400
+        
+        fields = [f.strip() for f in request.args.get('fields', '').split(',') if f.strip()]
+        
+        candidate_ids, last_entry = sort_index.page(sort_key, descending, after, limit, matched)
+        page = candidate_repository.get_many(candidate_ids)
+        if fields:
+            page = [project_candidate(c, fields) for c in page]
         
         return jsonify({
             'success': True,
-            'candidates': filtered_candidates,
-            'count': len(filtered_candidates),
-            'total': len(candidates)
+            'candidates': page,
+            'returned': len(page),
+            'count': total if matched is None else len(matched),
+            'total': total,
+            'sort': sort,
+            'limit': limit,
+            'next_cursor': encode_cursor(last_entry, sort) if last_entry else None
         })
     except Exception as e:
         logging.error(f"Error getting candidates: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/api/candidates/rank', methods=['POST'])
+def rank_candidates():
+    """
+    Rank candidates against a job description (BM25 over skills, profile
+    fields and resume text). Body: `job_description`, optional `top_k`
+    and `skills` (a list or comma-separated string) / `skill_mode` to rank
+    only candidates with those skills.
+    Each result carries `score` and a `score_breakdown`.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        job_description = str(data.get('job_description') or '').strip()
+        if not job_description:
+            return jsonify({'success': False, 'error': 'job_description is required'}), 400
+        
+        try:
+            top_k = int(data.get('top_k', DEFAULT_TOP_K))
+        except (TypeError, ValueError):
+            top_k = 0
+        if not (1 <= top_k <= MAX_PAGE_SIZE):
+            return jsonify({'success': False, 'error': f'top_k must be between 1 and {MAX_PAGE_SIZE}'}), 400
+        
+        candidate_repository.refresh()
+        skills = data.get('skills') or []
+        if isinstance(skills, str):
+            skills = skills.split(',')
+        skills = [s for s in skills if str(s).strip()]
+        allowed = search_index.match_skills(skills, mode=data.get('skill_mode', 'all')) if skills else None
+        
+        started = time.perf_counter()
+        ranking = ranking_index.rank(job_description, top_k, allowed)
+        took_ms = round((time.perf_counter() - started) * 1000, 2)
+        
+        results = []
+        for rank, (candidate_id, score, breakdown) in enumerate(ranking['results'], 1):
+            candidate = candidate_repository.get_many([candidate_id])
+            if candidate:
+                results.append(dict(candidate[0], rank=rank, score=score, score_breakdown=breakdown))
+        
+        return jsonify({
+            'success': True,
+            'candidates': results,
+            'count': len(results),
+            'ranked': len(ranking_index) if allowed is None else len(allowed),
+            'query_terms': ranking['query_terms'],
+            'took_ms': took_ms
+        })
+    except Exception as e:
+        logging.error(f"Error ranking candidates: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @app.route('/api/candidates/<candidate_id>', methods=['GET'])
 def get_candidate(candidate_id):
     """Get a specific candidate"""
     try:
-        # Try enriched folder first
-        filepath = os.path.join('enriched_json', f"{candidate_id}.json")
-        
-        # Fallback to parsed folder
-        if not os.path.exists(filepath):
-            filepath = os.path.join('parsed_json', f"{candidate_id}.json")
+        candidate = candidate_repository.get(candidate_id)
         
-        if not os.path.exists(filepath):
+        if candidate is None:
             return jsonify({'success': False, 'error': 'Candidate not found'}), 404
-        
-        with open(filepath, 'r', encoding='utf-8') as f:
-            candidate = json.load(f)
-            candidate['id'] = candidate_id
-            
-            # Find resume file
-            resume_file = find_resume_file(candidate_id)
-            if resume_file:
-                candidate['resume_filename'] = resume_file
+
+        # Parse-stage verdict for resumes kept despite resembling another (NEAR_DUPLICATE_MODE=flag)
+        verdict = load_near_duplicates().get(candidate.get('resume_filename'))
+        if verdict is not None:
+            candidate = dict(candidate, near_duplicate=verdict)
         
         return jsonify({
             'success': True,
@@ -571,17 +977,22 @@ def get_candidate(candidate_id):
         logging.error(f"Error getting candidate: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+def enrich_job(job):
+    """Job: enrich every parsed candidate"""
+    job.update(message='Enriching candidates')
+    results = enrich_all_candidates()
+    candidate_repository.invalidate()
+    return {
+        'success': True,
+        'message': 'Candidate enrichment completed',
+        'results': results
+    }
+
 @app.route('/api/candidates/enrich', methods=['POST'])
 def enrich_candidates():
     """Enrich all candidates with LinkedIn data"""
     try:
-        results = enrich_all_candidates()
-        
-        return jsonify({
-            'success': True,
-            'message': 'Candidate enrichment completed',
-            'results': results
-        })
+        return dispatch_job(JOB_ENRICH, enrich_job)
     except Exception as e:
         logging.error(f"Error enriching candidates: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -590,17 +1001,22 @@ def enrich_candidates():
 # AI Processing Routes
 # --------------------------
 
+def ai_parse_job(job):
+    """Job: extract structured candidate data with Gemini"""
+    job.update(message='Parsing resumes with Gemini')
+    results = gemini_process_all()
+    candidate_repository.invalidate()
+    return {
+        'success': True,
+        'message': 'AI parsing completed',
+        'results': results
+    }
+
 @app.route('/api/ai/parse', methods=['POST'])
 def parse_with_ai():
     """Parse resumes using Gemini AI"""
     try:
-        results = gemini_process_all()
-        
-        return jsonify({
-            'success': True,
-            'message': 'AI parsing completed',
-            'results': results
-        })
+        return dispatch_job(JOB_AI_PARSE, ai_parse_job)
     except Exception as e:
         logging.error(f"Error in AI parsing: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -609,24 +1025,31 @@ def parse_with_ai():
 # Interview Scheduling Routes
 # --------------------------
 
+def schedule_interviews_job(job, options):
+    """Job: schedule interviews for every candidate not yet scheduled"""
+    job.update(message='Scheduling interviews')
+    results = schedule_all_candidates(**options)
+    return {
+        'success': True,
+        'message': 'Interview scheduling completed',
+        'results': results
+    }
+
 @app.route('/api/interviews/schedule', methods=['POST'])
 def schedule_interviews():
     """Schedule interviews for all candidates"""
     try:
         data = request.json or {}
         
-        results = schedule_all_candidates(
-            duration_minutes=data.get('duration_minutes', 45),
-            buffer_minutes=data.get('buffer_minutes', 15),
-            work_hours=tuple(data.get('work_hours', [9, 17])),
-            skip_weekends=data.get('skip_weekends', True)
-        )
-        
-        return jsonify({
-            'success': True,
-            'message': 'Interview scheduling completed',
-            'results': results
-        })
+        options = {
+            'duration_minutes': data.get('duration_minutes', 45),
+            'buffer_minutes': data.get('buffer_minutes', 15),
+            'work_hours': tuple(data.get('work_hours', [9, 17])),
+            'skip_weekends': data.get('skip_weekends', True),
+            'interviewers': data.get('interviewers') or None,
+            'panel_size': data.get('panel_size')
+        }
+        return dispatch_job(JOB_SCHEDULE, schedule_interviews_job, options)
     except Exception as e:
         logging.error(f"Error scheduling interviews: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -635,22 +1058,18 @@ def schedule_interviews():
 def get_upcoming_interviews():
     """Get upcoming interviews for the next 7 days"""
     try:
-        service = get_calendar_service()
-        
         # Calculate time range (next 7 days)
-        now = datetime.now(timezone.utc).isoformat()
-        next_week = (datetime.now(timezone.utc) + timedelta(days=7)).isoformat()
-        
-        events_result = service.events().list(
-            calendarId='primary',
-            timeMin=now,
-            timeMax=next_week,
-            singleEvents=True,
-            orderBy='startTime',
-            q='Interview'  # Search for events with "Interview" in title
-        ).execute()
-        
-        events = events_result.get('items', [])
+        now = datetime.now(timezone.utc)
+        next_week = now + timedelta(days=7)
+        
+        # Served from the local mirror; only deltas are pulled after the TTL
+        events = calendar_cache.events(
+            get_calendar_service,
+            'primary',
+            now,
+            next_week,
+            query='Interview'  # Events with "Interview" in title
+        )
         
         # Format events
         formatted_events = []
@@ -681,54 +1100,49 @@ def get_upcoming_interviews():
 def get_calendar_availability():
     """Get available time slots for scheduling"""
     try:
-        service = get_calendar_service()
-        
-        # Get busy intervals for next 3 days
+        days = request.args.get('days', DEFAULT_HORIZON_DAYS, type=int)
+        duration_minutes = request.args.get('duration_minutes', DEFAULT_DURATION_MINUTES, type=int)
+        granularity_minutes = request.args.get('granularity_minutes', DEFAULT_GRANULARITY_MINUTES, type=int)
+        work_start = request.args.get('work_start', DEFAULT_WORK_HOURS[0], type=int)
+        work_end = request.args.get('work_end', DEFAULT_WORK_HOURS[1], type=int)
+        skip_weekends = request.args.get('skip_weekends', 'true').lower() != 'false'
+
+        if not (1 <= days <= MAX_AVAILABILITY_DAYS):
+            return jsonify({'success': False, 'error': f'days must be between 1 and {MAX_AVAILABILITY_DAYS}'}), 400
+        if duration_minutes <= 0 or granularity_minutes <= 0:
+            return jsonify({'success': False, 'error': 'duration_minutes and granularity_minutes must be positive'}), 400
+        if not (0 <= work_start < work_end <= 24):
+            return jsonify({'success': False, 'error': 'work_start must be before work_end (hours 0-24)'}), 400
+
+        # Get busy intervals for the requested horizon
         start_time = datetime.now(timezone.utc)
-        end_time = start_time + timedelta(days=3)
-        
-        body = {
-            "timeMin": start_time.isoformat(),
-            "timeMax": end_time.isoformat(),
-            "items": [{"id": "primary"}]
-        }
-        
-        events_result = service.freebusy().query(body=body).execute()
-        busy_slots = events_result['calendars']['primary'].get('busy', [])
-        
-        # Generate available slots (simplified)
-        available_slots = []
-        current_time = start_time.replace(hour=9, minute=0, second=0, microsecond=0)
-        
-        while current_time.date() <= end_time.date():
-            # Skip weekends
-            if current_time.weekday() < 5:  # 0-4 = Monday-Friday
-                # Work hours: 9 AM to 5 PM
-                slot_end = current_time + timedelta(minutes=45)  # 45-minute slots
-                
-                if slot_end.hour < 17:  # Within work hours
-                    # Check if slot is available
-                    slot_available = True
-                    for busy in busy_slots:
-                        busy_start = datetime.fromisoformat(busy['start'].replace('Z', '+00:00'))
-                        busy_end = datetime.fromisoformat(busy['end'].replace('Z', '+00:00'))
-                        
-                        if (current_time < busy_end and slot_end > busy_start):
-                            slot_available = False
-                            break
-                    
-                    if slot_available:
-                        available_slots.append({
-                            'start': current_time.isoformat(),
-                            'end': slot_end.isoformat()
-                        })
-            
-            current_time += timedelta(minutes=60)  # Check every hour
+        end_time = start_time + timedelta(days=days)
+        
+        calendars = calendar_cache.freebusy(get_calendar_service, ['primary'], start_time, end_time)
+        busy_slots = calendars['primary'].get('busy', [])
+        
+        slots = compute_available_slots(
+            busy_slots,
+            start_time,
+            end_time,
+            duration_minutes=duration_minutes,
+            granularity_minutes=granularity_minutes,
+            work_hours=(work_start, work_end),
+            skip_weekends=skip_weekends
+        )
+        available_slots = [{'start': s.isoformat(), 'end': e.isoformat()} for s, e in slots]
         
         return jsonify({
             'success': True,
             'available_slots': available_slots,
-            'count': len(available_slots)
+            'count': len(available_slots),
+            'parameters': {
+                'days': days,
+                'duration_minutes': duration_minutes,
+                'granularity_minutes': granularity_minutes,
+                'work_hours': [work_start, work_end],
+                'skip_weekends': skip_weekends
+            }
         })
         
     except Exception as e:
@@ -740,33 +1154,31 @@ def get_calendar_availability():
 def cancel_interview(event_id):
     """Cancel interview (Google Calendar + local JSON cleanup)"""
     deleted_files = []
-    json_dir = "scheduled_interviews"
 
     try:
         service = get_calendar_service()
         # Try deleting event from Google Calendar
         service.events().delete(calendarId='primary', eventId=event_id).execute()
+        calendar_cache.invalidate('primary')
         msg = f"Event {event_id} deleted from Google Calendar."
     except HttpError as e:
         # Handle already-deleted or missing events gracefully
         if e.resp.status in [410, 404]:
             msg = f"Event {event_id} already deleted or not found in Google Calendar."
             logging.warning(msg)
+            calendar_cache.invalidate('primary')
         else:
             logging.error(f"Unexpected error deleting event {event_id}: {e}")
             return jsonify({'success': False, 'error': str(e)}), 500
 
     # ✅ Delete associated JSON file(s)
-    for path in glob.glob(os.path.join(json_dir, "*.json")):
+    for record in interview_store.by_event(event_id):
         try:
-            with open(path, "r") as f:
-                data = json.load(f)
-                if data.get("event_id") == event_id:
-                    os.remove(path)
-                    deleted_files.append(os.path.basename(path))
-                    logging.info(f"🗑️ Deleted local file: {path}")
+            interview_store.remove(record['filename'])
+            deleted_files.append(record['filename'])
+            logging.info(f"🗑️ Deleted local file: {record['filename']}")
         except Exception as e:
-            logging.warning(f"Error reading/deleting {path}: {e}")
+            logging.warning(f"Error deleting {record['filename']}: {e}")
 
     # ✅ Also update scheduled_candidates.json if needed
     try:
@@ -798,8 +1210,14 @@ def view_resume(filename):
             logging.error(f"File not found: {filepath}")
             return jsonify({'success': False, 'error': f'File not found: {safe_filename}'}), 404
         
-        # Extract text from the resume
-        text = extract_text_from_file(filepath)
+        # Same bytes -> same text; the content hash doubles as the ETag
+        etag = resume_text_cache.digest(filepath)
+        if request.if_none_match.contains_weak(etag):  # Compressed responses carry a weak ETag
+            response = app.response_class(status=304)
+            response.set_etag(etag)
+            return response
+
+        text, etag = resume_text_cache.text_for(filepath, extract_text_from_file)
         
         if not text:
             return jsonify({
@@ -807,13 +1225,16 @@ def view_resume(filename):
                 'error': 'Could not extract text from file'
             }), 500
         
-        return jsonify({
+        response = jsonify({
             'success': True,
             'filename': safe_filename,
             'content': text,
             'file_size': os.path.getsize(filepath),
             'file_type': safe_filename.split('.')[-1].upper()
         })
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
     except Exception as e:
         logging.error(f"Error viewing file {filename}: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -832,40 +1253,34 @@ def stream_resume(filename):
         ext = safe_filename.split('.')[-1].lower()
         mimetype = 'application/pdf' if ext == 'pdf' else 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
         
-        return send_file(
-            filepath,
-            mimetype=mimetype,
-            as_attachment=False,
-            download_name=safe_filename
-        )
+        return send_resume(filepath, safe_filename, mimetype, as_attachment=False)
     except Exception as e:
         logging.error(f"Error streaming file {filename}: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/interviews/scheduled', methods=['GET'])
 def get_scheduled_interviews():
-    """Get all scheduled interviews"""
+    """
+    Get scheduled interviews, most recent first.
+    Optional `from` / `to` (ISO 8601) restrict the start time range and
+    `email` restricts to one candidate; all are answered from the index.
+    """
     try:
-        folder = 'scheduled_interviews'
-        interviews = []
-        
-        if not os.path.exists(folder):
-            return jsonify({
-                'success': True,
-                'interviews': [],
-                'count': 0
-            })
-        
-        for filename in os.listdir(folder):
-            if filename.endswith('.json') and not filename.startswith('summary_'):
-                filepath = os.path.join(folder, filename)
-                with open(filepath, 'r') as f:
-                    data = json.load(f)
-                    data['filename'] = filename
-                    interviews.append(data)
-        
-        # Sort by start_time (most recent first)
-        interviews.sort(key=lambda x: x.get('start_time', ''), reverse=True)
+        email = request.args.get('email')
+        try:
+            start = parse_calendar_time(request.args['from']) if request.args.get('from') else None
+            end = parse_calendar_time(request.args['to']) if request.args.get('to') else None
+        except ValueError:
+            return jsonify({'success': False, 'error': 'Invalid from/to. Use ISO format.'}), 400
+        
+        if email:
+            interviews = interview_store.for_candidate(email=email)
+            interviews = [i for i in interviews
+                          if (start is None or interview_start_time(i) >= start)
+                          and (end is None or interview_start_time(i) < end)]
+            interviews.sort(key=lambda x: x.get('start_time', ''), reverse=True)
+        else:
+            interviews = interview_store.between(start, end)
         
         return jsonify({
             'success': True,
@@ -877,6 +1292,28 @@ def get_scheduled_interviews():
         logging.error(f"Error fetching scheduled interviews: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+# --------------------------
+# Background Job Routes
+# --------------------------
+
+@app.route('/api/jobs', methods=['GET'])
+def list_jobs():
+    """List recent background jobs, optionally filtered by type"""
+    jobs = job_queue.list(request.args.get('type'))
+    return jsonify({
+        'success': True,
+        'jobs': [job.to_dict(include_result=False) for job in jobs],
+        'count': len(jobs)
+    })
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Get status, progress and (when finished) the result of a job"""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+    return jsonify({'success': True, 'job': job.to_dict()})
+
 # --------------------------
 # Statistics Routes
 # --------------------------
@@ -885,39 +1322,15 @@ def get_scheduled_interviews():
 def get_statistics():
     """Get overall statistics"""
     try:
-        # Count files in each folder
-        resumes_count = len([f for f in os.listdir(UPLOAD_FOLDER) if allowed_file(f)]) if os.path.exists(UPLOAD_FOLDER) else 0
-        parsed_count = len([f for f in os.listdir('parsed_json') if f.endswith('.json')]) if os.path.exists('parsed_json') else 0
-        enriched_count = len([f for f in os.listdir('enriched_json') if f.endswith('.json')]) if os.path.exists('enriched_json') else 0
-        
-        # Count scheduled interviews
-        scheduled_count = 0
-        if os.path.exists('scheduled_interviews'):
-            scheduled_count = len([f for f in os.listdir('scheduled_interviews') 
-                                 if f.endswith('.json') and not f.startswith('summary_')])
-        
-        # Get skill distribution
-        candidates = get_all_candidates()
-        all_skills = {}
-        experience_levels = {}
-        companies = {}
-        
-        for candidate in candidates:
-            # Skills
-            for skill in candidate.get('skills', []):
-                all_skills[skill] = all_skills.get(skill, 0) + 1
-            
-            # Experience levels
-            exp = candidate.get('years_of_experience', 'Unknown')
-            experience_levels[exp] = experience_levels.get(exp, 0) + 1
-            
-            # Companies
-            company = candidate.get('current_company', 'Unknown')
-            if company != 'Not specified':
-                companies[company] = companies.get(company, 0) + 1
+        # Folder counts are cached until the folder changes
+        resumes_count = folder_counter.count(UPLOAD_FOLDER, allowed_file)
+        parsed_count = folder_counter.count('parsed_json', is_json_file)
+        enriched_count = folder_counter.count('enriched_json', is_json_file)
+        scheduled_count = folder_counter.count('scheduled_interviews', is_interview_record)
         
-        top_skills = sorted(all_skills.items(), key=lambda x: x[1], reverse=True)[:10]
-        top_companies = sorted(companies.items(), key=lambda x: x[1], reverse=True)[:5]
+        # Skill, experience and company aggregates are maintained incrementally
+        candidate_repository.refresh()
+        aggregates = candidate_stats.snapshot()
         
         return jsonify({
             'success': True,
@@ -926,9 +1339,9 @@ def get_statistics():
                 'parsed_candidates': parsed_count,
                 'enriched_candidates': enriched_count,
                 'scheduled_interviews': scheduled_count,
-                'top_skills': [{'skill': s[0], 'count': s[1]} for s in top_skills],
-                'experience_levels': experience_levels,
-                'top_companies': [{'company': c[0], 'count': c[1]} for c in top_companies]
+                'top_skills': aggregates['top_skills'],
+                'experience_levels': aggregates['experience_levels'],
+                'top_companies': aggregates['top_companies']
             }
         })
     except Exception as e:
@@ -975,7 +1388,7 @@ def system_cleanup():
         
         # Also clean tracking files
         tracking_files = [
-            'processed_emails.json', 'processed_text_hashes.json',
+            'processed_emails.json', 'processed_text_hashes.json', 'parsed_text_sources.json', 'near_duplicates.json',
             'processed_candidates.json', 'enriched_candidates.json',
             'scheduled_candidates.json'
         ]
@@ -985,6 +1398,8 @@ def system_cleanup():
                 os.remove(tracking_file)
                 results[tracking_file] = 'Removed tracking file'
         
+        candidate_repository.invalidate()
+        
         return jsonify({
             'success': True,
             'message': 'Cleanup completed',
@@ -1022,7 +1437,7 @@ def system_status():
         
         # Check for tracking files
         tracking_files = [
-            'processed_emails.json', 'processed_text_hashes.json',
+            'processed_emails.json', 'processed_text_hashes.json', 'parsed_text_sources.json', 'near_duplicates.json',
             'processed_candidates.json', 'enriched_candidates.json',
             'scheduled_candidates.json'
         ]
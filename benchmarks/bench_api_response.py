@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark JSON serialization and compression for /api/candidates
+
+Builds a synthetic candidate folder (10k by default) in a temp directory,
+then reports serialization time (stdlib json vs. the API's JSON provider),
+bytes on the wire per Content-Encoding, and end-to-end request time via
+the Flask test client. Results are printed as JSON.
+
+    python benchmarks/bench_api_response.py --candidates 10000 --repeat 5
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from corpus import generate_candidates
+
+
+def timed(func, repeat):
+    samples = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        samples.append(time.perf_counter() - started)
+    return result, {'median_ms': round(statistics.median(samples) * 1000, 2),
+                    'min_ms': round(min(samples) * 1000, 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--candidates', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bench_api_')
+    generate_candidates(os.path.join(workdir, 'enriched_json'), args.candidates)
+    os.chdir(workdir)
+
+    import logging
+    logging.disable(logging.INFO)
+    import app as app_module
+    import api_response
+
+    app = app_module.app
+    client = app.test_client()
+    client.get('/api/candidates')  # Warm the repository and indexes
+
+    with app.app_context():
+        payload = {'success': True, 'candidates': app_module.get_all_candidates(), 'count': args.candidates}
+        stdlib_body, stdlib_time = timed(
+            lambda: json.dumps(payload, sort_keys=True, separators=(',', ':')).encode('utf-8'), args.repeat)
+        provider_body, provider_time = timed(lambda: app.json.dumps_bytes(payload), args.repeat)
+
+    report = {
+        'candidates': args.candidates,
+        'orjson': api_response.orjson is not None,
+        'brotli': api_response.brotli is not None,
+        'serialize': {'stdlib': stdlib_time, 'provider': provider_time,
+                      'identical_output': json.loads(stdlib_body) == json.loads(provider_body)},
+        'encodings': {}
+    }
+
+    encodings = ['identity', 'gzip'] + (['br'] if api_response.brotli is not None else [])
+    for encoding in encodings:
+        response, request_time = timed(
+            lambda: client.get('/api/candidates', headers={'Accept-Encoding': encoding}), args.repeat)
+        report['encodings'][encoding] = {
+            'content_encoding': response.headers.get('Content-Encoding', 'identity'),
+            'bytes': len(response.get_data()),
+            'request': request_time
+        }
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Synthetic resume corpus for benchmarks
+
+Writes N resumes as PDF and DOCX files (resumes/) plus the matching parsed
+and enriched candidate JSON (parsed_json/, enriched_json/). Size, page
+count and the fraction of byte-identical duplicates are configurable, and
+output is deterministic for a given seed. PDFs and DOCX files are built by
+hand so no document libraries are needed beyond the pipeline's own.
+
+    python benchmarks/corpus.py /tmp/corpus --resumes 200 --pages 2 --duplicate-rate 0.1
+"""
+
+import os
+import sys
+import json
+import random
+import logging
+import zipfile
+import argparse
+from xml.sax.saxutils import escape
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from linkedin_enricher import enrich_candidate
+
+FIRST_NAMES = ['Aarav', 'Priya', 'John', 'Mary Ann', 'Wei', 'Fatima', 'Carlos', 'Olga', 'Kenji', 'Amara',
+               'Liam', 'Sofia', 'Noah', 'Isha', 'Mateo', 'Chloe', 'Arjun', 'Zara', 'Ethan', 'Meera']
+LAST_NAMES = ['Sharma', 'Smith', 'Chen', 'Khan', 'Garcia', 'Ivanova', 'Tanaka', 'Okafor', 'Brown',
+              'Rossi', 'Patel', 'Nguyen', 'Müller', 'Silva', 'Kim', 'Dubois', 'Singh', 'Haddad']
+SKILLS = ['Python', 'Java', 'JavaScript', 'TypeScript', 'React', 'Node.js', 'SQL', 'PostgreSQL', 'AWS',
+          'Docker', 'Kubernetes', 'Go', 'Rust', 'C++', 'Machine Learning', 'TensorFlow', 'PyTorch',
+          'Django', 'Flask', 'Spring Boot', 'GraphQL', 'Redis', 'Kafka', 'Terraform', 'Figma']
+COMPANIES = ['Acme Corp', 'Globex', 'Initech', 'Umbrella', 'Hooli', 'Stark Industries', 'Wayne Enterprises']
+ROLES = ['Software Engineer', 'Backend Developer', 'Data Scientist', 'Frontend Developer', 'DevOps Engineer']
+EDUCATION = ['B.Tech Computer Science', 'M.Sc Data Science', 'B.E. Electronics', 'MCA', 'B.Sc Mathematics']
+WORDS = ('designed built led migrated optimized scalable services pipelines latency throughput '
+         'team customers platform reliability deployed automated reduced improved data models '
+         'architecture distributed systems cloud api microservices dashboards analytics testing').split()
+
+
+# --------------------------
+# Document writers
+# --------------------------
+def _pdf_escape(line):
+    # Helvetica in a simple PDF content stream only covers Latin-1
+    line = line.encode('latin-1', 'replace').decode('latin-1')
+    return line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def write_pdf(path, pages):
+    """Write a text-only PDF; `pages` is a list of pages, each a list of lines"""
+    objects = [b'<< /Type /Catalog /Pages 2 0 R >>', None,
+               b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>']
+    page_ids = []
+    for lines in pages:
+        text = ''.join(f'({_pdf_escape(line)}) Tj T*\n' for line in lines)
+        stream = f'BT /F1 10 Tf 12 TL 50 780 Td\n{text}ET'.encode('latin-1')
+        objects.append(b'<< /Length %d >>\nstream\n%s\nendstream' % (len(stream), stream))
+        content_id = len(objects)
+        objects.append(b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] '
+                       b'/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>' % content_id)
+        page_ids.append(len(objects))
+    kids = ' '.join(f'{page_id} 0 R' for page_id in page_ids)
+    objects[1] = f'<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>'.encode('ascii')
+
+    out = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b'%d 0 obj\n%s\nendobj\n' % (number, body)
+    xref = len(out)
+    out += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    out += b''.join(b'%010d 00000 n \n' % offset for offset in offsets)
+    out += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref)
+    with open(path, 'wb') as f:
+        f.write(out)
+
+
+_DOCX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '</Types>')
+_DOCX_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="word/document.xml"/></Relationships>')
+
+
+def write_docx(path, pages):
+    """Write a minimal DOCX with one paragraph per line and a page break between pages"""
+    body = []
+    for page_number, lines in enumerate(pages):
+        if page_number:
+            body.append('<w:p><w:r><w:br w:type="page"/></w:r></w:p>')
+        body.extend(f'<w:p><w:r><w:t xml:space="preserve">{escape(line)}</w:t></w:r></w:p>' for line in lines)
+    document = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+                f'<w:body>{"".join(body)}</w:body></w:document>')
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as z:
+        z.writestr('[Content_Types].xml', _DOCX_CONTENT_TYPES)
+        z.writestr('_rels/.rels', _DOCX_RELS)
+        z.writestr('word/document.xml', document)
+
+
+# --------------------------
+# Candidates
+# --------------------------
+def make_candidate(rng, index, summary_words=40):
+    name = f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}'
+    return {
+        'full_name': name,
+        'email': f"{name.lower().replace(' ', '.')}.{index}@example.com",
+        'phone': f'+1-555-{index:07d}',
+        'skills': rng.sample(SKILLS, rng.randint(3, 9)),
+        'education': rng.choice(EDUCATION),
+        'experience_summary': ' '.join(rng.choice(WORDS) for _ in range(summary_words)),
+        'current_company': rng.choice(COMPANIES + ['Not specified']),
+        'current_role': rng.choice(ROLES)
+    }
+
+
+def resume_pages(rng, candidate, pages, lines_per_page, words_per_line):
+    header = [candidate['full_name'], candidate['email'], candidate['phone'],
+              'Skills: ' + ', '.join(candidate['skills']),
+              f"{candidate['current_role']} at {candidate['current_company']}",
+              'Education: ' + candidate['education']]
+    result = []
+    for page in range(pages):
+        lines = list(header) if page == 0 else []
+        while len(lines) < lines_per_page:
+            lines.append(' '.join(rng.choice(WORDS) for _ in range(words_per_line)))
+        result.append(lines)
+    return result
+
+
+def generate_corpus(root, resumes=100, pages=2, lines_per_page=40, words_per_line=10,
+                    docx_ratio=0.3, duplicate_rate=0.0, summary_words=40, seed=42):
+    """
+    Write the corpus under `root` and return a manifest dict.
+    A `duplicate_rate` fraction of resumes are byte copies of earlier ones
+    under a new filename (and share the original's candidate JSON).
+    """
+    rng = random.Random(seed)
+    folders = {name: os.path.join(root, name) for name in ('resumes', 'parsed_json', 'enriched_json')}
+    for folder in folders.values():
+        os.makedirs(folder, exist_ok=True)
+
+    previous_level = logging.root.level
+    logging.root.setLevel(logging.WARNING)  # enrich_candidate logs every profile
+
+    originals = []
+    manifest = {'root': root, 'resumes': 0, 'duplicates': 0, 'pdf': 0, 'docx': 0, 'pages': pages, 'seed': seed}
+    try:
+        for index in range(resumes):
+            if originals and rng.random() < duplicate_rate:
+                source_path, ext = rng.choice(originals)
+                path = os.path.join(folders['resumes'], f'resume_{index:05d}_dup.{ext}')
+                with open(source_path, 'rb') as src, open(path, 'wb') as dst:
+                    dst.write(src.read())
+                manifest['duplicates'] += 1
+                manifest[ext] += 1
+                manifest['resumes'] += 1
+                continue
+
+            candidate = make_candidate(rng, index, summary_words)
+            ext = 'docx' if rng.random() < docx_ratio else 'pdf'
+            path = os.path.join(folders['resumes'], f'resume_{index:05d}.{ext}')
+            content = resume_pages(rng, candidate, pages, lines_per_page, words_per_line)
+            (write_docx if ext == 'docx' else write_pdf)(path, content)
+            originals.append((path, ext))
+            manifest[ext] += 1
+            manifest['resumes'] += 1
+
+            base_name = f'resume_{index:05d}'
+            with open(os.path.join(folders['parsed_json'], base_name + '.json'), 'w', encoding='utf-8') as f:
+                json.dump(candidate, f)
+            with open(os.path.join(folders['enriched_json'], base_name + '.json'), 'w', encoding='utf-8') as f:
+                json.dump(enrich_candidate(dict(candidate)), f)
+    finally:
+        logging.root.setLevel(previous_level)
+    return manifest
+
+
+def generate_candidates(folder, count, summary_words=40, seed=42):
+    """Only enriched candidate JSON (no documents), for API benchmarks"""
+    rng = random.Random(seed)
+    os.makedirs(folder, exist_ok=True)
+    previous_level = logging.root.level
+    logging.root.setLevel(logging.WARNING)
+    try:
+        for index in range(count):
+            candidate = enrich_candidate(make_candidate(rng, index, summary_words))
+            with open(os.path.join(folder, f'candidate_{index:06d}.json'), 'w', encoding='utf-8') as f:
+                json.dump(candidate, f)
+    finally:
+        logging.root.setLevel(previous_level)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('root')
+    parser.add_argument('--resumes', type=int, default=100)
+    parser.add_argument('--pages', type=int, default=2)
+    parser.add_argument('--lines-per-page', type=int, default=40)
+    parser.add_argument('--words-per-line', type=int, default=10)
+    parser.add_argument('--docx-ratio', type=float, default=0.3)
+    parser.add_argument('--duplicate-rate', type=float, default=0.0)
+    parser.add_argument('--summary-words', type=int, default=40)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    manifest = generate_corpus(args.root, args.resumes, args.pages, args.lines_per_page, args.words_per_line,
+                               args.docx_ratio, args.duplicate_rate, args.summary_words, args.seed)
+    print(json.dumps(manifest, indent=2))
+
+
+if __name__ == '__main__':
+    main()
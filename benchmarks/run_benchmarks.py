@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+"""
+Pipeline benchmark suite
+
+Generates a synthetic corpus (see corpus.py) in a temp directory and runs:
+  micro  - extract_text_from_file (PDF, DOCX), calculate_text_hash,
+           enrich_candidate, panel slot allocation, BM25 candidate ranking
+  e2e    - parse_all_resumes over the corpus, process_all_candidates with
+           a fake Calendar service, and the list/search/stats API
+           endpoints through the Flask test client
+Results are written as JSON (stdout, and --output if given) so runs can
+be compared over time. External APIs are never called.
+
+    python benchmarks/run_benchmarks.py --resumes 200 --candidates 10000 --output bench.json
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import random
+import shutil
+import logging
+import argparse
+import platform
+import tempfile
+import statistics
+import subprocess
+from datetime import datetime, timedelta, timezone
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, ROOT)
+
+from corpus import generate_corpus, generate_candidates, make_candidate, resume_pages
+
+
+# --------------------------
+# Measurement helpers
+# --------------------------
+def measure(func, repeat=5, items=None, setup=None):
+    """Run `func` `repeat` times; report wall time and, with `items`, throughput"""
+    samples = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    median = statistics.median(samples)
+    result = {
+        'repeat': repeat,
+        'median_ms': round(median * 1000, 3),
+        'min_ms': round(min(samples) * 1000, 3),
+        'max_ms': round(max(samples) * 1000, 3)
+    }
+    if items:
+        result['items'] = items
+        result['items_per_second'] = round(items / median, 1) if median > 0 else None
+    return result
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+# --------------------------
+# Fake Calendar service
+# --------------------------
+class _Request:
+    def __init__(self, result):
+        self._result = result
+
+    def execute(self):
+        return self._result
+
+
+class _Batch:
+    def __init__(self, callback):
+        self._callback = callback
+        self._requests = []
+
+    def add(self, request, request_id=None):
+        self._requests.append((request_id, request))
+
+    def execute(self):
+        for request_id, request in self._requests:
+            self._callback(request_id, request.execute(), None)
+
+
+class FakeCalendarService:
+    """Calendar v3 stand-in: freebusy returns generated busy blocks, inserts always succeed"""
+
+    def __init__(self, busy_by_calendar=None):
+        self.busy_by_calendar = busy_by_calendar or {}
+
+    def freebusy(self):
+        return self
+
+    def query(self, body):
+        calendars = {item['id']: {'busy': self.busy_by_calendar.get(item['id'], [])} for item in body['items']}
+        return _Request({'calendars': calendars})
+
+    def events(self):
+        return self
+
+    def insert(self, calendarId, body, **kwargs):
+        event_id = uuid.uuid4().hex
+        return _Request({'id': event_id, 'htmlLink': f'https://calendar.example/{event_id}'})
+
+    def new_batch_http_request(self, callback=None):
+        return _Batch(callback)
+
+
+def random_busy(rng, start, days, blocks_per_day=3):
+    busy = []
+    for day in range(days):
+        day_start = (start + timedelta(days=day)).replace(hour=9, minute=0, second=0, microsecond=0)
+        for _ in range(blocks_per_day):
+            block_start = day_start + timedelta(minutes=30 * rng.randrange(16))
+            block_end = block_start + timedelta(minutes=30 * rng.randint(1, 3))
+            busy.append({'start': block_start.isoformat(), 'end': block_end.isoformat()})
+    return busy
+
+
+# --------------------------
+# Benchmarks
+# --------------------------
+def bench_extract(corpus_root, repeat):
+    from parse_resumes import extract_text_from_file
+    resume_folder = os.path.join(corpus_root, 'resumes')
+    results = {}
+    for ext in ('pdf', 'docx'):
+        paths = [os.path.join(resume_folder, f) for f in sorted(os.listdir(resume_folder)) if f.endswith('.' + ext)]
+        if paths:
+            results[ext] = measure(lambda: [extract_text_from_file(p) for p in paths], repeat, items=len(paths))
+    return results
+
+
+def bench_text_hash(corpus_root, repeat):
+    from parse_resumes import extract_text_from_file, calculate_text_hash
+    resume_folder = os.path.join(corpus_root, 'resumes')
+    texts = [extract_text_from_file(os.path.join(resume_folder, f)) for f in sorted(os.listdir(resume_folder))]
+    result = measure(lambda: [calculate_text_hash(t) for t in texts], repeat, items=len(texts))
+    result['mean_chars'] = round(statistics.mean(len(t) for t in texts)) if texts else 0
+    return result
+
+
+def bench_enrich(corpus_root, repeat):
+    from linkedin_enricher import enrich_candidate
+    parsed_folder = os.path.join(corpus_root, 'parsed_json')
+    candidates = []
+    for filename in sorted(os.listdir(parsed_folder)):
+        with open(os.path.join(parsed_folder, filename), 'r', encoding='utf-8') as f:
+            candidates.append(json.load(f))
+    return measure(lambda: [enrich_candidate(dict(c)) for c in candidates], repeat, items=len(candidates))
+
+
+def bench_slot_allocation(candidate_count, interviewer_count, repeat, seed=42):
+    from schedule_interviews import allocate_panel_slots
+    rng = random.Random(seed)
+    start = (datetime.now(timezone.utc) + timedelta(days=1)).replace(hour=9, minute=0, second=0, microsecond=0)
+    horizon_days = 60
+    interviewers = [f'interviewer{i}@example.com' for i in range(interviewer_count)]
+    service = FakeCalendarService({i: random_busy(rng, start, horizon_days) for i in interviewers})
+    candidates = [{'full_name': f'Candidate {i}', 'email': f'c{i}@example.com'} for i in range(candidate_count)]
+
+    assigned = []
+    result = measure(lambda: assigned.append(len(allocate_panel_slots(
+        service, candidates, interviewers, start, panel_size=2, horizon_days=horizon_days))),
+        repeat, items=candidate_count)
+    result.update(interviewers=interviewer_count, horizon_days=horizon_days, assigned=assigned[-1])
+    return result
+
+
+RANK_JOB_DESCRIPTION = (
+    'Senior Backend Developer with Python, Django and PostgreSQL. Design scalable microservices '
+    'and distributed systems on AWS with Docker and Kubernetes; build data pipelines with Kafka '
+    'and Redis. Machine Learning experience is a plus.')
+
+
+def bench_rank(workdir, candidate_count, repeat, pages=2, lines_per_page=40, seed=42):
+    """Ranking over candidates with parsed resume text, plus a query right after 1% of them change"""
+    from candidate_ranking import CandidateRankingIndex
+    rng = random.Random(seed)
+    text_folder = os.path.join(workdir, 'rank_parsed_text')
+    os.makedirs(text_folder, exist_ok=True)
+    candidates = {}
+    for i in range(candidate_count):
+        candidate_id = f'candidate_{i:06d}'
+        candidates[candidate_id] = make_candidate(rng, i)
+        text = '\n'.join(line for page in resume_pages(rng, candidates[candidate_id], pages, lines_per_page, 10)
+                         for line in page)
+        with open(os.path.join(text_folder, candidate_id + '.txt'), 'w', encoding='utf-8') as f:
+            f.write(text)
+
+    index = CandidateRankingIndex(text_folder=text_folder)
+    for candidate_id, candidate in candidates.items():
+        index.on_change('added', candidate_id, candidate, None)
+
+    started = time.perf_counter()
+    index.warm()
+    build_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    index.rank(RANK_JOB_DESCRIPTION)  # First query also computes the term weights
+    first_query_seconds = time.perf_counter() - started
+
+    result = measure(lambda: index.rank(RANK_JOB_DESCRIPTION), repeat, items=candidate_count)
+
+    changed = rng.sample(sorted(candidates), max(1, candidate_count // 100))
+    for candidate_id in changed:
+        index.on_change('updated', candidate_id, make_candidate(rng, candidate_count), candidates[candidate_id])
+    started = time.perf_counter()
+    index.rank(RANK_JOB_DESCRIPTION)
+    update_query_seconds = time.perf_counter() - started
+
+    result.update(build_ms=round(build_seconds * 1000, 1), first_query_ms=round(first_query_seconds * 1000, 1),
+                  update_query_ms=round(update_query_seconds * 1000, 1), updated=len(changed))
+    return result
+
+
+def bench_process_all_candidates(corpus_root, workdir, repeat):
+    import schedule_interviews
+    service = FakeCalendarService()
+    enriched_folder = os.path.join(corpus_root, 'enriched_json')
+    count = len(os.listdir(enriched_folder))
+
+    def reset():
+        # Every run starts with no interviews scheduled
+        shutil.rmtree(os.path.join(workdir, schedule_interviews.SCHEDULE_LOG_FOLDER), ignore_errors=True)
+        if os.path.exists(schedule_interviews.SCHEDULED_CANDIDATES_FILE):
+            os.remove(schedule_interviews.SCHEDULED_CANDIDATES_FILE)
+
+    original = schedule_interviews.get_calendar_service
+    schedule_interviews.get_calendar_service = lambda: service
+    try:
+        return measure(lambda: schedule_interviews.process_all_candidates(input_folder=enriched_folder),
+                       repeat, items=count, setup=reset)
+    finally:
+        schedule_interviews.get_calendar_service = original
+        reset()
+
+
+def bench_parse_all(corpus_root, workdir, repeat):
+    from parse_resumes import parse_all_resumes, PROCESSED_HASHES_FILE, PARSED_SOURCES_FILE, NEAR_DUPLICATES_FILE
+    from near_duplicates import near_duplicate_index
+    output_folder = os.path.join(workdir, 'bench_parsed_text')
+    count = len(os.listdir(os.path.join(corpus_root, 'resumes')))
+
+    def reset():
+        # Every run parses from scratch: no text, hashes or near-duplicate signatures from the last one
+        shutil.rmtree(output_folder, ignore_errors=True)
+        for path in (PROCESSED_HASHES_FILE, PARSED_SOURCES_FILE, NEAR_DUPLICATES_FILE):
+            if os.path.exists(path):
+                os.remove(path)
+        near_duplicate_index.clear()
+
+    try:
+        return measure(lambda: parse_all_resumes(os.path.join(corpus_root, 'resumes'), output_folder),
+                       repeat, items=count, setup=reset)
+    finally:
+        reset()
+
+
+def bench_api(workdir, candidate_count, repeat):
+    """List/search/stats endpoints over `candidate_count` candidates in <workdir>/enriched_json"""
+    import app as app_module
+    client = app_module.app.test_client()
+
+    started = time.perf_counter()
+    client.get('/api/candidates?limit=1')
+    results = {'candidates': candidate_count, 'cold_load_ms': round((time.perf_counter() - started) * 1000, 3)}
+
+    endpoints = {
+        'list_all': '/api/candidates',
+        'list_page': '/api/candidates?limit=50&sort=-completeness',
+        'search_name': '/api/candidates?search=sharma&limit=50',
+        'search_substring': '/api/candidates?search=ann%20k',
+        'skills_all': '/api/candidates?skills=python,docker&limit=50',
+        'skill_prefix': '/api/candidates?skill=java&limit=50',
+        'stats': '/api/stats'
+    }
+    for name, url in endpoints.items():
+        sizes = []
+
+        def call():
+            response = client.get(url)
+            if response.status_code != 200:
+                raise RuntimeError(f'{url} returned {response.status_code}')
+            sizes.append(len(response.get_data()))
+
+        results[name] = measure(call, repeat)
+        results[name]['bytes'] = sizes[-1]
+    return results
+
+
+BENCHMARKS = ('extract', 'text_hash', 'enrich', 'slot_allocation', 'rank', 'process_all_candidates', 'parse_all', 'api')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--resumes', type=int, default=100, help='Synthetic resumes in the corpus')
+    parser.add_argument('--pages', type=int, default=2)
+    parser.add_argument('--lines-per-page', type=int, default=40)
+    parser.add_argument('--duplicate-rate', type=float, default=0.1)
+    parser.add_argument('--candidates', type=int, default=10000, help='Candidates for the API benchmarks')
+    parser.add_argument('--interviewers', type=int, default=6)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--only', help=f'Comma-separated subset of: {", ".join(BENCHMARKS)}')
+    parser.add_argument('--output', help='Also write the JSON report to this file')
+    parser.add_argument('--keep', action='store_true', help='Keep the generated corpus')
+    args = parser.parse_args()
+
+    selected = set(args.only.split(',')) if args.only else set(BENCHMARKS)
+    unknown = selected - set(BENCHMARKS)
+    if unknown:
+        parser.error(f'Unknown benchmarks: {", ".join(sorted(unknown))}')
+    output = os.path.abspath(args.output) if args.output else None
+
+    workdir = tempfile.mkdtemp(prefix='bench_pipeline_')
+    corpus_root = os.path.join(workdir, 'corpus')
+    started = time.perf_counter()
+    manifest = generate_corpus(corpus_root, resumes=args.resumes, pages=args.pages,
+                               lines_per_page=args.lines_per_page, duplicate_rate=args.duplicate_rate)
+    if 'api' in selected:
+        generate_candidates(os.path.join(workdir, 'enriched_json'), args.candidates)
+    corpus_seconds = time.perf_counter() - started
+
+    # Modules write state files relative to the cwd; keep them in the temp dir
+    os.chdir(workdir)
+    logging.disable(logging.WARNING)
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'git_commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'repeat': args.repeat,
+            'corpus': manifest,
+            'corpus_seconds': round(corpus_seconds, 3)
+        },
+        'micro': {},
+        'e2e': {}
+    }
+
+    runners = [
+        ('micro', 'extract', lambda: bench_extract(corpus_root, args.repeat)),
+        ('micro', 'text_hash', lambda: bench_text_hash(corpus_root, args.repeat)),
+        ('micro', 'enrich', lambda: bench_enrich(corpus_root, args.repeat)),
+        ('micro', 'slot_allocation', lambda: bench_slot_allocation(args.resumes, args.interviewers, args.repeat)),
+        ('micro', 'rank', lambda: bench_rank(workdir, args.candidates, args.repeat, args.pages, args.lines_per_page)),
+        ('e2e', 'process_all_candidates', lambda: bench_process_all_candidates(corpus_root, workdir, args.repeat)),
+        ('e2e', 'parse_all', lambda: bench_parse_all(corpus_root, workdir, args.repeat)),
+        ('e2e', 'api', lambda: bench_api(workdir, args.candidates, args.repeat)),
+    ]
+    try:
+        for group, name, run in runners:
+            if name not in selected:
+                continue
+            try:
+                report[group][name] = run()
+            except Exception as e:
+                report[group][name] = {'error': f'{type(e).__name__}: {e}'}
+    finally:
+        logging.disable(logging.NOTSET)
+        os.chdir(ROOT)
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+        else:
+            report['meta']['workdir'] = workdir
+
+    text = json.dumps(report, indent=2)
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    print(text)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+# calendar_availability.py
+import logging
+from datetime import datetime, timedelta, timezone
+
+# --------------------------
+# Defaults
+# --------------------------
+DEFAULT_WORK_HOURS = (9, 17)
+DEFAULT_HORIZON_DAYS = 3
+DEFAULT_DURATION_MINUTES = 45
+DEFAULT_GRANULARITY_MINUTES = 60
+
+
+# --------------------------
+# Interval helpers
+# --------------------------
+def parse_calendar_time(value):
+    """Parse an RFC3339 timestamp from the Calendar API into an aware datetime"""
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def merge_intervals(intervals):
+    """Merge overlapping or touching (start, end) intervals into a sorted list"""
+    merged = []
+    for start, end in sorted(intervals):
+        if end <= start:
+            continue
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1][1] = end
+        else:
+            merged.append([start, end])
+    return [(start, end) for start, end in merged]
+
+
+def parse_busy_intervals(busy_slots):
+    """
+    Parse freebusy `busy` entries once and merge them.
+    Accepts dicts with 'start'/'end' strings or ready-made (start, end) tuples.
+    """
+    intervals = []
+    for busy in busy_slots:
+        if isinstance(busy, dict):
+            intervals.append((parse_calendar_time(busy['start']), parse_calendar_time(busy['end'])))
+        else:
+            intervals.append(tuple(busy))
+    return merge_intervals(intervals)
+
+
+def working_windows(start, end, work_hours=DEFAULT_WORK_HOURS, skip_weekends=True):
+    """Yield the (start, end) working-hour window of every day between start and end"""
+    day = start.replace(hour=0, minute=0, second=0, microsecond=0)
+    while day < end:
+        if not (skip_weekends and day.weekday() >= 5):
+            window_start = max(day + timedelta(hours=work_hours[0]), start)
+            window_end = min(day + timedelta(hours=work_hours[1]), end)
+            if window_start < window_end:
+                yield window_start, window_end
+        day += timedelta(days=1)
+
+
+def subtract_busy(windows, busy):
+    """
+    Sweep-line subtraction of merged busy intervals from sorted windows.
+    Both inputs are sorted, so this is a single O(windows + busy) pass.
+    """
+    free = []
+    i = 0
+    for window_start, window_end in windows:
+        # Busy intervals that end before this window can never matter again
+        while i < len(busy) and busy[i][1] <= window_start:
+            i += 1
+
+        cursor = window_start
+        j = i
+        while j < len(busy) and busy[j][0] < window_end:
+            busy_start, busy_end = busy[j]
+            if busy_start > cursor:
+                free.append((cursor, busy_start))
+            if busy_end > cursor:
+                cursor = busy_end
+            j += 1
+
+        if cursor < window_end:
+            free.append((cursor, window_end))
+    return free
+
+
+def find_free_windows(busy, start, end, work_hours=DEFAULT_WORK_HOURS, skip_weekends=True):
+    """Free working-hour windows between start and end given merged busy intervals"""
+    return subtract_busy(working_windows(start, end, work_hours, skip_weekends), busy)
+
+
+def split_into_slots(free_windows, duration_minutes=DEFAULT_DURATION_MINUTES,
+                     granularity_minutes=DEFAULT_GRANULARITY_MINUTES):
+    """
+    Cut free windows into bookable slots of `duration_minutes`.
+    Slot starts are aligned to a `granularity_minutes` grid from midnight UTC.
+    """
+    duration = timedelta(minutes=duration_minutes)
+    step = timedelta(minutes=granularity_minutes)
+    slots = []
+
+    for window_start, window_end in free_windows:
+        midnight = window_start.replace(hour=0, minute=0, second=0, microsecond=0)
+        offset = window_start - midnight
+        steps = -(-offset // step)  # ceil division on timedeltas
+        slot_start = midnight + steps * step
+
+        while slot_start + duration <= window_end:
+            slots.append((slot_start, slot_start + duration))
+            slot_start += step
+    return slots
+
+
+# --------------------------
+# Entry point used by the API
+# --------------------------
+def compute_available_slots(
+    busy_slots,
+    start,
+    end,
+    duration_minutes=DEFAULT_DURATION_MINUTES,
+    granularity_minutes=DEFAULT_GRANULARITY_MINUTES,
+    work_hours=DEFAULT_WORK_HOURS,
+    skip_weekends=True
+):
+    """Compute bookable slots from raw freebusy entries"""
+    busy = parse_busy_intervals(busy_slots)
+    free_windows = find_free_windows(busy, start, end, work_hours, skip_weekends)
+    slots = split_into_slots(free_windows, duration_minutes, granularity_minutes)
+    logging.debug(f"Availability: {len(busy)} busy intervals, {len(free_windows)} free windows, {len(slots)} slots")
+    return slots
@@ -0,0 +1,231 @@
+# calendar_cache.py
+import time
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+
+from googleapiclient.errors import HttpError
+
+from calendar_availability import parse_calendar_time
+
+# --------------------------
+# Configuration
+# --------------------------
+CACHE_TTL_SECONDS = 60
+FREEBUSY_BUCKET_MINUTES = 15
+SYNC_LOOKBACK_DAYS = 1
+
+
+def _bucket_floor(moment, minutes=FREEBUSY_BUCKET_MINUTES):
+    """Round a datetime down to the start of its time bucket"""
+    bucket = timedelta(minutes=minutes)
+    midnight = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    return midnight + ((moment - midnight) // bucket) * bucket
+
+
+def _event_start(event):
+    start = event.get('start', {})
+    return parse_calendar_time(start.get('dateTime') or start.get('date'))
+
+
+def _event_end(event):
+    end = event.get('end', {})
+    return parse_calendar_time(end.get('dateTime') or end.get('date'))
+
+
+class CalendarCache:
+    """
+    In-memory cache for Calendar views served by the dashboard.
+
+    Freebusy responses are cached per calendar set and time bucket. Events are
+    mirrored per calendar and kept current with incremental `syncToken`
+    pulls, so a refresh after the TTL only transfers what changed.
+    `invalidate()` is called whenever this app creates or cancels events.
+
+    Calendar API calls never run under the lock, so a slow sync doesn't hold
+    up freebusy reads or invalidations; one sync per calendar is in flight
+    at a time and concurrent readers wait for it instead of starting their own.
+    """
+
+    def __init__(self, ttl_seconds=CACHE_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._freebusy = {}   # (calendar_ids, bucket_start, bucket_end) -> (fetched_at, calendars)
+        self._events = {}     # calendar_id -> {event_id: event}
+        self._sync_tokens = {}
+        self._synced_at = {}
+        self._syncing = {}       # calendar_id -> Event set when the in-flight sync ends
+        self._invalidations = {}  # calendar_id (None for all) -> invalidate() count, to spot one during a sync
+
+    # --------------------------
+    # Freebusy
+    # --------------------------
+    def freebusy(self, service_factory, calendar_ids, start, end):
+        """
+        Return the freebusy `calendars` mapping for [start, end).
+        The queried range is widened to bucket boundaries so successive
+        dashboard refreshes hit the same cache entry.
+        """
+        bucket_start = _bucket_floor(start)
+        bucket_end = _bucket_floor(end) + timedelta(minutes=FREEBUSY_BUCKET_MINUTES)
+        key = (tuple(calendar_ids), bucket_start, bucket_end)
+
+        with self._lock:
+            cached = self._freebusy.get(key)
+            if cached and time.monotonic() - cached[0] < self.ttl_seconds:
+                return cached[1]
+
+        body = {
+            "timeMin": bucket_start.isoformat(),
+            "timeMax": bucket_end.isoformat(),
+            "items": [{"id": calendar_id} for calendar_id in calendar_ids]
+        }
+        calendars = service_factory().freebusy().query(body=body).execute().get('calendars', {})
+
+        with self._lock:
+            # Old buckets can never be requested again once time has moved on
+            now = time.monotonic()
+            self._freebusy = {
+                k: v for k, v in self._freebusy.items() if now - v[0] < self.ttl_seconds
+            }
+            self._freebusy[key] = (now, calendars)
+        return calendars
+
+    # --------------------------
+    # Events
+    # --------------------------
+    def _full_sync(self, service, calendar_id):
+        """List all events from the lookback point onwards and store the sync token"""
+        time_min = (datetime.now(timezone.utc) - timedelta(days=SYNC_LOOKBACK_DAYS)).isoformat()
+        events = {}
+        page_token = None
+        while True:
+            response = service.events().list(
+                calendarId=calendar_id,
+                timeMin=time_min,
+                singleEvents=True,
+                pageToken=page_token
+            ).execute()
+            for event in response.get('items', []):
+                if event.get('status') != 'cancelled':
+                    events[event['id']] = event
+            page_token = response.get('nextPageToken')
+            if not page_token:
+                return events, response.get('nextSyncToken')
+
+    def _delta_sync(self, service, calendar_id, sync_token, events):
+        """Apply changes since the last sync to `events`; returns it with the new sync token"""
+        page_token = None
+        while True:
+            response = service.events().list(
+                calendarId=calendar_id,
+                singleEvents=True,
+                syncToken=sync_token,
+                pageToken=page_token
+            ).execute()
+            for event in response.get('items', []):
+                if event.get('status') == 'cancelled':
+                    events.pop(event['id'], None)
+                else:
+                    events[event['id']] = event
+            page_token = response.get('nextPageToken')
+            if not page_token:
+                return events, response.get('nextSyncToken')
+
+    def _sync(self, service_factory, calendar_id, sync_token, events):
+        """Fetch the calendar (without the lock); returns (events, sync token)"""
+        service = service_factory()
+        if sync_token:
+            try:
+                events, sync_token = self._delta_sync(service, calendar_id, sync_token, events)
+                logging.debug(f"Calendar delta sync for {calendar_id}")
+            except HttpError as e:
+                if e.resp.status != 410:
+                    raise
+                # Sync token expired: Google requires a fresh full sync
+                logging.info(f"🔄 Sync token expired for {calendar_id}, running full sync")
+                events, sync_token = self._full_sync(service, calendar_id)
+        else:
+            events, sync_token = self._full_sync(service, calendar_id)
+
+        # Drop events that ended before the lookback window
+        cutoff = datetime.now(timezone.utc) - timedelta(days=SYNC_LOOKBACK_DAYS)
+        events = {event_id: event for event_id, event in events.items() if _event_end(event) >= cutoff}
+        return events, sync_token
+
+    def _current_events(self, service_factory, calendar_id):
+        """The calendar's mirrored events, syncing first if they are older than the TTL"""
+        while True:
+            with self._lock:
+                synced_at = self._synced_at.get(calendar_id)
+                if synced_at is not None and time.monotonic() - synced_at < self.ttl_seconds:
+                    return list(self._events.get(calendar_id, {}).values())
+                in_flight = self._syncing.get(calendar_id)
+                if in_flight is None:
+                    done = self._syncing[calendar_id] = threading.Event()
+                    sync_token = self._sync_tokens.get(calendar_id)
+                    events = dict(self._events.get(calendar_id, {}))
+                    invalidations = self._invalidation_count(calendar_id)
+            if in_flight is not None:
+                # Another request is syncing this calendar; use its result (or retry if it failed)
+                in_flight.wait()
+                continue
+
+            try:
+                events, sync_token = self._sync(service_factory, calendar_id, sync_token, events)
+                with self._lock:
+                    self._events[calendar_id] = events
+                    self._sync_tokens[calendar_id] = sync_token
+                    # Changed while we fetched: keep the data, but pull the delta on the next read
+                    if self._invalidation_count(calendar_id) == invalidations:
+                        self._synced_at[calendar_id] = time.monotonic()
+                return list(events.values())
+            finally:
+                with self._lock:
+                    del self._syncing[calendar_id]
+                done.set()
+
+    def _invalidation_count(self, calendar_id):
+        """How often this calendar has been invalidated, directly or by a clear-all (caller holds the lock)"""
+        return self._invalidations.get(None, 0) + self._invalidations.get(calendar_id, 0)
+
+    def events(self, service_factory, calendar_id, time_min, time_max, query=None):
+        """
+        Events overlapping [time_min, time_max) sorted by start time.
+        `query` is a case-insensitive match on summary and description.
+        """
+        events = self._current_events(service_factory, calendar_id)
+
+        needle = query.lower() if query else None
+        matching = []
+        for event in events:
+            if needle and needle not in event.get('summary', '').lower() \
+                    and needle not in event.get('description', '').lower():
+                continue
+            if _event_start(event) < time_max and _event_end(event) > time_min:
+                matching.append(event)
+
+        matching.sort(key=_event_start)
+        return matching
+
+    # --------------------------
+    # Invalidation
+    # --------------------------
+    def invalidate(self, calendar_id=None):
+        """
+        Mark cached views stale after this app changes a calendar.
+        Freebusy entries are dropped; the events mirror keeps its sync token
+        so the next read only pulls the delta.
+        """
+        with self._lock:
+            self._invalidations[calendar_id] = self._invalidations.get(calendar_id, 0) + 1
+            if calendar_id is None:
+                self._freebusy.clear()
+                self._synced_at.clear()
+            else:
+                self._freebusy = {k: v for k, v in self._freebusy.items() if calendar_id not in k[0]}
+                self._synced_at.pop(calendar_id, None)
+
+
+# Process-wide cache shared by the API and in-process scheduling
+calendar_cache = CalendarCache()
@@ -0,0 +1,361 @@
+# candidate_ranking.py
+import os
+import re
+import math
+import heapq
+import array
+import logging
+import operator
+import threading
+from itertools import repeat, islice
+from skill_taxonomy import skill_taxonomy
+
+# --------------------------
+# Configuration
+# --------------------------
+PARSED_TEXT_FOLDER = 'parsed_text'
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Weighted term frequency per field (a simplified BM25F)
+FIELD_WEIGHTS = (
+    ('current_role', 2.0),
+    ('skills', 1.0),
+    ('experience_summary', 1.0),
+    ('education', 0.5),
+    ('current_company', 0.5),
+)
+RESUME_TEXT_WEIGHT = 1.0
+SKILL_PHRASE_WEIGHT = 3.0   # A whole skill ("machine learning") named in the job description
+MAX_QUERY_TERMS = 64        # Highest-IDF job description terms kept for scoring
+MAX_TEXT_CHARS = 20000      # Resume text indexed per candidate
+DENSE_FRACTION = 0.4        # Terms in at least this share of candidates are scored as dense vectors
+DENSE_CACHE_TERMS = 32      # Dense weight vectors kept (8 bytes per candidate each)
+STATS_TOLERANCE = 0.05      # Drift in corpus size or average length before every term weight is recomputed
+WARM_BATCH_SIZE = 500       # Candidates indexed per lock hold while warming in the background
+DEFAULT_TOP_K = 20
+
+STOPWORDS = frozenset('''
+a about above after all also an and any are as at be been being but by can could do does for from
+has have having he her his how i if in into is it its just may me more most must no not of on or
+our out over own please she should so such than that the their them then there these they this
+those through to under until up us very was we were what when where which while who will with
+would you your yours role job candidate candidates looking work working team strong experience
+years year plus etc including required requirements preferred responsibilities ability skills
+'''.split())
+
+_TERM_RE = re.compile(r'[a-z0-9][a-z0-9+#]*')  # Keeps "c++" and "c#" whole
+
+
+def terms(text):
+    """Lowercase terms of `text` without stopwords"""
+    return [t for t in _TERM_RE.findall(str(text).lower()) if t not in STOPWORDS]
+
+
+def is_skill(term):
+    """Skill terms are canonical skill IDs; text terms are words"""
+    return isinstance(term, int)
+
+
+def term_label(term):
+    return skill_taxonomy.name(term) if is_skill(term) else term
+
+
+class CandidateRankingIndex:
+    """
+    BM25 index over candidate fields, skills and parsed resume text, for
+    ranking candidates against a job description.
+
+    Each candidate gets an integer slot. Postings map a term to
+    {slot: weighted tf}; skills are also indexed as canonical skill IDs so
+    a job description naming "machine learning" (or "ML") scores that
+    skill rather than two loose words. Term weights (idf x saturated tf) are computed
+    per term on first use and cached; scoring accumulates them into a
+    per-slot score list - postings one by one for selective terms, a
+    whole-vector add for terms most candidates share - and top-k selection
+    is a heap over the scores.
+
+    Repository changes are only queued by `on_change` and applied on the
+    next query (or by `warm` in the background), so the resume text reads
+    never slow down the API's candidate refresh. A change only drops the
+    cached weights of the terms the changed candidates contain: corpus size
+    and average length are held fixed until they drift by STATS_TOLERANCE,
+    then every weight is recomputed.
+    """
+
+    def __init__(self, text_folder=PARSED_TEXT_FOLDER, k1=BM25_K1, b=BM25_B):
+        self.text_folder = text_folder
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.RLock()
+        self._pending = {}          # candidate_id -> candidate data, or None when removed
+        self._slots = {}            # candidate_id -> slot
+        self._ids = []              # slot -> candidate_id (None when free)
+        self._free = []
+        self._doc_terms = []        # slot -> {term: weighted tf}
+        self._lengths = array.array('d')
+        self._postings = {}         # term -> {slot: weighted tf}
+        self._norms = []            # slot -> k1 * (1 - b + b * length / avgdl)
+        self._weights = {}          # term -> (slots, weights), dropped when a posting of the term changes
+        self._dense = {}            # term -> (idf, per-slot weight vector) for very common terms
+        self._live = 0
+        self._stats_live = 0        # Corpus size and average length the cached weights use
+        self._stats_average = 1.0
+
+    # --------------------------
+    # Updates
+    # --------------------------
+    def on_change(self, event, candidate_id, new_data, old_data):
+        """Candidate repository listener"""
+        with self._lock:
+            self._pending[candidate_id] = None if event == 'removed' else new_data
+
+    def _resume_text(self, candidate_id):
+        path = os.path.join(self.text_folder, candidate_id + '.txt')
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return f.read(MAX_TEXT_CHARS)
+        except FileNotFoundError:
+            return ''
+        except OSError as e:
+            logging.warning(f"Could not read resume text for {candidate_id}: {e}")
+            return ''
+
+    def _document_terms(self, candidate_id, candidate):
+        counts = {}
+        for field, weight in FIELD_WEIGHTS:
+            value = candidate.get(field)
+            if isinstance(value, list):
+                value = ' '.join(str(v) for v in value)
+            for term in terms(value or ''):
+                counts[term] = counts.get(term, 0.0) + weight
+        for skill_id in skill_taxonomy.canonical_ids(candidate.get('skills')):
+            counts[skill_id] = SKILL_PHRASE_WEIGHT
+        for term in terms(self._resume_text(candidate_id)):
+            counts[term] = counts.get(term, 0.0) + RESUME_TEXT_WEIGHT
+        return counts
+
+    def _remove(self, candidate_id):
+        """Drop a candidate; returns (slot, terms it had), or None if it wasn't indexed"""
+        slot = self._slots.pop(candidate_id, None)
+        if slot is None:
+            return None
+        removed = self._doc_terms[slot]
+        for term in removed:
+            postings = self._postings[term]
+            del postings[slot]
+            if not postings:
+                del self._postings[term]
+        self._doc_terms[slot] = {}
+        self._ids[slot] = None
+        self._lengths[slot] = 0.0
+        self._free.append(slot)
+        self._live -= 1
+        return slot, removed
+
+    def _add(self, candidate_id, counts):
+        if self._free:
+            slot = self._free.pop()
+            self._ids[slot] = candidate_id
+            self._doc_terms[slot] = counts
+            self._lengths[slot] = sum(counts.values())
+        else:
+            slot = len(self._ids)
+            self._ids.append(candidate_id)
+            self._doc_terms.append(counts)
+            self._lengths.append(sum(counts.values()))
+        self._slots[candidate_id] = slot
+        postings = self._postings
+        for term, tf in counts.items():
+            bucket = postings.get(term)
+            if bucket is None:
+                postings[term] = {slot: tf}
+            else:
+                bucket[slot] = tf
+        self._live += 1
+        return slot
+
+    def _prepare(self, changes):
+        """(candidate_id, document terms or None) for queued changes; reads resume text, so no lock needed"""
+        return [(candidate_id, None if candidate is None else self._document_terms(candidate_id, candidate))
+                for candidate_id, candidate in changes]
+
+    def _apply(self, prepared):
+        # Caller holds the lock
+        removed, added = [], []
+        for candidate_id, counts in prepared:
+            old = self._remove(candidate_id)
+            if old is not None:
+                removed.append(old)
+            if counts is not None:
+                added.append((self._add(candidate_id, counts), counts))
+        self._update_stats(removed, added)
+
+    def _update_stats(self, removed, added):
+        average = sum(self._lengths) / self._live if self._live else 1.0
+        drift = max(abs(self._live - self._stats_live) / max(self._stats_live, 1),
+                    abs(average - self._stats_average) / self._stats_average)
+        k1, b = self.k1, self.b
+        if drift > STATS_TOLERANCE:
+            self._stats_live, self._stats_average = self._live, average
+            self._norms = [k1 * (1 - b + b * length / average) for length in self._lengths]
+            self._weights = {}
+            self._dense = {}
+            return
+
+        # Only the changed candidates' norms and entries are out of date.
+        # Dense vectors keep their idf (the term is in most candidates, so a
+        # few more or fewer barely move it) and are patched slot by slot;
+        # selective terms are dropped and recomputed on next use.
+        average = self._stats_average
+        size = len(self._ids)
+        self._norms.extend(repeat(0.0, size - len(self._norms)))
+        for idf, dense in self._dense.values():
+            dense.extend(repeat(0.0, size - len(dense)))
+        for slot, terms_before in removed:
+            for term in terms_before:
+                self._weights.pop(term, None)
+                cached = self._dense.get(term)
+                if cached is not None:
+                    cached[1][slot] = 0.0
+        k1_plus_1 = k1 + 1
+        for slot, counts in added:
+            norm = self._norms[slot] = k1 * (1 - b + b * self._lengths[slot] / average)
+            for term, tf in counts.items():
+                self._weights.pop(term, None)
+                cached = self._dense.get(term)
+                if cached is not None:
+                    cached[1][slot] = cached[0] * tf * k1_plus_1 / (tf + norm)
+
+    def _apply_pending(self):
+        # Caller holds the lock
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        self._apply(self._prepare(pending.items()))
+
+    def warm(self, batch_size=WARM_BATCH_SIZE):
+        """
+        Apply queued changes in batches, reading resume text outside the lock
+        so queries keep being answered (from what is indexed so far).
+        """
+        while True:
+            with self._lock:
+                batch = list(islice(self._pending.items(), batch_size))
+                if not batch:
+                    return
+                for candidate_id, _ in batch:
+                    del self._pending[candidate_id]
+            prepared = self._prepare(batch)
+            with self._lock:
+                # A candidate changed again meanwhile is applied from the newer queued copy
+                self._apply([item for item in prepared if item[0] not in self._pending])
+
+    def warm_in_background(self):
+        """Build the index on a daemon thread, e.g. at API start"""
+        thread = threading.Thread(target=self.warm, name='ranking-warm', daemon=True)
+        thread.start()
+        return thread
+
+    # --------------------------
+    # Scoring
+    # --------------------------
+    def _idf(self, term):
+        df = len(self._postings.get(term, ()))
+        return math.log(1 + (self._stats_live - df + 0.5) / (df + 0.5))
+
+    def _dense_weights(self, term):
+        """Weight vector over all slots (zero where the term is absent), or None for selective terms"""
+        if len(self._postings.get(term, ())) < DENSE_FRACTION * len(self._ids):
+            return None
+        cached = self._dense.get(term)
+        if cached is None:
+            dense = array.array('d', bytes(8 * len(self._ids)))
+            for slot, weight in zip(*self._term_weights(term)):
+                dense[slot] = weight
+            if len(self._dense) >= DENSE_CACHE_TERMS:
+                del self._dense[next(iter(self._dense))]
+            cached = self._dense[term] = (self._idf(term), dense)
+        return cached[1]
+
+    def _term_weights(self, term):
+        cached = self._weights.get(term)
+        if cached is None:
+            postings = self._postings.get(term, {})
+            idf = self._idf(term)
+            k1_plus_1, norms = self.k1 + 1, self._norms
+            cached = (list(postings), [idf * tf * k1_plus_1 / (tf + norms[slot]) for slot, tf in postings.items()])
+            self._weights[term] = cached
+        return cached
+
+    def _query_terms(self, job_description, max_terms):
+        """(term, query weight) pairs: job description words plus the skills it names"""
+        counts = {}
+        for term in terms(job_description):
+            counts[term] = counts.get(term, 0) + 1
+        for skill_id in skill_taxonomy.find_in_text(job_description):
+            counts[skill_id] = counts.get(skill_id, 0) + 1
+
+        weighted = [(term, 1 + math.log(count)) for term, count in counts.items() if term in self._postings]
+        weighted.sort(key=lambda item: (-self._idf(item[0]) * item[1], str(item[0])))
+        return weighted[:max_terms]
+
+    def _breakdown(self, slot, query):
+        doc = self._doc_terms[slot]
+        contributions = []
+        for term, query_weight in query:
+            tf = doc.get(term)
+            if tf:
+                score = self._idf(term) * tf * (self.k1 + 1) / (tf + self._norms[slot]) * query_weight
+                contributions.append((term, score))
+        skill_score = sum(score for term, score in contributions if is_skill(term))
+        text_score = sum(score for term, score in contributions if not is_skill(term))
+        contributions.sort(key=lambda item: -item[1])
+        return {
+            'skill_score': round(skill_score, 4),
+            'text_score': round(text_score, 4),
+            'matched_skills': [term_label(term) for term, _ in contributions if is_skill(term)],
+            'top_terms': [{'term': term_label(term), 'score': round(score, 4)} for term, score in contributions[:10]]
+        }
+
+    def rank(self, job_description, top_k=DEFAULT_TOP_K, allowed=None, max_terms=MAX_QUERY_TERMS):
+        """
+        Top-k candidates for a job description as a dict with 'results'
+        [(candidate_id, score, breakdown)] and the 'query_terms' used.
+        `allowed`, if given, restricts ranking to those candidate IDs.
+        """
+        with self._lock:
+            self._apply_pending()
+            query = self._query_terms(job_description, max_terms)
+            scores = [0.0] * len(self._ids)
+            for term, query_weight in query:
+                dense = self._dense_weights(term)
+                if dense is not None:
+                    if query_weight != 1:
+                        dense = map(operator.mul, dense, repeat(query_weight))
+                    scores = list(map(operator.add, scores, dense))
+                    continue
+                slots, weights = self._term_weights(term)
+                if query_weight == 1:
+                    for slot, weight in zip(slots, weights):
+                        scores[slot] += weight
+                else:
+                    for slot, weight in zip(slots, weights):
+                        scores[slot] += weight * query_weight
+
+            if allowed is not None:
+                slots = [self._slots[c] for c in allowed if c in self._slots]
+            else:
+                slots = range(len(scores))
+            best = heapq.nlargest(top_k, slots, key=scores.__getitem__)
+            results = [(self._ids[slot], round(scores[slot], 4), self._breakdown(slot, query))
+                       for slot in best if scores[slot] > 0]
+            return {'results': results, 'query_terms': [term_label(term) for term, _ in query]}
+
+    def __len__(self):
+        with self._lock:
+            self._apply_pending()
+            return self._live
+
+
+# Shared by the API; wire `on_change` to the candidate repository
+ranking_index = CandidateRankingIndex()
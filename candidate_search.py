@@ -0,0 +1,378 @@
+# candidate_search.py
+import re
+import bisect
+import threading
+from skill_taxonomy import skill_taxonomy
+
+# --------------------------
+# Configuration
+# --------------------------
+SEARCH_FIELDS = ('full_name', 'email', 'current_company')
+NGRAM_SIZE = 3
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+
+def normalize_text(value):
+    """Lowercase and collapse whitespace"""
+    return ' '.join(str(value).lower().split()) if value else ''
+
+
+def normalize_email(email):
+    return email.strip().lower() if isinstance(email, str) else ''
+
+
+def normalize_skill(skill):
+    return normalize_text(skill)
+
+
+def tokenize(text):
+    return _TOKEN_RE.findall(text)
+
+
+def _skill_prefix_words(skill_id):
+    """Prefix-search words for a skill: its normalized name and each word in it"""
+    name = normalize_skill(skill_taxonomy.name(skill_id))
+    return set(tokenize(name)) | {name}
+
+
+def ngrams(text, size=NGRAM_SIZE):
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+class _SortedTerms:
+    """Sorted term dictionary for prefix lookups, maintained incrementally"""
+
+    def __init__(self):
+        self.terms = []
+
+    def add(self, term):
+        i = bisect.bisect_left(self.terms, term)
+        if i == len(self.terms) or self.terms[i] != term:
+            self.terms.insert(i, term)
+
+    def discard(self, term):
+        i = bisect.bisect_left(self.terms, term)
+        if i < len(self.terms) and self.terms[i] == term:
+            del self.terms[i]
+
+    def with_prefix(self, prefix):
+        i = bisect.bisect_left(self.terms, prefix)
+        while i < len(self.terms) and self.terms[i].startswith(prefix):
+            yield self.terms[i]
+            i += 1
+
+
+def _add_posting(postings, key, candidate_id):
+    bucket = postings.get(key)
+    if bucket is None:
+        bucket = postings[key] = set()
+    bucket.add(candidate_id)
+    return len(bucket) == 1
+
+
+def _remove_posting(postings, key, candidate_id):
+    bucket = postings.get(key)
+    if bucket is None:
+        return False
+    bucket.discard(candidate_id)
+    if not bucket:
+        del postings[key]
+        return True
+    return False
+
+
+def _intersect(sets):
+    sets = sorted(sets, key=len)
+    if not sets:
+        return set()
+    result = set(sets[0])
+    for other in sets[1:]:
+        result &= other
+        if not result:
+            break
+    return result
+
+
+class CandidateSearchIndex:
+    """
+    Inverted index over candidate name/email/company and skills.
+
+    - Text search: trigram postings narrow substring queries down to a few
+      candidates, which are then verified against the stored lowercase text.
+      Queries shorter than a trigram have no postings to use and scan the
+      stored text instead (a one- or two-character `in` per candidate).
+    - Skills: canonical skill ID -> candidates postings (aliases such as
+      "js" resolve to the same ID), plus a sorted dictionary of the
+      canonical names' words for prefix matches ("java" finds "java" and
+      "javascript").
+    Updates are incremental; wire `on_change` to the candidate repository.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._text = {}            # candidate_id -> normalized searchable text
+        self._skills = {}          # candidate_id -> set of skill IDs
+        self._ngram_postings = {}
+        self._skill_postings = {}  # skill ID -> candidate ids
+        self._skill_words = {}     # word -> skill IDs whose name contains it
+        self._skill_terms = _SortedTerms()
+
+    # --------------------------
+    # Updates
+    # --------------------------
+    def add(self, candidate_id, candidate):
+        with self._lock:
+            if candidate_id in self._text:
+                self.remove(candidate_id)
+
+            text = '\n'.join(normalize_text(candidate.get(field)) for field in SEARCH_FIELDS)
+            self._text[candidate_id] = text
+            ngram_postings = self._ngram_postings
+            for gram in ngrams(text):
+                bucket = ngram_postings.get(gram)
+                if bucket is None:
+                    ngram_postings[gram] = {candidate_id}
+                else:
+                    bucket.add(candidate_id)
+
+            skills = set(skill_taxonomy.canonical_ids(candidate.get('skills')))
+            self._skills[candidate_id] = skills
+            for skill in skills:
+                if _add_posting(self._skill_postings, skill, candidate_id):
+                    for word in _skill_prefix_words(skill):
+                        if _add_posting(self._skill_words, word, skill):
+                            self._skill_terms.add(word)
+
+    def remove(self, candidate_id):
+        with self._lock:
+            text = self._text.pop(candidate_id, None)
+            if text is not None:
+                for gram in ngrams(text):
+                    _remove_posting(self._ngram_postings, gram, candidate_id)
+
+            for skill in self._skills.pop(candidate_id, ()):
+                if _remove_posting(self._skill_postings, skill, candidate_id):
+                    for word in _skill_prefix_words(skill):
+                        if _remove_posting(self._skill_words, word, skill):
+                            self._skill_terms.discard(word)
+
+    def on_change(self, event, candidate_id, new_data, old_data):
+        """Candidate repository listener"""
+        if event == 'removed':
+            self.remove(candidate_id)
+        else:
+            self.add(candidate_id, new_data)
+
+    # --------------------------
+    # Queries
+    # --------------------------
+    def search(self, query):
+        """Candidate IDs whose name, email or company contains `query`"""
+        query = normalize_text(query)
+        if not query:
+            return set(self._text)
+
+        with self._lock:
+            if len(query) < NGRAM_SIZE:
+                return {candidate_id for candidate_id, text in self._text.items() if query in text}
+
+            grams = ngrams(query)
+            postings = [self._ngram_postings.get(gram) for gram in grams]
+            if any(p is None for p in postings):
+                return set()
+            # Grams present in every document can't narrow the result
+            total = len(self._text)
+            selective = [p for p in postings if len(p) < total] or postings[:1]
+            candidates = _intersect(selective)
+            return {candidate_id for candidate_id in candidates if query in self._text[candidate_id]}
+
+    def _skill_matches(self, term, prefix=True):
+        """Candidate IDs with a skill equal to `term` (or an alias of it) or with a word starting with it"""
+        term = normalize_skill(term)
+        if not term:
+            return set()
+        skill_id = skill_taxonomy.lookup(term)
+        result = set(self._skill_postings.get(skill_id, ())) if skill_id is not None else set()
+        if not prefix:
+            return result
+
+        for word in self._skill_terms.with_prefix(term):
+            for skill in self._skill_words[word]:
+                result |= self._skill_postings[skill]
+        return result
+
+    def match_skills(self, skills, mode='all', prefix=True):
+        """
+        Candidate IDs matching a list of skill terms.
+        mode='all' requires every term (AND); mode='any' requires one (OR).
+        """
+        terms = [s for s in (normalize_skill(s) for s in skills) if s]
+        if not terms:
+            return set(self._text)
+
+        with self._lock:
+            matches = [self._skill_matches(term, prefix) for term in terms]
+        if mode == 'any':
+            return set().union(*matches)
+        return _intersect(matches)
+
+    def __len__(self):
+        return len(self._text)
+
+
+class CandidateKeyIndex:
+    """
+    Exact email / normalized-name -> candidate IDs, for joining other
+    records (e.g. scheduled interviews) to candidates without a scan.
+    Wire `on_change` to the candidate repository.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._keys = {}     # candidate_id -> (email, name)
+        self._emails = {}
+        self._names = {}
+
+    @staticmethod
+    def keys_for(candidate):
+        return normalize_email(candidate.get('email')), normalize_text(candidate.get('full_name'))
+
+    def on_change(self, event, candidate_id, new_data, old_data):
+        """Candidate repository listener"""
+        with self._lock:
+            old_keys = self._keys.pop(candidate_id, None)
+            if old_keys is not None:
+                _remove_posting(self._emails, old_keys[0], candidate_id)
+                _remove_posting(self._names, old_keys[1], candidate_id)
+            if event != 'removed':
+                email, name = self._keys[candidate_id] = self.keys_for(new_data)
+                if email:
+                    _add_posting(self._emails, email, candidate_id)
+                if name:
+                    _add_posting(self._names, name, candidate_id)
+
+    def match(self, emails=(), names=()):
+        """Candidate IDs whose email is in `emails` or name is in `names`"""
+        with self._lock:
+            result = set()
+            for email in emails:
+                result |= self._emails.get(email, set())
+            for name in names:
+                result |= self._names.get(name, set())
+            return result
+
+
+# --------------------------
+# Sorted views for pagination
+# --------------------------
+EXPERIENCE_ORDER = {'0-2 years': 0, '2-5 years': 1, '5-10 years': 2, '10+ years': 3}
+REBUILD_THRESHOLD = 256  # Pending changes beyond this trigger a full re-sort
+
+
+def _completeness_key(candidate):
+    try:
+        return int(candidate.get('profile_completeness') or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+SORT_KEYS = {
+    'name': lambda c: normalize_text(c.get('full_name')),
+    'completeness': _completeness_key,
+    'experience': lambda c: EXPERIENCE_ORDER.get(c.get('years_of_experience'), -1),
+}
+
+
+class CandidateSortIndex:
+    """
+    Keeps candidate IDs ordered by each sort key for keyset pagination.
+
+    Entries are (key, candidate_id) tuples in sorted lists. Changes are
+    queued and applied on the next read: a few are bisected into place,
+    a large batch (e.g. the initial load) triggers one re-sort.
+    """
+
+    def __init__(self, sort_keys=SORT_KEYS):
+        self._lock = threading.RLock()
+        self.sort_keys = sort_keys
+        self._entries = {name: {} for name in sort_keys}   # sort -> candidate_id -> entry
+        self._sorted = {name: [] for name in sort_keys}
+        self._pending = {name: [] for name in sort_keys}
+        self._rebuild = {name: False for name in sort_keys}
+
+    def on_change(self, event, candidate_id, new_data, old_data):
+        """Candidate repository listener"""
+        with self._lock:
+            for name, key_fn in self.sort_keys.items():
+                entries = self._entries[name]
+                old_entry = entries.pop(candidate_id, None)
+                new_entry = None
+                if event != 'removed':
+                    new_entry = (key_fn(new_data), candidate_id)
+                    entries[candidate_id] = new_entry
+                if old_entry != new_entry:
+                    pending = self._pending[name]
+                    pending.append((old_entry, new_entry))
+                    if len(pending) > REBUILD_THRESHOLD:
+                        self._rebuild[name] = True
+                        pending.clear()
+
+    def _ordered(self, name):
+        if self._rebuild[name]:
+            self._sorted[name] = sorted(self._entries[name].values())
+            self._rebuild[name] = False
+            self._pending[name].clear()
+        elif self._pending[name]:
+            ordered = self._sorted[name]
+            for old_entry, new_entry in self._pending[name]:
+                if old_entry is not None:
+                    i = bisect.bisect_left(ordered, old_entry)
+                    if i < len(ordered) and ordered[i] == old_entry:
+                        del ordered[i]
+                if new_entry is not None:
+                    bisect.insort(ordered, new_entry)
+            self._pending[name].clear()
+        return self._sorted[name]
+
+    def page(self, sort, descending=False, after=None, limit=50, allowed=None):
+        """
+        Return (candidate_ids, last_entry) for one page.
+        `after` is the last entry of the previous page; `allowed` is an
+        optional set restricting results (search/filter matches).
+        """
+        with self._lock:
+            if allowed is not None and len(allowed) <= limit * 20:
+                # Few matches: sorting them is cheaper than walking the full order
+                entries = self._entries[sort]
+                ordered = sorted((entries[c] for c in allowed if c in entries), reverse=descending)
+                if after is not None:
+                    ordered = [e for e in ordered if (e < after if descending else e > after)]
+                page = ordered[:limit]
+                return [e[1] for e in page], (page[-1] if len(ordered) > limit else None)
+
+            ordered = self._ordered(sort)
+            if descending:
+                start = bisect.bisect_left(ordered, after) - 1 if after is not None else len(ordered) - 1
+                positions = range(start, -1, -1)
+            else:
+                start = bisect.bisect_right(ordered, after) if after is not None else 0
+                positions = range(start, len(ordered))
+
+            page = []
+            has_more = False
+            for i in positions:
+                entry = ordered[i]
+                if allowed is not None and entry[1] not in allowed:
+                    continue
+                if len(page) == limit:
+                    has_more = True
+                    break
+                page.append(entry)
+            return [e[1] for e in page], (page[-1] if has_more else None)
+
+
+# Shared indexes for the API
+search_index = CandidateSearchIndex()
+sort_index = CandidateSortIndex()
+key_index = CandidateKeyIndex()
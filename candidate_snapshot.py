@@ -0,0 +1,364 @@
+# candidate_snapshot.py
+#!/usr/bin/env python3
+"""
+Compact columnar snapshot of the candidate corpus
+
+Packs every candidate JSON file into one file so analytics and a warm API
+restart read a single memory-mapped file instead of thousands of small
+indented JSON files. Formats:
+  columnar - built-in binary format (default, no dependencies)
+  arrow    - Arrow IPC file, readable by pyarrow/pandas/polars (needs pyarrow)
+  jsonl    - one compact JSON candidate per line, for ad-hoc tools (export only)
+
+    python candidate_snapshot.py [--format columnar|arrow|jsonl] [--output PATH]
+"""
+
+import os
+import sys
+import json
+import mmap
+import time
+import array
+import struct
+import logging
+import argparse
+from datetime import datetime, timezone
+from candidate_store import CandidateRecord, CandidateRepository, _INTERNED_FIELDS
+
+# Optional accelerators; the stdlib is used when they are missing
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+except ImportError:
+    pyarrow = None
+
+# --------------------------
+# Configuration
+# --------------------------
+SNAPSHOT_FILE = os.environ.get('CANDIDATE_SNAPSHOT', 'candidate_snapshot.bin')
+MAGIC = b'CANDSNP1'
+ARROW_MAGIC = b'ARROW1'
+FORMAT_VERSION = 1
+ALIGNMENT = 8
+# Set from the file's columns (id, filename, resume_filename is re-derived)
+_DERIVED_FIELDS = ('id', 'filename', 'resume_filename')
+
+
+def _dumps(value):
+    if orjson is not None:
+        return orjson.dumps(value).decode('utf-8')
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+
+_loads = orjson.loads if orjson is not None else json.loads
+
+
+def _stored_fields(data):
+    return {key: value for key, value in data.items() if key not in _DERIVED_FIELDS}
+
+
+# --------------------------
+# Built-in columnar format
+# --------------------------
+# MAGIC | uint32 header length | JSON header | column buffers (8-byte aligned)
+#
+# Columns, one value per candidate:
+#   str    - character offsets (uint64, n+1) into one UTF-8 string
+#   int64  - fixed width values
+#   dict   - int32 codes into a dictionary held in the header (-1 = absent)
+#   skills - uint32 list offsets (n+1) into int32 dictionary codes, plus
+#            a uint8 flag for candidates whose skills are stored in `extra`
+#   extra  - every other field: one JSON array of objects, parsed in one call
+class _ColumnWriter:
+    def __init__(self):
+        self.buffers = []
+        self.size = 0
+
+    def add(self, data):
+        """Queue a buffer; return its (offset, length) relative to the data section"""
+        data = bytes(data)
+        offset = self.size
+        self.buffers.append(data)
+        self.size += len(data)
+        padding = -self.size % ALIGNMENT
+        if padding:
+            self.buffers.append(b'\0' * padding)
+            self.size += padding
+        return [offset, len(data)]
+
+    def add_strings(self, values):
+        offsets = array.array('Q', [0])
+        total = 0
+        for value in values:
+            total += len(value)
+            offsets.append(total)
+        return {'type': 'str', 'offsets': self.add(offsets), 'data': self.add(''.join(values).encode('utf-8'))}
+
+
+def _dictionary_column(writer, values):
+    dictionary, codes = {}, array.array('i')
+    for value in values:
+        codes.append(-1 if value is None else dictionary.setdefault(value, len(dictionary)))
+    return {'type': 'dict', 'dictionary': list(dictionary), 'codes': writer.add(codes)}
+
+
+def _write_columnar(records, folder, path):
+    writer = _ColumnWriter()
+    rows = [(record, _stored_fields(record.data)) for record in records]
+    columns = {
+        'candidate_id': writer.add_strings([record.candidate_id for record, _ in rows]),
+        'filename': writer.add_strings([record.filename for record, _ in rows]),
+        'mtime_ns': {'type': 'int64', 'data': writer.add(array.array('q', [r.mtime_ns for r, _ in rows]))},
+        'size': {'type': 'int64', 'data': writer.add(array.array('q', [r.size for r, _ in rows]))},
+    }
+
+    for field in _INTERNED_FIELDS:
+        values = []
+        for _, data in rows:
+            value = data.get(field)
+            if isinstance(value, str):
+                del data[field]
+                values.append(value)
+            else:
+                values.append(None)  # Absent, or kept in `extra` when not a string
+        columns[field] = _dictionary_column(writer, values)
+
+    skill_dictionary, codes = {}, array.array('i')
+    offsets, in_extra = array.array('I', [0]), bytearray()
+    for _, data in rows:
+        skills = data.get('skills')
+        if isinstance(skills, list) and all(isinstance(s, str) for s in skills):
+            del data['skills']
+            codes.extend(skill_dictionary.setdefault(s, len(skill_dictionary)) for s in skills)
+            in_extra.append(0)
+        else:
+            in_extra.append(1)
+        offsets.append(len(codes))
+    columns['skills'] = {'type': 'skills', 'dictionary': list(skill_dictionary), 'offsets': writer.add(offsets),
+                         'codes': writer.add(codes), 'in_extra': writer.add(in_extra)}
+    columns['extra'] = {'type': 'json', 'data': writer.add(_dumps([data for _, data in rows]).encode('utf-8'))}
+
+    header = json.dumps({
+        'version': FORMAT_VERSION,
+        'count': len(rows),
+        'folder': folder,
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'columns': columns
+    }, ensure_ascii=False).encode('utf-8')
+    prefix = MAGIC + struct.pack('<I', len(header)) + header
+    prefix += b'\0' * (-len(prefix) % ALIGNMENT)
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(prefix)
+        for buffer in writer.buffers:
+            f.write(buffer)
+    os.replace(tmp_path, path)
+
+
+def _read_columnar(mapped):
+    (header_length,) = struct.unpack_from('<I', mapped, len(MAGIC))
+    start = len(MAGIC) + 4
+    header = json.loads(mapped[start:start + header_length])
+    if header.get('version') != FORMAT_VERSION:
+        raise ValueError(f"unsupported snapshot version {header.get('version')}")
+    base = start + header_length
+    base += -base % ALIGNMENT
+
+    def buffer(location, typecode):
+        offset, length = location
+        values = array.array(typecode)
+        values.frombytes(mapped[base + offset:base + offset + length])
+        return values
+
+    def strings(column):
+        offsets = buffer(column['offsets'], 'Q')
+        offset, length = column['data']
+        text = mapped[base + offset:base + offset + length].decode('utf-8')
+        return [text[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)]
+
+    columns = header['columns']
+    count = header['count']
+    candidate_ids = strings(columns['candidate_id'])
+    filenames = strings(columns['filename'])
+    mtimes = buffer(columns['mtime_ns']['data'], 'q')
+    sizes = buffer(columns['size']['data'], 'q')
+    offset, length = columns['extra']['data']
+    rows = _loads(mapped[base + offset:base + offset + length])
+
+    for field in _INTERNED_FIELDS:
+        column = columns.get(field)
+        if column is None:
+            continue
+        dictionary = [sys.intern(value) for value in column['dictionary']]
+        for data, code in zip(rows, buffer(column['codes'], 'i')):
+            if code >= 0:
+                data[field] = dictionary[code]
+
+    column = columns['skills']
+    dictionary = [sys.intern(value) for value in column['dictionary']]
+    offsets = buffer(column['offsets'], 'I')
+    codes = buffer(column['codes'], 'i')
+    in_extra = buffer(column['in_extra'], 'B')
+    for i, data in enumerate(rows):
+        if not in_extra[i]:
+            data['skills'] = [dictionary[code] for code in codes[offsets[i]:offsets[i + 1]]]
+
+    records = []
+    for i in range(count):
+        data = rows[i]
+        data['id'] = candidate_ids[i]
+        data['filename'] = filenames[i]
+        records.append(CandidateRecord(candidate_ids[i], filenames[i], mtimes[i], sizes[i], data))
+    return header['folder'], records
+
+
+# --------------------------
+# Arrow IPC (optional)
+# --------------------------
+def _write_arrow(records, folder, path):
+    if pyarrow is None:
+        raise RuntimeError("pyarrow is not installed; use the columnar format")
+    records = list(records)
+    columns = {
+        'candidate_id': [r.candidate_id for r in records],
+        'filename': [r.filename for r in records],
+        'mtime_ns': pyarrow.array([r.mtime_ns for r in records], pyarrow.int64()),
+        'size': pyarrow.array([r.size for r in records], pyarrow.int64()),
+    }
+    for field in _INTERNED_FIELDS:
+        values = [r.data.get(field) for r in records]
+        columns[field] = pyarrow.array([v if isinstance(v, str) else None for v in values],
+                                       pyarrow.string()).dictionary_encode()
+    columns['skills'] = pyarrow.array(
+        [[s for s in r.data.get('skills') or [] if isinstance(s, str)] for r in records],
+        pyarrow.list_(pyarrow.string()))
+    # The full record, so a restart restores fields of any type exactly
+    columns['record'] = pyarrow.array([_dumps(_stored_fields(r.data)) for r in records], pyarrow.string())
+
+    table = pyarrow.table(columns).replace_schema_metadata({'folder': folder, 'version': str(FORMAT_VERSION)})
+    tmp_path = path + '.tmp'
+    with pyarrow.OSFile(tmp_path, 'wb') as sink:
+        with pyarrow.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+
+
+def _read_arrow(path):
+    if pyarrow is None:
+        raise RuntimeError("pyarrow is not installed; cannot read an Arrow snapshot")
+    with pyarrow.memory_map(path, 'r') as source:
+        table = pyarrow.ipc.open_file(source).read_all()
+    folder = (table.schema.metadata or {}).get(b'folder', b'').decode('utf-8')
+    columns = table.select(['candidate_id', 'filename', 'mtime_ns', 'size', 'record']).to_pydict()
+    records = []
+    for candidate_id, filename, mtime_ns, size, record in zip(*columns.values()):
+        data = _loads(record)
+        data['id'] = candidate_id
+        data['filename'] = filename
+        records.append(CandidateRecord(candidate_id, filename, mtime_ns, size, data))
+    return folder, records
+
+
+def _write_jsonl(records, folder, path):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(_dumps(dict(record.data, id=record.candidate_id, filename=record.filename)) + '\n')
+    os.replace(tmp_path, path)
+
+
+WRITERS = {'columnar': _write_columnar, 'arrow': _write_arrow, 'jsonl': _write_jsonl}
+
+
+# --------------------------
+# Public API
+# --------------------------
+def write_snapshot(records, folder, path=SNAPSHOT_FILE, fmt='columnar'):
+    """Write CandidateRecords (atomically); returns a summary dict"""
+    if fmt not in WRITERS:
+        raise ValueError(f"unknown snapshot format {fmt!r}; expected one of {', '.join(WRITERS)}")
+    started = time.perf_counter()
+    records = list(records)
+    WRITERS[fmt](records, folder, path)
+    return {
+        'path': path,
+        'format': fmt,
+        'candidates': len(records),
+        'bytes': os.path.getsize(path),
+        'seconds': round(time.perf_counter() - started, 3)
+    }
+
+
+def read_snapshot(path=SNAPSHOT_FILE):
+    """(source folder, [CandidateRecord]) from a columnar or Arrow snapshot, memory-mapped"""
+    with open(path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            magic = mapped[:len(MAGIC)]
+            if magic == MAGIC:
+                return _read_columnar(mapped)
+    if magic.startswith(ARROW_MAGIC):
+        return _read_arrow(path)
+    raise ValueError(f"{path} is not a candidate snapshot")
+
+
+def save_repository_snapshot(repository, path=SNAPSHOT_FILE, fmt='columnar'):
+    """Snapshot what a CandidateRepository currently holds"""
+    folder, records = repository.records()
+    if folder is None:
+        return None
+    summary = write_snapshot(records, folder, path, fmt)
+    logging.info(f"📦 Candidate snapshot: {summary['candidates']} candidates, "
+                 f"{summary['bytes'] / 1024:.0f} KB in {summary['seconds']}s -> {path}")
+    return summary
+
+
+def boot_repository(repository, path=SNAPSHOT_FILE):
+    """
+    Seed an empty repository from the snapshot. The repository's next
+    refresh still stats every file and re-reads those changed since the
+    snapshot, so a stale snapshot only costs those re-reads.
+    Returns the number of candidates loaded.
+    """
+    if not os.path.exists(path):
+        return 0
+    started = time.perf_counter()
+    try:
+        folder, records = read_snapshot(path)
+    except (OSError, ValueError, KeyError, RuntimeError) as e:
+        logging.warning(f"⚠️ Ignoring candidate snapshot {path}: {e}")
+        return 0
+    loaded = repository.load_records(folder, records)
+    if loaded:
+        logging.info(f"📦 Booted {loaded} candidates from {path} in {(time.perf_counter() - started) * 1000:.0f} ms")
+    return loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export the candidate corpus as a compact snapshot')
+    parser.add_argument('--format', choices=sorted(WRITERS), default='columnar')
+    parser.add_argument('--output', help=f'Snapshot path (default {SNAPSHOT_FILE}, .arrow/.jsonl for other formats)')
+    args = parser.parse_args()
+
+    path = args.output
+    if not path:
+        path = SNAPSHOT_FILE if args.format == 'columnar' else os.path.splitext(SNAPSHOT_FILE)[0] + '.' + args.format
+    repository = CandidateRepository()
+    repository.refresh(force=True)
+    summary = save_repository_snapshot(repository, path, args.format)
+    if summary is None:
+        logging.warning("⚠️ No candidate folder found; nothing exported")
+    return summary
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        format="%(asctime)s [%(levelname)s] %(message)s",
+        level=logging.INFO
+    )
+    main()
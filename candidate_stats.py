@@ -0,0 +1,143 @@
+# candidate_stats.py
+import os
+import threading
+from skill_taxonomy import skill_taxonomy
+
+# --------------------------
+# Configuration
+# --------------------------
+TOP_SKILLS = 10
+TOP_COMPANIES = 5
+UNSPECIFIED_COMPANY = 'Not specified'
+
+
+class TopKCounter:
+    """
+    Counter with O(1) increment/decrement and top-k in O(k + gaps).
+
+    Keys are grouped in buckets by count; the highest non-empty bucket is
+    tracked so top-k walks down from it instead of sorting every key.
+    """
+
+    def __init__(self):
+        self.counts = {}
+        self._buckets = {}   # count -> {key: None} (insertion ordered)
+        self._max = 0
+
+    def _move(self, key, old, new):
+        if old:
+            bucket = self._buckets[old]
+            del bucket[key]
+            if not bucket:
+                del self._buckets[old]
+        if new:
+            self._buckets.setdefault(new, {})[key] = None
+            self.counts[key] = new
+            if new > self._max:
+                self._max = new
+        else:
+            self.counts.pop(key, None)
+        while self._max and self._max not in self._buckets:
+            self._max -= 1
+
+    def add(self, key, delta=1):
+        old = self.counts.get(key, 0)
+        self._move(key, old, max(old + delta, 0))
+
+    def top(self, k):
+        result = []
+        count = self._max
+        while count > 0 and len(result) < k:
+            for key in self._buckets.get(count, ()):
+                result.append((key, count))
+                if len(result) == k:
+                    break
+            count -= 1
+        return result
+
+    def __len__(self):
+        return len(self.counts)
+
+
+class CandidateStats:
+    """
+    Skill, experience and company aggregates kept current incrementally.
+    Wire `on_change` to the candidate repository; every add, update or
+    removal adjusts the counters, so reading them never rescans candidates.
+    Skills are counted by canonical skill ID, so aliases share one bucket.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.skills = TopKCounter()
+        self.companies = TopKCounter()
+        self.experience_levels = {}
+        self.candidate_count = 0
+
+    def _apply(self, candidate, sign):
+        for skill_id in skill_taxonomy.canonical_ids(candidate.get('skills')):
+            self.skills.add(skill_id, sign)
+
+        exp = candidate.get('years_of_experience', 'Unknown')
+        count = self.experience_levels.get(exp, 0) + sign
+        if count > 0:
+            self.experience_levels[exp] = count
+        else:
+            self.experience_levels.pop(exp, None)
+
+        company = candidate.get('current_company', 'Unknown')
+        if company != UNSPECIFIED_COMPANY and isinstance(company, str):
+            self.companies.add(company, sign)
+
+        self.candidate_count += sign
+
+    def on_change(self, event, candidate_id, new_data, old_data):
+        """Candidate repository listener"""
+        with self._lock:
+            if old_data is not None:
+                self._apply(old_data, -1)
+            if new_data is not None:
+                self._apply(new_data, 1)
+
+    def snapshot(self, top_skills=TOP_SKILLS, top_companies=TOP_COMPANIES):
+        with self._lock:
+            return {
+                'top_skills': [{'skill': skill_taxonomy.name(s), 'count': c} for s, c in self.skills.top(top_skills)],
+                'experience_levels': dict(self.experience_levels),
+                'top_companies': [{'company': n, 'count': c} for n, c in self.companies.top(top_companies)],
+            }
+
+
+class FolderCounter:
+    """
+    File counts per folder, recomputed only when the folder's mtime changes.
+    Adding or removing files (what the pipeline stages do) bumps the
+    directory mtime, so an unchanged folder costs one stat call.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cache = {}  # (folder, predicate) -> (mtime_ns, count)
+
+    def count(self, folder, predicate):
+        try:
+            mtime = os.stat(folder).st_mtime_ns
+        except FileNotFoundError:
+            return 0
+
+        key = (folder, predicate)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached and cached[0] == mtime:
+                return cached[1]
+
+        with os.scandir(folder) as entries:
+            count = sum(1 for entry in entries if predicate(entry.name))
+        with self._lock:
+            self._cache[key] = (mtime, count)
+        return count
+
+
+# Shared aggregates for the API
+candidate_stats = CandidateStats()
+folder_counter = FolderCounter()
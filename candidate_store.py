@@ -0,0 +1,291 @@
+# candidate_store.py
+import os
+import sys
+import json
+import time
+import logging
+import threading
+
+# --------------------------
+# Configuration
+# --------------------------
+ENRICHED_FOLDER = 'enriched_json'
+PARSED_FOLDER = 'parsed_json'
+RESUME_FOLDER = 'resumes'
+RESUME_EXTENSIONS = ('pdf', 'docx', 'doc')  # Preference order when several exist
+REFRESH_INTERVAL_SECONDS = 2.0
+
+# Fields with a small set of repeated values; interning shares one string object
+_INTERNED_FIELDS = ('current_company', 'current_role', 'years_of_experience', 'enrichment_status', 'education')
+
+
+def _compact(candidate):
+    """Intern repeated string values so thousands of records share them"""
+    for field in _INTERNED_FIELDS:
+        value = candidate.get(field)
+        if isinstance(value, str):
+            candidate[field] = sys.intern(value)
+    skills = candidate.get('skills')
+    if isinstance(skills, list):
+        candidate['skills'] = [sys.intern(s) if isinstance(s, str) else s for s in skills]
+    return candidate
+
+
+class CandidateRecord:
+    __slots__ = ('candidate_id', 'filename', 'mtime_ns', 'size', 'data')
+
+    def __init__(self, candidate_id, filename, mtime_ns, size, data):
+        self.candidate_id = candidate_id
+        self.filename = filename
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.data = data  # API view of the candidate, shared by all readers
+
+
+class CandidateRepository:
+    """
+    Process-wide, in-memory view of the candidate JSON folder.
+
+    The first read loads every file. Later reads rescan the folder at most
+    once per refresh interval and re-parse only files whose mtime or size
+    changed. The candidate -> resume file map is rebuilt only when the
+    resume folder's mtime changes.
+    Listeners registered with `add_listener` receive every change as
+    (event, candidate_id, new_data, old_data) with event one of
+    'added', 'updated' or 'removed', so derived indexes stay incremental.
+    Records returned by `all()` / `get()` are shared and must not be mutated.
+    Refreshes build a new records dict and swap it in, so reads don't lock.
+    """
+
+    def __init__(self, enriched_folder=ENRICHED_FOLDER, parsed_folder=PARSED_FOLDER,
+                 resume_folder=RESUME_FOLDER, refresh_interval=REFRESH_INTERVAL_SECONDS):
+        self.enriched_folder = enriched_folder
+        self.parsed_folder = parsed_folder
+        self.resume_folder = resume_folder
+        self.refresh_interval = refresh_interval
+
+        self._lock = threading.RLock()
+        self._records = {}          # candidate_id -> CandidateRecord
+        self._folder = None
+        self._last_refresh = None
+        self._resume_map = {}       # candidate_id -> resume filename
+        self._resume_folder_mtime = None
+        self._listeners = []
+
+    # --------------------------
+    # Refresh
+    # --------------------------
+    def _source_folder(self):
+        # First try enriched folder, fallback to parsed
+        return self.enriched_folder if os.path.exists(self.enriched_folder) else self.parsed_folder
+
+    def _refresh_resume_map(self):
+        try:
+            mtime = os.stat(self.resume_folder).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if mtime == self._resume_folder_mtime:
+            return False
+
+        resume_map = {}
+        if mtime is not None:
+            rank = {ext: i for i, ext in enumerate(RESUME_EXTENSIONS)}
+            with os.scandir(self.resume_folder) as entries:
+                for entry in entries:
+                    base_name, dot, ext = entry.name.rpartition('.')
+                    ext = ext.lower()
+                    if not dot or ext not in rank:
+                        continue
+                    current = resume_map.get(base_name)
+                    if current is None or rank[ext] < rank[current.rpartition('.')[2].lower()]:
+                        resume_map[base_name] = entry.name
+
+        self._resume_map = resume_map
+        self._resume_folder_mtime = mtime
+        return True
+
+    def _load(self, folder, filename, candidate_id, stat):
+        try:
+            with open(os.path.join(folder, filename), 'r', encoding='utf-8') as f:
+                candidate = json.load(f)
+        except Exception as e:
+            logging.error(f"Error loading candidate {filename}: {e}")
+            return None
+
+        candidate = _compact(candidate)
+        candidate['id'] = candidate_id
+        candidate['filename'] = filename
+        resume_filename = self._resume_map.get(candidate_id)
+        if resume_filename:
+            candidate['resume_filename'] = resume_filename
+        return CandidateRecord(candidate_id, filename, stat.st_mtime_ns, stat.st_size, candidate)
+
+    def refresh(self, force=False):
+        """Reload changed candidate files; returns (added, updated, removed) counts"""
+        with self._lock:
+            now = time.monotonic()
+            if not force and self._last_refresh is not None and now - self._last_refresh < self.refresh_interval:
+                return (0, 0, 0)
+            self._last_refresh = now
+
+            resumes_changed = self._refresh_resume_map()
+            folder = self._source_folder()
+            # Changes go into a copy that is swapped in at the end, so readers
+            # iterating the current dict without the lock never see it change
+            current, records = self._records, None
+            if folder != self._folder:
+                for candidate_id, record in current.items():
+                    self._notify('removed', candidate_id, None, record.data)
+                current, records = {}, {}
+                self._folder = folder
+
+            seen = set()
+            added = updated = 0
+            if os.path.exists(folder):
+                with os.scandir(folder) as entries:
+                    for entry in entries:
+                        if not entry.name.endswith('.json'):
+                            continue
+                        candidate_id = entry.name[:-len('.json')]
+                        seen.add(candidate_id)
+                        stat = entry.stat()
+                        record = current.get(candidate_id)
+                        if record and record.mtime_ns == stat.st_mtime_ns and record.size == stat.st_size:
+                            continue
+                        new_record = self._load(folder, entry.name, candidate_id, stat)
+                        if new_record is None:
+                            continue
+                        if records is None:
+                            records = dict(current)
+                        records[candidate_id] = new_record
+                        if record is None:
+                            added += 1
+                            self._notify('added', candidate_id, new_record.data, None)
+                        else:
+                            updated += 1
+                            self._notify('updated', candidate_id, new_record.data, record.data)
+
+            removed_ids = [candidate_id for candidate_id in current if candidate_id not in seen]
+            if removed_ids and records is None:
+                records = dict(current)
+            for candidate_id in removed_ids:
+                record = records.pop(candidate_id)
+                self._notify('removed', candidate_id, None, record.data)
+
+            if resumes_changed:
+                records, relinked = self._apply_resume_map(records if records is not None else current)
+                updated += relinked
+            if records is not None and records is not current:
+                self._records = records
+
+            if added or updated or removed_ids:
+                logging.info(f"🔄 Candidate repository: +{added} ~{updated} -{len(removed_ids)} ({len(self._records)} total)")
+            return (added, updated, len(removed_ids))
+
+    def _apply_resume_map(self, records, notify=True):
+        """
+        Point each record at its current resume file. Published data is never
+        mutated: changed records get new data dicts in a copy of `records`
+        (returned as-is when nothing changed) and, with `notify`, listeners
+        see 'updated'.
+        Returns (records, number of records changed).
+        """
+        changed = None
+        for candidate_id, record in records.items():
+            resume_filename = self._resume_map.get(candidate_id)
+            if record.data.get('resume_filename') == resume_filename:
+                continue
+            data = dict(record.data)
+            if resume_filename:
+                data['resume_filename'] = resume_filename
+            else:
+                del data['resume_filename']
+            if changed is None:
+                changed = {}
+            changed[candidate_id] = CandidateRecord(candidate_id, record.filename, record.mtime_ns, record.size, data)
+            if notify:
+                self._notify('updated', candidate_id, data, record.data)
+
+        if changed is None:
+            return records, 0
+        records = dict(records)
+        records.update(changed)
+        return records, len(changed)
+
+    def _notify(self, event, candidate_id, new_data, old_data):
+        for listener in self._listeners:
+            try:
+                listener(event, candidate_id, new_data, old_data)
+            except Exception as e:
+                logging.error(f"Candidate listener failed on {event} {candidate_id}: {e}")
+
+    def add_listener(self, listener):
+        """Register a change listener; existing records are replayed as 'added'"""
+        with self._lock:
+            self._listeners.append(listener)
+            for candidate_id, record in self._records.items():
+                listener('added', candidate_id, record.data, None)
+
+    def load_records(self, folder, records):
+        """
+        Seed an empty repository with records loaded elsewhere (a snapshot).
+        Ignored if records are already loaded or `folder` is no longer the
+        source folder. Returns the number of records taken.
+        """
+        with self._lock:
+            if self._records or folder != self._source_folder():
+                return 0
+            self._folder = folder
+            self._refresh_resume_map()
+            records, _ = self._apply_resume_map({record.candidate_id: record for record in records},
+                                                notify=False)
+            self._records = records
+            for candidate_id, record in records.items():
+                self._notify('added', candidate_id, record.data, None)
+            return len(self._records)
+
+    def records(self):
+        """(source folder, list of CandidateRecord) as currently loaded"""
+        with self._lock:
+            return self._folder, list(self._records.values())
+
+    def invalidate(self):
+        """Force the next read to rescan (used after in-process writes)"""
+        with self._lock:
+            self._last_refresh = None
+            self._resume_folder_mtime = None
+
+    # --------------------------
+    # Reads
+    # --------------------------
+    def all(self):
+        """All candidates as shared dicts"""
+        self.refresh()
+        records = self._records
+        return [record.data for record in records.values()]
+
+    def get(self, candidate_id):
+        """One candidate, or None"""
+        self.refresh()
+        record = self._records.get(candidate_id)
+        return record.data if record else None
+
+    def get_many(self, candidate_ids):
+        """Candidates for the given IDs, skipping unknown ones (no refresh)"""
+        records = self._records
+        return [records[candidate_id].data for candidate_id in candidate_ids if candidate_id in records]
+
+    def resume_for(self, candidate_id):
+        """Resume filename for a candidate, or None"""
+        with self._lock:
+            if self._refresh_resume_map():
+                self._records, _ = self._apply_resume_map(self._records)
+            return self._resume_map.get(candidate_id)
+
+    def __len__(self):
+        self.refresh()
+        return len(self._records)
+
+
+# Shared by every request handler in the process
+candidate_repository = CandidateRepository()
@@ -1,18 +1,23 @@
 # fetch_resumes.py
 import os
+import json
 import base64
 import logging
 import hashlib
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+import time
 from googleapiclient.errors import HttpError
+from google_clients import client_pool
+from progress_events import emit
+from metrics import registry
+from profiling import profile_stage
+from tracing import install_trace_logging, span, new_trace_id, trace_index
 
 # Setup logging
 logging.basicConfig(
     format="%(asctime)s [%(levelname)s] %(message)s",
     level=logging.INFO
 )
+install_trace_logging()
 
 # --------------------------
 # Configuration
@@ -62,47 +67,30 @@ def load_existing_hashes(resume_folder="resumes"):
                     logging.warning(f"Could not calculate hash for {filename}: {e}")
     return hashes
 
+GMAIL_CALLS = registry.counter('gmail_api_calls_total', 'Gmail API calls', ['method', 'status'])
+GMAIL_LATENCY = registry.histogram('gmail_api_seconds', 'Gmail API call latency', ['method'])
+ATTACHMENT_BYTES = registry.counter('gmail_attachment_bytes_total', 'Resume attachment bytes downloaded')
+
+def gmail_call(method, request):
+    """Execute a Gmail API request, recording its latency and outcome"""
+    started = time.perf_counter()
+    try:
+        response = request.execute()
+    except Exception:
+        GMAIL_CALLS.inc(method=method, status='error')
+        raise
+    finally:
+        GMAIL_LATENCY.observe(time.perf_counter() - started, method=method)
+    GMAIL_CALLS.inc(method=method, status='ok')
+    return response
+
 def authenticate_gmail():
     """
-    Authenticate with Gmail API and return service object
+    Authenticate with Gmail API and return service object.
+    Credentials and the built client come from the shared pool, so repeated
+    calls in one process don't re-read the token or reload discovery.
     """
-    creds = None
-    
-    if os.path.exists(TOKEN_FILE):
-        try:
-            creds = Credentials.from_authorized_user_file(TOKEN_FILE, SCOPES)
-            logging.info("✓ Loaded existing credentials")
-        except Exception as e:
-            logging.warning(f"Could not load existing credentials: {e}")
-    
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            try:
-                logging.info("🔄 Refreshing expired credentials...")
-                creds.refresh()
-            except Exception as e:
-                logging.warning(f"Could not refresh credentials: {e}")
-                creds = None
-        
-        if not creds:
-            if not os.path.exists(CREDENTIALS_FILE):
-                raise FileNotFoundError(
-                    f"❌ {CREDENTIALS_FILE} not found. "
-                    "Please download it from Google Cloud Console."
-                )
-            
-            logging.info("🔐 Starting OAuth flow...")
-            flow = InstalledAppFlow.from_client_secrets_file(CREDENTIALS_FILE, SCOPES)
-            creds = flow.run_local_server(port=0)
-            logging.info("✓ Authentication successful")
-        
-        with open(TOKEN_FILE, 'w') as token:
-            token.write(creds.to_json())
-            logging.info(f"✓ Saved credentials to {TOKEN_FILE}")
-    
-    service = build('gmail', 'v1', credentials=creds)
-    logging.info("✓ Gmail service initialized")
-    return service
+    return client_pool.service('gmail', 'v1', SCOPES, TOKEN_FILE, CREDENTIALS_FILE)
 
 def fetch_resume_emails(service, query="has:attachment"):
     """
@@ -110,7 +98,7 @@ def fetch_resume_emails(service, query="has:attachment"):
     """
     try:
         logging.info(f"🔍 Searching emails with query: '{query}'")
-        results = service.users().messages().list(userId='me', q=query, maxResults=100).execute()
+        results = gmail_call('messages.list', service.users().messages().list(userId='me', q=query, maxResults=100))
         messages = results.get('messages', [])
         
         # Filter out already processed emails
@@ -146,7 +134,7 @@ def download_attachments(service, messages, save_folder="resumes"):
         
         try:
             logging.info(f"\n[{i}/{len(messages)}] Processing message {msg_id[:8]}...")
-            message = service.users().messages().get(userId='me', id=msg_id).execute()
+            message = gmail_call('messages.get', service.users().messages().get(userId='me', id=msg_id))
             
             # Get email metadata
             headers = message['payload'].get('headers', [])
@@ -173,51 +161,64 @@ def download_attachments(service, messages, save_folder="resumes"):
                     
                     if 'attachmentId' in part.get('body', {}):
                         att_id = part['body']['attachmentId']
-                        
-                        try:
-                            logging.info(f"   📎 Downloading: {filename}")
-                            attachment = service.users().messages().attachments().get(
-                                userId='me', 
-                                messageId=msg_id, 
-                                id=att_id
-                            ).execute()
-                            
-                            file_data = base64.urlsafe_b64decode(attachment['data'].encode('UTF-8'))
+                        trace_id = new_trace_id()
+
+                        with span('fetch', trace_id, message_id=msg_id, attachment=filename) as trace:
+                            try:
+                                logging.info(f"   📎 Downloading: {filename}")
+                                download_started = time.perf_counter()
+                                attachment = gmail_call('attachments.get', service.users().messages().attachments().get(
+                                    userId='me', 
+                                    messageId=msg_id, 
+                                    id=att_id
+                                ))
                             
-                            # Calculate hash of downloaded content
-                            file_hash = hashlib.md5(file_data).hexdigest()
+                                file_data = base64.urlsafe_b64decode(attachment['data'].encode('UTF-8'))
+                                ATTACHMENT_BYTES.inc(len(file_data))
                             
-                            # Check for duplicate
-                            if file_hash in existing_hashes:
-                                logging.info(f"   ⏭️ Skipped duplicate: {filename}")
-                                results['duplicates'] += 1
-                                continue
+                                # Calculate hash of downloaded content
+                                file_hash = hashlib.md5(file_data).hexdigest()
                             
-                            # Save file with unique name if exists
-                            base_name, ext = os.path.splitext(filename)
-                            save_path = os.path.join(save_folder, filename)
-                            counter = 1
+                                # Check for duplicate
+                                if file_hash in existing_hashes:
+                                    trace['status'] = 'duplicate'
+                                    logging.info(f"   ⏭️ Skipped duplicate: {filename}")
+                                    results['duplicates'] += 1
+                                    continue
                             
-                            while os.path.exists(save_path):
-                                filename = f"{base_name}_{counter}{ext}"
+                                # Save file with unique name if exists
+                                base_name, ext = os.path.splitext(filename)
                                 save_path = os.path.join(save_folder, filename)
-                                counter += 1
+                                counter = 1
                             
-                            with open(save_path, 'wb') as f:
-                                f.write(file_data)
+                                while os.path.exists(save_path):
+                                    filename = f"{base_name}_{counter}{ext}"
+                                    save_path = os.path.join(save_folder, filename)
+                                    counter += 1
                             
-                            # Add to existing hashes
-                            existing_hashes.add(file_hash)
-                            file_size = len(file_data) / 1024  # KB
-                            logging.info(f"   ✅ Downloaded: {filename} ({file_size:.1f} KB)")
-                            results['downloaded'] += 1
+                                with open(save_path, 'wb') as f:
+                                    f.write(file_data)
                             
-                            # Mark email as processed
-                            save_processed_email(msg_id)
+                                # Ingestion: later stages find this resume's trace by its name
+                                trace_index.assign(filename, trace_id, source='gmail')
+                                trace['resume'] = filename
+                                
+                                # Add to existing hashes
+                                existing_hashes.add(file_hash)
+                                file_size = len(file_data) / 1024  # KB
+                                logging.info(f"   ✅ Downloaded: {filename} ({file_size:.1f} KB)")
+                                results['downloaded'] += 1
+                                emit('fetch', 'downloaded', filename=filename, bytes=len(file_data),
+                                     seconds=round(time.perf_counter() - download_started, 4),
+                                     downloaded=results['downloaded'])
                             
-                        except Exception as e:
-                            logging.error(f"   ❌ Error downloading attachment: {e}")
-                            results['errors'] += 1
+                                # Mark email as processed
+                                save_processed_email(msg_id)
+                            
+                            except Exception as e:
+                                trace['status'] = 'error'
+                                logging.error(f"   ❌ Error downloading attachment: {e}")
+                                results['errors'] += 1
                     else:
                         logging.warning(f"   ⚠️ Attachment ID not found for: {filename}")
                         results['skipped'] += 1
@@ -253,29 +254,30 @@ def download_attachments(service, messages, save_folder="resumes"):
 # Entry point
 # --------------------------
 if __name__ == "__main__":
-    try:
-        logging.info("🚀 Starting Gmail resume fetcher...")
-        logging.info("="*60)
+    with profile_stage('fetch'):
+        try:
+            logging.info("🚀 Starting Gmail resume fetcher...")
+            logging.info("="*60)
         
-        # Authenticate
-        service = authenticate_gmail()
+            # Authenticate
+            service = authenticate_gmail()
         
-        # Fetch emails
-        emails = fetch_resume_emails(service)
+            # Fetch emails
+            emails = fetch_resume_emails(service)
         
-        if not emails:
-            logging.warning("⚠️ No new emails found with attachments")
-        else:
-            # Download attachments
-            results = download_attachments(service, emails)
-            
-            if results['downloaded'] > 0:
-                logging.info(f"✅ Successfully downloaded {results['downloaded']} new resume(s)")
+            if not emails:
+                logging.warning("⚠️ No new emails found with attachments")
             else:
-                logging.info("ℹ️ No new resumes downloaded (all were duplicates or skipped)")
+                # Download attachments
+                results = download_attachments(service, emails)
+            
+                if results['downloaded'] > 0:
+                    logging.info(f"✅ Successfully downloaded {results['downloaded']} new resume(s)")
+                else:
+                    logging.info("ℹ️ No new resumes downloaded (all were duplicates or skipped)")
         
-    except FileNotFoundError as e:
-        logging.error(str(e))
-    except Exception as e:
-        logging.error(f"❌ Unexpected error: {e}")
-        raise
\ No newline at end of file
+        except FileNotFoundError as e:
+            logging.error(str(e))
+        except Exception as e:
+            logging.error(f"❌ Unexpected error: {e}")
+            raise
\ No newline at end of file
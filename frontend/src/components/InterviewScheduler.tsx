@@ -3,6 +3,7 @@ import { Card } from "@/components/ui/card";
 import { Button } from "@/components/ui/button";
 import { Badge } from "@/components/ui/badge";
 import { Calendar, Clock, User, Mail, ExternalLink, Trash2, Plus, CalendarDays, X } from "lucide-react";
+import { waitForJob } from "@/lib/jobs";
 
 const API_BASE = "http://localhost:5000/api";
 
@@ -68,7 +69,7 @@ const InterviewScheduler = ({ candidates }) => {
         body: JSON.stringify(scheduleParams)
       });
       
-      const data = await res.json();
+      const data = await waitForJob(res);
       
       if (data.success) {
         setMessage(`✅ ${data.message}`);
@@ -0,0 +1,32 @@
+// Long-running API calls (pipeline stages, Gmail fetch, parsing, scheduling)
+// answer 202 with a job ID; the result comes from polling /api/jobs/<id>.
+
+const POLL_INTERVAL_MS = 1000;
+
+export type JobProgress = {
+  current: number;
+  total: number | null;
+  message: string;
+};
+
+const sleep = (ms: number) => new Promise((resolve) => setTimeout(resolve, ms));
+
+// Resolves with the job's result once it finishes: `{ success: false, error }`
+// if the job failed. Responses that aren't a 202 are returned as-is.
+export async function waitForJob(res: Response, onProgress?: (progress: JobProgress) => void) {
+  const data = await res.json();
+  if (res.status !== 202 || !data.status_url) {
+    return data;
+  }
+
+  const statusUrl = new URL(data.status_url, res.url).toString();
+  while (true) {
+    await sleep(POLL_INTERVAL_MS);
+    const statusRes = await fetch(statusUrl);
+    if (!statusRes.ok) throw new Error("Lost track of background job");
+    const { job } = await statusRes.json();
+    onProgress?.(job.progress);
+    if (job.status === "succeeded") return job.result;
+    if (job.status === "failed") return { success: false, error: job.error };
+  }
+}
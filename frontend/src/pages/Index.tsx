@@ -53,6 +53,7 @@ import {
 import InterviewScheduler from "@/components/InterviewScheduler";
 import PipelineStats from "@/components/PipelineStats";
 import ResumeViewer from "@/components/ResumeViewer";
+import { waitForJob } from "@/lib/jobs";
 
 const API_BASE = "http://localhost:5000/api";
 
@@ -192,7 +193,7 @@ const Index = () => {
         body: JSON.stringify({ query: "has:attachment" }),
       });
       if (!res.ok) throw new Error("Failed to fetch resumes");
-      const data = await res.json();
+      const data = await waitForJob(res);
       setFetchMessage(data.success ? `✓ ${data.message}` : `✗ ${data.error}`);
       if (data.success) {
         setTimeout(fetchCandidates, 1000);
@@ -208,7 +209,7 @@ const Index = () => {
       setFetchMessage("🔄 Parsing all resumes...");
       const res = await fetch(`${API_BASE}/parse/all`, { method: "POST" });
       if (!res.ok) throw new Error("Failed to parse resumes");
-      const data = await res.json();
+      const data = await waitForJob(res);
       setFetchMessage(data.success ? `✓ ${data.message}` : `✗ ${data.error}`);
       if (data.success) {
         setTimeout(fetchCandidates, 1000);
@@ -226,7 +227,7 @@ const Index = () => {
         method: "POST",
       });
       if (!res.ok) throw new Error("Failed to enrich candidates");
-      const data = await res.json();
+      const data = await waitForJob(res);
       setFetchMessage(data.success ? `✓ ${data.message}` : `✗ ${data.error}`);
       if (data.success) {
         setTimeout(fetchCandidates, 1000);
@@ -336,7 +337,7 @@ const Index = () => {
       
       if (!res.ok) throw new Error('Failed to run pipeline stage');
       
-      const data = await res.json();
+      const data = await waitForJob(res);
       
       if (data.success) {
         return { success: true, data };
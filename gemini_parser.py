@@ -7,6 +7,10 @@ import logging
 import hashlib
 import google.generativeai as genai
 from google.api_core.exceptions import ResourceExhausted, GoogleAPIError
+from progress_events import emit
+from metrics import registry, ITEM_FAILURES
+from profiling import profile_stage
+from tracing import install_trace_logging, span, trace_index
 
 # --------------------------
 # Setup logging
@@ -15,6 +19,7 @@ logging.basicConfig(
     format="%(asctime)s [%(levelname)s] %(message)s",
     level=logging.INFO
 )
+install_trace_logging()
 
 # --------------------------
 # Load Gemini API key
@@ -27,6 +32,13 @@ if not GEMINI_API_KEY:
 genai.configure(api_key=GEMINI_API_KEY)
 model = genai.GenerativeModel("gemini-2.5-pro")
 
+# --------------------------
+# Metrics
+# --------------------------
+GEMINI_LATENCY = registry.histogram('gemini_request_seconds', 'Gemini generate_content latency', ['outcome'])
+GEMINI_TOKENS = registry.counter('gemini_tokens_total', 'Tokens reported by Gemini usage metadata', ['kind'])
+GEMINI_RETRIES = registry.counter('gemini_retries_total', 'Gemini requests retried after a failure', ['reason'])
+
 PROCESSED_CANDIDATES_FILE = 'processed_candidates.json'
 
 def load_processed_candidates():
@@ -79,6 +91,16 @@ def safe_parse_json(raw_output):
         logging.warning(f"JSON decode error: {e}")
         return None
 
+def record_token_usage(response):
+    """Count prompt/response tokens when the SDK reports usage metadata"""
+    usage = getattr(response, 'usage_metadata', None)
+    if usage is None:
+        return
+    for kind, field in (('prompt', 'prompt_token_count'), ('response', 'candidates_token_count')):
+        count = getattr(usage, field, None)
+        if count:
+            GEMINI_TOKENS.inc(count, kind=kind)
+
 def parse_resume_text(text, retries=3, backoff=10):
     """
     Send resume text to Gemini and get structured JSON response.
@@ -99,15 +121,25 @@ def parse_resume_text(text, retries=3, backoff=10):
     {text}
     """
 
+    def record_failure(outcome):
+        GEMINI_LATENCY.observe(time.perf_counter() - request_started, outcome=outcome)
+        if attempt < retries:
+            GEMINI_RETRIES.inc(reason=outcome)
+
     for attempt in range(1, retries + 1):
+        request_started = time.perf_counter()
         try:
             response = model.generate_content(prompt)
+            record_token_usage(response)
             data = safe_parse_json(response.text)
             if data:
+                GEMINI_LATENCY.observe(time.perf_counter() - request_started, outcome='ok')
                 return data
             else:
+                record_failure('invalid_json')
                 logging.warning("Failed to parse JSON, retrying...")
         except ResourceExhausted as e:
+            record_failure('quota')
             wait_time = getattr(e, "retry_delay", None)
             if wait_time:
                 logging.warning(f"Quota exceeded, retrying in {wait_time.seconds} seconds...")
@@ -116,9 +148,11 @@ def parse_resume_text(text, retries=3, backoff=10):
                 logging.warning(f"Quota exceeded, waiting {backoff}s before retry...")
                 time.sleep(backoff)
         except GoogleAPIError as e:
+            record_failure('api_error')
             logging.error(f"API error: {e}. Retrying in {backoff}s...")
             time.sleep(backoff)
         except Exception as e:
+            record_failure('error')
             logging.error(f"Unexpected error: {e}. Retrying in {backoff}s...")
             time.sleep(backoff)
     logging.error("Failed to parse resume after multiple attempts.")
@@ -141,31 +175,41 @@ def process_all_resumes(input_folder="parsed_text", output_folder="parsed_json")
             with open(file_path, "r", encoding="utf-8") as f:
                 text = f.read()
             
-            logging.info(f"🧠 Parsing {filename} ...")
-            parsed = parse_resume_text(text)
+            trace_id = trace_index.ensure(filename, source='text')
+            with span('gemini', trace_id, resume=filename) as trace:
+                logging.info(f"🧠 Parsing {filename} ...")
+                parse_started = time.perf_counter()
+                parsed = parse_resume_text(text)
+                parse_seconds = time.perf_counter() - parse_started
             
-            if parsed:
-                # Check if candidate already exists
-                candidate_id = create_candidate_id(parsed)
-                if candidate_id in processed_candidates:
-                    logging.info(f"🔄 Skipping duplicate candidate: {parsed.get('full_name', 'Unknown')}")
-                    results['duplicates'] += 1
-                    continue
+                if parsed:
+                    # Check if candidate already exists
+                    candidate_id = create_candidate_id(parsed)
+                    if candidate_id in processed_candidates:
+                        trace['status'] = 'duplicate'
+                        logging.info(f"🔄 Skipping duplicate candidate: {parsed.get('full_name', 'Unknown')}")
+                        results['duplicates'] += 1
+                        continue
                 
-                # Save candidate data
-                json_filename = os.path.splitext(filename)[0] + ".json"
-                with open(os.path.join(output_folder, json_filename), "w", encoding="utf-8") as out:
-                    json.dump(parsed, out, indent=2)
+                    # Save candidate data; the trace ID travels with it to later stages
+                    parsed['trace_id'] = trace_id
+                    json_filename = os.path.splitext(filename)[0] + ".json"
+                    with open(os.path.join(output_folder, json_filename), "w", encoding="utf-8") as out:
+                        json.dump(parsed, out, indent=2)
                 
-                # Mark as processed
-                save_candidate_hash(parsed)
-                processed_candidates.add(candidate_id)
+                    # Mark as processed
+                    save_candidate_hash(parsed)
+                    processed_candidates.add(candidate_id)
                 
-                logging.info(f"✅ Saved structured data: {json_filename}")
-                results['processed'] += 1
-            else:
-                logging.error(f"❌ Failed to parse {filename}")
-                results['failed'] += 1
+                    logging.info(f"✅ Saved structured data: {json_filename}")
+                    results['processed'] += 1
+                    emit('gemini', 'parsed', filename=json_filename,
+                         seconds=round(parse_seconds, 4), parsed=results['processed'])
+                else:
+                    trace['status'] = 'failed'
+                    logging.error(f"❌ Failed to parse {filename}")
+                    results['failed'] += 1
+                    ITEM_FAILURES.inc(stage='gemini')
 
     # Print summary
     logging.info(f"\n{'='*60}")
@@ -180,5 +224,6 @@ def process_all_resumes(input_folder="parsed_text", output_folder="parsed_json")
 # Entry point
 # --------------------------
 if __name__ == "__main__":
-    process_all_resumes()
-    logging.info("✅ Resume processing completed!")
\ No newline at end of file
+    with profile_stage('gemini'):
+        process_all_resumes()
+        logging.info("✅ Resume processing completed!")
\ No newline at end of file
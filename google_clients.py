@@ -0,0 +1,218 @@
+# google_clients.py
+import os
+import json
+import queue
+import logging
+import threading
+from datetime import datetime, timedelta
+
+import httplib2
+import google_auth_httplib2
+from google.auth.transport.requests import Request
+from google.oauth2.credentials import Credentials
+from google_auth_oauthlib.flow import InstalledAppFlow
+from googleapiclient.discovery import build_from_document
+from googleapiclient.discovery_cache import get_static_doc
+
+# --------------------------
+# Configuration
+# --------------------------
+CREDENTIALS_FILE = 'credentials.json'
+DISCOVERY_CACHE_FOLDER = '.discovery_cache'
+DISCOVERY_URL = 'https://www.googleapis.com/discovery/v1/apis/{api}/{version}/rest'
+REFRESH_MARGIN = timedelta(minutes=5)  # Refresh tokens this long before they expire
+HTTP_TIMEOUT_SECONDS = 60
+MAX_IDLE_CONNECTIONS = 8               # Idle transports kept per service
+
+
+# --------------------------
+# Discovery documents
+# --------------------------
+def load_discovery_document(api_name, version, cache_folder=DISCOVERY_CACHE_FOLDER):
+    """
+    Load a discovery document from the on-disk cache, falling back to the
+    copy bundled with googleapiclient and finally to the discovery service.
+    """
+    cache_path = os.path.join(cache_folder, f"{api_name}.{version}.json")
+    if os.path.exists(cache_path):
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            logging.warning(f"Could not read cached discovery document {cache_path}: {e}")
+
+    content = get_static_doc(api_name, version)
+    if content is None:
+        logging.info(f"🌐 Downloading discovery document for {api_name} {version}")
+        response, content = httplib2.Http(timeout=HTTP_TIMEOUT_SECONDS).request(
+            DISCOVERY_URL.format(api=api_name, version=version)
+        )
+        if response.status != 200:
+            raise RuntimeError(f"Could not download discovery document for {api_name} {version}: HTTP {response.status}")
+
+    document = json.loads(content)
+    os.makedirs(cache_folder, exist_ok=True)
+    with open(cache_path, 'w', encoding='utf-8') as f:
+        json.dump(document, f)
+    return document
+
+
+# --------------------------
+# Transports
+# --------------------------
+class PooledHttp:
+    """
+    httplib2-compatible transport shared by every thread using a service.
+
+    httplib2 connections are not thread-safe, so each request checks an
+    AuthorizedHttp out of a process-wide queue (creating one when none is
+    idle) and puts it back afterwards, keeping its connection open for the
+    next caller. Batch requests go through here too.
+    """
+
+    def __init__(self, credentials, max_idle=MAX_IDLE_CONNECTIONS):
+        self.credentials = credentials  # Read by googleapiclient to refresh batch credentials
+        self._idle = queue.LifoQueue(maxsize=max_idle)  # Most recently used first: its socket is warmest
+
+    def request(self, *args, **kwargs):
+        try:
+            http = self._idle.get_nowait()
+        except queue.Empty:
+            http = google_auth_httplib2.AuthorizedHttp(self.credentials, http=httplib2.Http(timeout=HTTP_TIMEOUT_SECONDS))
+        try:
+            return http.request(*args, **kwargs)
+        finally:
+            try:
+                self._idle.put_nowait(http)
+            except queue.Full:
+                http.close()
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+# --------------------------
+# Client pool
+# --------------------------
+class ClientPool:
+    """
+    Process-wide pool of Google API clients.
+
+    Credentials are loaded once per token file and refreshed shortly before
+    they expire. Discovery documents are parsed once. One service object per
+    API and token file is shared by every thread: its requests run on
+    transports checked out of a PooledHttp, so Flask's thread-per-request
+    model reuses open connections instead of building a client per thread.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._credentials = {}   # token_file -> Credentials
+        self._credential_locks = {}
+        self._documents = {}     # (api_name, version) -> discovery document
+        self._services = {}      # (api_name, version, token_file) -> (Credentials, service)
+
+    # --------------------------
+    # Credentials
+    # --------------------------
+    def _credential_lock(self, token_file):
+        with self._lock:
+            return self._credential_locks.setdefault(token_file, threading.Lock())
+
+    def _needs_refresh(self, creds):
+        if not creds.valid:
+            return True
+        expiry = creds.expiry  # naive UTC datetime, or None for non-expiring tokens
+        return expiry is not None and expiry - datetime.utcnow() < REFRESH_MARGIN
+
+    def credentials(self, scopes, token_file, credentials_file=CREDENTIALS_FILE):
+        """Return valid credentials for a token file, refreshing or re-authorising as needed"""
+        creds = self._credentials.get(token_file)
+        if creds is not None and not self._needs_refresh(creds):
+            return creds
+
+        with self._credential_lock(token_file):
+            creds = self._credentials.get(token_file)
+            if creds is not None and not self._needs_refresh(creds):
+                return creds
+
+            if creds is None and os.path.exists(token_file):
+                try:
+                    creds = Credentials.from_authorized_user_file(token_file, scopes)
+                    logging.info(f"✓ Loaded existing credentials from {token_file}")
+                except Exception as e:
+                    logging.warning(f"Could not load existing credentials: {e}")
+
+            if creds and self._needs_refresh(creds) and creds.refresh_token:
+                try:
+                    logging.info("🔄 Refreshing credentials before expiry...")
+                    creds.refresh(Request())
+                except Exception as e:
+                    logging.warning(f"Could not refresh credentials: {e}")
+                    creds = None
+
+            if not creds or not creds.valid:
+                if not os.path.exists(credentials_file):
+                    raise FileNotFoundError(
+                        f"❌ {credentials_file} not found. "
+                        "Please download it from Google Cloud Console."
+                    )
+                logging.info("🔐 Starting OAuth flow...")
+                flow = InstalledAppFlow.from_client_secrets_file(credentials_file, scopes)
+                creds = flow.run_local_server(port=0)
+                logging.info("✓ Authentication successful")
+
+            with open(token_file, 'w', encoding='utf-8') as token:
+                token.write(creds.to_json())
+
+            self._credentials[token_file] = creds
+            return creds
+
+    # --------------------------
+    # Services
+    # --------------------------
+    def _document(self, api_name, version):
+        key = (api_name, version)
+        document = self._documents.get(key)
+        if document is None:
+            with self._lock:
+                document = self._documents.get(key)
+                if document is None:
+                    document = load_discovery_document(api_name, version)
+                    self._documents[key] = document
+        return document
+
+    def service(self, api_name, version, scopes, token_file, credentials_file=CREDENTIALS_FILE):
+        """Return the shared service object for the API, building it on first use"""
+        creds = self.credentials(scopes, token_file, credentials_file)
+
+        key = (api_name, version, token_file)
+        cached = self._services.get(key)
+        if cached is not None and cached[0] is creds:
+            return cached[1]
+
+        # Rebuilt when the credentials object changes (re-authorisation)
+        service = build_from_document(self._document(api_name, version), http=PooledHttp(creds))
+        with self._lock:
+            stale = self._services.get(key)
+            self._services[key] = (creds, service)
+        if stale is not None:
+            stale[1].close()  # Only idle transports; requests in flight finish normally
+        logging.info(f"✓ {api_name} {version} service initialized")
+        return service
+
+    def reset(self):
+        """Forget cached credentials and services (e.g. after a token file changes)"""
+        with self._lock:
+            self._credentials.clear()
+            services, self._services = self._services, {}
+        for _, service in services.values():
+            service.close()
+
+
+# Shared by every module in the process
+client_pool = ClientPool()
@@ -0,0 +1,187 @@
+# interview_store.py
+import os
+import json
+import time
+import bisect
+import logging
+import threading
+from calendar_availability import parse_calendar_time
+from candidate_search import normalize_text, normalize_email
+
+# --------------------------
+# Configuration
+# --------------------------
+SCHEDULE_LOG_FOLDER = 'scheduled_interviews'
+REFRESH_INTERVAL_SECONDS = 2.0
+
+
+def _is_interview_record(filename):
+    return filename.endswith('.json') and not filename.startswith('summary_')
+
+
+def _start_timestamp(record):
+    try:
+        return parse_calendar_time(record['start_time']).timestamp()
+    except (KeyError, TypeError, ValueError):
+        return float('-inf')
+
+
+class InterviewStore:
+    """
+    In-memory index of the scheduled-interview JSON records.
+
+    Records are indexed by event ID, candidate email and name, and start
+    time (a sorted list for date-range queries). Like the candidate
+    repository, the folder is rescanned with stat calls only - immediately
+    when its mtime changes, otherwise at most once per refresh interval -
+    and only new or changed files are parsed.
+    """
+
+    def __init__(self, folder=SCHEDULE_LOG_FOLDER, refresh_interval=REFRESH_INTERVAL_SECONDS):
+        self.folder = folder
+        self.refresh_interval = refresh_interval
+        self._lock = threading.RLock()
+        self._records = {}      # filename -> (mtime_ns, size, record)
+        self._by_event = {}     # event_id -> set of filenames
+        self._by_email = {}     # email key -> set of filenames
+        self._by_name = {}      # name key -> set of filenames
+        self._by_start = []     # sorted (start timestamp, filename)
+        self._folder_mtime = None
+        self._last_refresh = None
+
+    # --------------------------
+    # Index maintenance
+    # --------------------------
+    @staticmethod
+    def _link(index, key, filename):
+        if key:
+            index.setdefault(key, set()).add(filename)
+
+    @staticmethod
+    def _unlink(index, key, filename):
+        names = index.get(key)
+        if names is not None:
+            names.discard(filename)
+            if not names:
+                del index[key]
+
+    def _index(self, filename, record):
+        self._link(self._by_event, record.get('event_id'), filename)
+        self._link(self._by_email, normalize_email(record.get('email')), filename)
+        self._link(self._by_name, normalize_text(record.get('candidate_name')), filename)
+        bisect.insort(self._by_start, (_start_timestamp(record), filename))
+
+    def _unindex(self, filename, record):
+        self._unlink(self._by_event, record.get('event_id'), filename)
+        self._unlink(self._by_email, normalize_email(record.get('email')), filename)
+        self._unlink(self._by_name, normalize_text(record.get('candidate_name')), filename)
+        entry = (_start_timestamp(record), filename)
+        i = bisect.bisect_left(self._by_start, entry)
+        if i < len(self._by_start) and self._by_start[i] == entry:
+            del self._by_start[i]
+
+    def _drop(self, filename):
+        cached = self._records.pop(filename, None)
+        if cached is not None:
+            self._unindex(filename, cached[2])
+
+    def refresh(self, force=False):
+        with self._lock:
+            try:
+                folder_mtime = os.stat(self.folder).st_mtime_ns
+            except FileNotFoundError:
+                folder_mtime = None
+            now = time.monotonic()
+            if (not force and folder_mtime == self._folder_mtime and self._last_refresh is not None
+                    and now - self._last_refresh < self.refresh_interval):
+                return
+            self._folder_mtime = folder_mtime
+            self._last_refresh = now
+
+            seen = set()
+            if folder_mtime is not None:
+                with os.scandir(self.folder) as entries:
+                    for entry in entries:
+                        if not _is_interview_record(entry.name):
+                            continue
+                        seen.add(entry.name)
+                        stat = entry.stat()
+                        cached = self._records.get(entry.name)
+                        if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+                            continue
+                        try:
+                            with open(entry.path, 'r', encoding='utf-8') as f:
+                                record = json.load(f)
+                        except Exception as e:
+                            logging.warning(f"Error loading interview {entry.name}: {e}")
+                            continue
+                        record['filename'] = entry.name
+                        self._drop(entry.name)
+                        self._records[entry.name] = (stat.st_mtime_ns, stat.st_size, record)
+                        self._index(entry.name, record)
+
+            for filename in [name for name in self._records if name not in seen]:
+                self._drop(filename)
+
+    def invalidate(self):
+        """Force the next read to rescan (used after in-process writes)"""
+        with self._lock:
+            self._last_refresh = None
+
+    # --------------------------
+    # Reads
+    # --------------------------
+    def _get(self, filenames):
+        return [self._records[name][2] for name in filenames if name in self._records]
+
+    def all(self, newest_first=True):
+        """All interviews ordered by start time"""
+        self.refresh()
+        with self._lock:
+            order = reversed(self._by_start) if newest_first else self._by_start
+            return self._get(name for _, name in order)
+
+    def between(self, start=None, end=None, newest_first=True):
+        """Interviews starting in [start, end); either bound may be None"""
+        self.refresh()
+        with self._lock:
+            lo = 0 if start is None else bisect.bisect_left(self._by_start, (start.timestamp(),))
+            hi = len(self._by_start) if end is None else bisect.bisect_left(self._by_start, (end.timestamp(),))
+            entries = self._by_start[lo:hi]
+            if newest_first:
+                entries.reverse()
+            return self._get(name for _, name in entries)
+
+    def by_event(self, event_id):
+        """Records (usually one) for a Calendar event ID"""
+        self.refresh()
+        with self._lock:
+            return self._get(sorted(self._by_event.get(event_id, ())))
+
+    def for_candidate(self, email=None, name=None):
+        """Interviews matching a candidate's email or normalized name"""
+        self.refresh()
+        with self._lock:
+            filenames = set(self._by_email.get(normalize_email(email), ()))
+            filenames |= self._by_name.get(normalize_text(name), set())
+            return self._get(sorted(filenames))
+
+    def candidate_keys(self):
+        """(emails, names) of every candidate with a scheduled interview"""
+        self.refresh()
+        with self._lock:
+            return set(self._by_email), set(self._by_name)
+
+    def remove(self, filename):
+        """Delete an interview record file and drop it from the indexes"""
+        with self._lock:
+            os.remove(os.path.join(self.folder, filename))
+            self._drop(filename)
+
+    def __len__(self):
+        self.refresh()
+        return len(self._records)
+
+
+# Shared by the API
+interview_store = InterviewStore()
@@ -0,0 +1,166 @@
+# job_queue.py
+import uuid
+import logging
+import threading
+from collections import deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+# --------------------------
+# Configuration
+# --------------------------
+MAX_WORKERS = 4
+DEFAULT_TYPE_LIMIT = 1
+MAX_FINISHED_JOBS = 200  # Finished jobs kept for status queries
+
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+class Job:
+    """A unit of background work with status, progress and result"""
+
+    def __init__(self, job_type, func, args, kwargs):
+        self.job_id = uuid.uuid4().hex
+        self.job_type = job_type
+        self.status = QUEUED
+        self.progress = {'current': 0, 'total': None, 'message': ''}
+        self.result = None
+        self.error = None
+        self.created_at = _now()
+        self.started_at = None
+        self.finished_at = None
+        self._func = func
+        self._args = args
+        self._kwargs = kwargs
+        self._done = threading.Event()
+
+    def update(self, current=None, total=None, message=None):
+        """Report progress from inside the job"""
+        if current is not None:
+            self.progress['current'] = current
+        if total is not None:
+            self.progress['total'] = total
+        if message is not None:
+            self.progress['message'] = message
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+    @property
+    def finished(self):
+        return self._done.is_set()
+
+    def to_dict(self, include_result=True):
+        data = {
+            'job_id': self.job_id,
+            'type': self.job_type,
+            'status': self.status,
+            'progress': dict(self.progress),
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'error': self.error
+        }
+        if include_result:
+            data['result'] = self.result
+        return data
+
+
+class JobQueue:
+    """
+    Background job runner backed by a local thread pool.
+
+    Each job type has a concurrency limit (default 1); extra jobs of that
+    type wait in a FIFO queue instead of occupying a worker, so e.g. two
+    pipeline runs can never overlap. Several job types can share one limit
+    (`share_limit`) when they touch the same files. The job function
+    receives the Job as its first argument for progress reporting.
+    """
+
+    def __init__(self, max_workers=MAX_WORKERS, type_limits=None):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+        self._lock = threading.Lock()
+        self._type_limits = dict(type_limits or {})
+        self._slots = {}      # job_type -> shared limit name; a type is its own slot by default
+        self._running = {}    # slot -> running count
+        self._waiting = {}    # slot -> deque of jobs
+        self._jobs = OrderedDict()
+
+    def set_limit(self, job_type, limit):
+        with self._lock:
+            self._type_limits[job_type] = limit
+
+    def share_limit(self, slot, *job_types):
+        """Make `job_types` count against one limit, set with set_limit(slot, n)"""
+        with self._lock:
+            for job_type in job_types:
+                self._slots[job_type] = slot
+
+    def submit(self, job_type, func, *args, **kwargs):
+        """Queue a job and return it immediately"""
+        job = Job(job_type, func, args, kwargs)
+        with self._lock:
+            self._jobs[job.job_id] = job
+            self._prune()
+            slot = self._slots.get(job_type, job_type)
+            limit = self._type_limits.get(slot, DEFAULT_TYPE_LIMIT)
+            if self._running.get(slot, 0) < limit:
+                self._start(job)
+            else:
+                self._waiting.setdefault(slot, deque()).append(job)
+                logging.info(f"⏳ Job {job.job_id[:8]} ({job_type}) queued behind running jobs")
+        return job
+
+    def _start(self, job):
+        # Caller holds the lock
+        slot = self._slots.get(job.job_type, job.job_type)
+        self._running[slot] = self._running.get(slot, 0) + 1
+        self._executor.submit(self._run, job)
+
+    def _run(self, job):
+        job.status = RUNNING
+        job.started_at = _now()
+        logging.info(f"▶️ Job {job.job_id[:8]} ({job.job_type}) started")
+        try:
+            job.result = job._func(job, *job._args, **job._kwargs)
+            job.status = SUCCEEDED
+            logging.info(f"✅ Job {job.job_id[:8]} ({job.job_type}) finished")
+        except Exception as e:
+            job.error = str(e)
+            job.status = FAILED
+            logging.error(f"❌ Job {job.job_id[:8]} ({job.job_type}) failed: {e}")
+        finally:
+            job.finished_at = _now()
+            job._done.set()
+            with self._lock:
+                slot = self._slots.get(job.job_type, job.job_type)
+                self._running[slot] -= 1
+                waiting = self._waiting.get(slot)
+                if waiting:
+                    self._start(waiting.popleft())
+
+    def _prune(self):
+        # Caller holds the lock; drop the oldest finished jobs beyond the cap
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self, job_type=None):
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [job for job in jobs if job_type is None or job.job_type == job_type]
+
+
+# Shared by the API; long-running operations are serialized per type
+job_queue = JobQueue()
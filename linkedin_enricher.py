@@ -4,12 +4,17 @@ import json
 import logging
 import re
 import hashlib
+from progress_events import emit
+from profiling import profile_stage
+from skill_taxonomy import skill_taxonomy
+from tracing import install_trace_logging, span, trace_index
 
 # Setup logging
 logging.basicConfig(
     format="%(asctime)s [%(levelname)s] %(message)s",
     level=logging.INFO
 )
+install_trace_logging()
 
 ENRICHED_CANDIDATES_FILE = 'enriched_candidates.json'
 
@@ -23,23 +28,30 @@ def load_enriched_candidates():
             return set()
     return set()
 
-def save_enriched_candidate(candidate_data):
-    """Save hash of enriched candidate data"""
+def save_enriched_candidate(candidate_data, candidate_id=None):
+    """Save hash of enriched candidate data (or the ID computed before enrichment)"""
     processed = load_enriched_candidates()
     
-    candidate_id = create_candidate_id(candidate_data)
+    candidate_id = candidate_id or create_candidate_id(candidate_data)
     processed.add(candidate_id)
     
     with open(ENRICHED_CANDIDATES_FILE, 'w') as f:
         json.dump(list(processed), f)
 
 def create_candidate_id(candidate_data):
-    """Create unique ID based on candidate's core information"""
+    """
+    Create unique ID based on candidate's core information.
+    Uses the skills as parsed (kept as `raw_skills` after enrichment), so a
+    candidate gets the same ID before and after skills are canonicalized.
+    """
+    skills = candidate_data.get('raw_skills') or candidate_data.get('skills') or []
+    if isinstance(skills, str):
+        skills = [s.strip() for s in skills.split(',')]
     key_fields = [
         candidate_data.get('full_name', ''),
         candidate_data.get('email', ''),
         candidate_data.get('phone', ''),
-        ' '.join(candidate_data.get('skills', [])),
+        ' '.join(str(s) for s in skills),
         candidate_data.get('education', '')
     ]
     
@@ -99,6 +111,11 @@ def enrich_candidate(candidate):
         # If skills is a string, split by comma
         candidate["skills"] = [s.strip() for s in candidate["skills"].split(",")]
     
+    # Canonicalize skills ("JS", "Javascript" -> "JavaScript"), keeping what the parser returned
+    if candidate["skills"]:
+        candidate.setdefault("raw_skills", candidate["skills"])
+        candidate["skills"] = skill_taxonomy.canonicalize(candidate["raw_skills"])
+    
     # Add metadata
     candidate["enrichment_status"] = "completed"
     candidate["profile_completeness"] = calculate_profile_completeness(candidate)
@@ -186,29 +203,36 @@ def process_all_candidates(input_folder="parsed_json", output_folder="enriched_j
             with open(file_path, "r", encoding="utf-8") as f:
                 candidate = json.load(f)
             
-            logging.info(f"\nProcessing: {filename}")
+            # Candidates parsed before tracing was added fall back to the trace index
+            trace_id = candidate.get('trace_id') or trace_index.ensure(filename, source='json')
+            candidate['trace_id'] = trace_id
             
-            # Check if already enriched
-            candidate_id = create_candidate_id(candidate)
-            if candidate_id in enriched_candidates:
-                logging.info(f"🔄 Skipping already enriched candidate: {candidate.get('full_name', 'Unknown')}")
-                results['duplicates'] += 1
-                continue
+            with span('enrich', trace_id, resume=filename) as trace:
+                logging.info(f"\nProcessing: {filename}")
             
-            # Enrich candidate data
-            enriched_candidate = enrich_candidate(candidate)
+                # Check if already enriched
+                candidate_id = create_candidate_id(candidate)
+                if candidate_id in enriched_candidates:
+                    trace['status'] = 'duplicate'
+                    logging.info(f"🔄 Skipping already enriched candidate: {candidate.get('full_name', 'Unknown')}")
+                    results['duplicates'] += 1
+                    continue
             
-            # Save enriched data
-            out_path = os.path.join(output_folder, filename)
-            with open(out_path, "w", encoding="utf-8") as out:
-                json.dump(enriched_candidate, out, indent=2, ensure_ascii=False)
+                # Enrich candidate data
+                enriched_candidate = enrich_candidate(candidate)
             
-            # Mark as enriched
-            save_enriched_candidate(enriched_candidate)
-            enriched_candidates.add(candidate_id)
+                # Save enriched data
+                out_path = os.path.join(output_folder, filename)
+                with open(out_path, "w", encoding="utf-8") as out:
+                    json.dump(enriched_candidate, out, indent=2, ensure_ascii=False)
             
-            logging.info(f"✅ Saved enriched data: {filename}")
-            results['success'] += 1
+                # Mark as enriched under the ID the next run's check computes
+                save_enriched_candidate(enriched_candidate, candidate_id)
+                enriched_candidates.add(candidate_id)
+            
+                logging.info(f"✅ Saved enriched data: {filename}")
+                results['success'] += 1
+                emit('enrich', 'enriched', filename=filename, enriched=results['success'])
             
         except json.JSONDecodeError as e:
             logging.error(f"❌ Failed to read JSON {filename}: {e}")
@@ -232,10 +256,11 @@ def process_all_candidates(input_folder="parsed_json", output_folder="enriched_j
 # Entry point
 # --------------------------
 if __name__ == "__main__":
-    logging.info("🚀 Starting LinkedIn enrichment process...")
-    results = process_all_candidates()
+    with profile_stage('enrich'):
+        logging.info("🚀 Starting LinkedIn enrichment process...")
+        results = process_all_candidates()
     
-    if results['success'] > 0:
-        logging.info(f"✅ Enriched {results['success']} new candidates!")
-    else:
-        logging.info("ℹ️ No new candidates were enriched (all were duplicates)")
\ No newline at end of file
+        if results['success'] > 0:
+            logging.info(f"✅ Enriched {results['success']} new candidates!")
+        else:
+            logging.info("ℹ️ No new candidates were enriched (all were duplicates)")
\ No newline at end of file
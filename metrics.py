@@ -0,0 +1,319 @@
+# metrics.py
+import os
+import sys
+import json
+import time
+import atexit
+import bisect
+import threading
+from contextlib import contextmanager
+from progress_events import PROGRESS_ENV
+
+# --------------------------
+# Configuration
+# --------------------------
+METRICS_PREFIX = '@@metrics '      # Registry snapshot written by a stage subprocess at exit
+REPORT_FOLDER = 'pipeline_reports'
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape_label(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class Counter:
+    """Monotonic counter with optional labels"""
+
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}   # label values tuple -> float
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+    def total(self):
+        with self._lock:
+            return sum(self._values.values())
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [(self.name, _format_labels(self.labelnames, key), value) for key, value in items]
+
+    def snapshot(self):
+        with self._lock:
+            return [[list(key), value] for key, value in self._values.items()]
+
+    def merge(self, data):
+        with self._lock:
+            for key, value in data:
+                key = tuple(key)
+                self._values[key] = self._values.get(key, 0) + value
+
+
+class Histogram:
+    """Cumulative-bucket histogram (Prometheus semantics) with optional labels"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._values = {}   # label values tuple -> [bucket counts..., sum, count]
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            state[index] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def summary(self, **labels):
+        """(count, sum) for one label set"""
+        state = self._values.get(self._key(labels))
+        return (state[-1], state[-2]) if state else (0, 0.0)
+
+    def samples(self):
+        with self._lock:
+            items = sorted((key, list(state)) for key, state in self._values.items())
+        result = []
+        for key, state in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), state[:-2]):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                result.append((self.name + '_bucket', _format_labels(self.labelnames, key, le), cumulative))
+            labels = _format_labels(self.labelnames, key)
+            result.append((self.name + '_sum', labels, state[-2]))
+            result.append((self.name + '_count', labels, state[-1]))
+        return result
+
+    def snapshot(self):
+        with self._lock:
+            return [[list(key), list(state)] for key, state in self._values.items()]
+
+    def merge(self, data):
+        with self._lock:
+            for key, state in data:
+                key = tuple(key)
+                current = self._values.get(key)
+                if current is None or len(current) != len(state):
+                    self._values[key] = list(state)
+                else:
+                    self._values[key] = [a + b for a, b in zip(current, state)]
+
+
+class MetricsRegistry:
+    """
+    Process-wide collection of counters and histograms.
+
+    Stage subprocesses write a snapshot to stdout at exit (when run by the
+    API or pipeline runner) and the parent merges it, so /api/metrics and
+    the run report cover work done in every stage.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+
+    def _get_or_create(self, cls, name, documentation, labelnames, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, documentation, labelnames, **kwargs)
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def get(self, name):
+        return self._metrics.get(name)
+
+    def render_prometheus(self):
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines = []
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        for metric in metrics:
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            for name, labels, value in metric.samples():
+                lines.append(f'{name}{labels} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+    def snapshot(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {
+            metric.name: {
+                'kind': metric.kind,
+                'help': metric.documentation,
+                'labels': list(metric.labelnames),
+                'buckets': list(metric.buckets) if metric.kind == 'histogram' else None,
+                'values': metric.snapshot()
+            }
+            for metric in metrics
+        }
+
+    def merge(self, snapshot):
+        """Add a snapshot (e.g. from a stage subprocess) into this registry"""
+        for name, data in snapshot.items():
+            if data['kind'] == 'histogram':
+                metric = self.histogram(name, data['help'], data['labels'], buckets=data['buckets'])
+            else:
+                metric = self.counter(name, data['help'], data['labels'])
+            metric.merge(data['values'])
+
+
+# Shared by every module in the process
+registry = MetricsRegistry()
+
+
+# Items a stage gave up on this run (a failed Gemini call or Calendar insert).
+# The pipeline runner never records such a stage as up to date, so the next
+# run retries them.
+ITEM_FAILURES = registry.counter('pipeline_item_failures_total', 'Items a pipeline stage failed to process', ['stage'])
+
+
+def item_failures(snapshot):
+    """Failed items reported in a stage's metrics snapshot"""
+    data = snapshot.get(ITEM_FAILURES.name) if snapshot else None
+    return sum(value for _, value in data['values']) if data else 0
+
+
+def parse_metrics_line(line):
+    """Return the snapshot from a subprocess output line, or None"""
+    if not line.startswith(METRICS_PREFIX):
+        return None
+    try:
+        return json.loads(line[len(METRICS_PREFIX):])
+    except ValueError:
+        return None
+
+
+def _write_snapshot_at_exit():
+    snapshot = registry.snapshot()
+    if any(data['values'] for data in snapshot.values()):
+        sys.stdout.write(METRICS_PREFIX + json.dumps(snapshot) + '\n')
+        sys.stdout.flush()
+
+
+if os.environ.get(PROGRESS_ENV) == 'stdout':
+    atexit.register(_write_snapshot_at_exit)
+
+
+# --------------------------
+# Run reports
+# --------------------------
+def _throughput(snapshot):
+    """Headline rates derived from the merged counters and histograms"""
+    def counter_total(name):
+        data = snapshot.get(name)
+        return sum(value for _, value in data['values']) if data else 0
+
+    def histogram_totals(name):
+        data = snapshot.get(name)
+        if not data:
+            return 0, 0.0
+        return (sum(state[-1] for _, state in data['values']),
+                sum(state[-2] for _, state in data['values']))
+
+    rates = {}
+    pages = counter_total('resume_pdf_pages_total')
+    extract = snapshot.get('resume_extract_seconds')
+    pdf_seconds = sum(state[-2] for key, state in extract['values'] if key == ['pdf']) if extract else 0
+    if pages and pdf_seconds:
+        rates['pdf_pages_per_second'] = round(pages / pdf_seconds, 2)
+    count, seconds = histogram_totals('gemini_request_seconds')
+    if count:
+        rates['gemini_mean_latency_seconds'] = round(seconds / count, 3)
+    count, seconds = histogram_totals('gmail_api_seconds')
+    if count:
+        rates['gmail_mean_latency_seconds'] = round(seconds / count, 3)
+    return rates
+
+
+def _profile_summary(stages):
+    """Peak memory and hottest functions for every stage that was profiled"""
+    profiles = {}
+    for stage in stages:
+        profile = stage.get('profile')
+        if profile:
+            profiles[stage['script']] = {
+                'peak_memory_mb': round(profile['peak_memory_bytes'] / 1048576, 2),
+                'stats_file': profile.get('stats_file'),
+                'hottest': [f['function'] for f in profile.get('top_functions', [])[:5]]
+            }
+    return profiles
+
+
+def write_run_report(stages, started_at, finished_at, run_registry, folder=REPORT_FOLDER, schedule=None):
+    """
+    Write a JSON report for one pipeline run: per-stage outcome/duration
+    (and profile, when profiling was on), the DAG `schedule` summary
+    (critical path, skipped stages) when given, plus the metrics collected
+    during the run (`run_registry`). Returns the report path.
+    """
+    os.makedirs(folder, exist_ok=True)
+    snapshot = run_registry.snapshot()
+    report = {
+        'started_at': started_at.isoformat(),
+        'finished_at': finished_at.isoformat(),
+        'duration_seconds': round((finished_at - started_at).total_seconds(), 3),
+        'stages': stages,
+        'schedule': schedule,
+        'throughput': _throughput(snapshot),
+        'profiles': _profile_summary(stages),
+        'metrics': snapshot
+    }
+    path = os.path.join(folder, f"run_{started_at.strftime('%Y%m%dT%H%M%S')}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    return path
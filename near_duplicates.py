@@ -0,0 +1,216 @@
+# near_duplicates.py
+import os
+import json
+import zlib
+import array
+import base64
+import random
+import logging
+import threading
+from candidate_search import tokenize
+
+# --------------------------
+# Configuration
+# --------------------------
+NEAR_DUPLICATE_INDEX_FILE = 'near_duplicate_index.json'
+NEAR_DUPLICATES_FILE = 'near_duplicates.json'   # Resume filename -> near-duplicate verdict from the parse stage
+NEAR_DUPLICATE_THRESHOLD = float(os.environ.get('NEAR_DUPLICATE_THRESHOLD', '0.85'))
+NEAR_DUPLICATE_MODE = os.environ.get('NEAR_DUPLICATE_MODE', 'skip')   # 'skip' or 'flag'
+NUM_PERM = 128
+BANDS = 16              # 16 bands x 8 rows: pairs at 0.85 similarity share a bucket ~99% of the time
+SHINGLE_SIZE = 5        # Words per shingle
+SEED = 1
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+def _permutations(num_perm, seed):
+    rng = random.Random(seed)
+    return [(rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME)) for _ in range(num_perm)]
+
+
+# Fixed seed: signatures stay comparable across runs and processes
+_PERMUTATIONS = _permutations(NUM_PERM, SEED)
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    """Set of overlapping word n-grams of the normalized text"""
+    tokens = tokenize(text.lower())
+    if len(tokens) <= size:
+        return {' '.join(tokens)} if tokens else set()
+    return {' '.join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+
+
+def minhash(text):
+    """MinHash signature (NUM_PERM 32-bit values) of the text's shingles, or None if it has no words"""
+    hashes = [zlib.crc32(shingle.encode('utf-8')) for shingle in shingles(text)]
+    if not hashes:
+        return None
+    prime = _MERSENNE_PRIME
+    return array.array('I', [min([(a * h + b) % prime for h in hashes]) & _MAX_HASH for a, b in _PERMUTATIONS])
+
+
+def similarity(signature, other):
+    """Estimated Jaccard similarity: the fraction of matching MinHash values"""
+    return sum(1 for x, y in zip(signature, other) if x == y) / len(signature)
+
+
+class NearDuplicateIndex:
+    """
+    MinHash signatures of parsed resume text with LSH banding.
+
+    Each signature is split into bands; resumes that share any band bucket
+    are candidates and are verified against the threshold, so a lookup
+    touches only a few resumes however large the corpus grows. Persisted
+    as JSON and reloaded when another process (a stage subprocess or the
+    API) has written it.
+    """
+
+    def __init__(self, path=NEAR_DUPLICATE_INDEX_FILE, threshold=NEAR_DUPLICATE_THRESHOLD, bands=BANDS):
+        self.path = path
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = NUM_PERM // bands
+        self._lock = threading.RLock()
+        self._signatures = {}   # resume key -> signature
+        self._buckets = {}      # (band, band bytes) -> set of resume keys
+        self._mtime = None
+        self._dirty = False
+
+    def _band_keys(self, signature):
+        rows = self.rows
+        for band in range(self.bands):
+            yield band, signature[band * rows:(band + 1) * rows].tobytes()
+
+    def _insert(self, key, signature):
+        self._signatures[key] = signature
+        for band_key in self._band_keys(signature):
+            self._buckets.setdefault(band_key, set()).add(key)
+
+    def _discard(self, key):
+        signature = self._signatures.pop(key, None)
+        if signature is None:
+            return
+        for band_key in self._band_keys(signature):
+            keys = self._buckets.get(band_key)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._buckets[band_key]
+
+    def refresh(self):
+        """Reload from disk if the file changed and there are no unsaved additions"""
+        with self._lock:
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+            except FileNotFoundError:
+                return
+            if mtime == self._mtime or self._dirty:
+                return
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError) as e:
+                logging.warning(f"⚠️ Could not load near-duplicate index: {e}")
+                return
+            self._signatures, self._buckets = {}, {}
+            if data.get('num_perm') == NUM_PERM and data.get('seed') == SEED:
+                for key, encoded in data.get('signatures', {}).items():
+                    signature = array.array('I')
+                    signature.frombytes(base64.b64decode(encoded))
+                    self._insert(key, signature)
+            self._mtime = mtime
+
+    def build_from_folder(self, folder):
+        """Index existing parsed text once, so resumes parsed before this index existed are matched"""
+        with self._lock:
+            self.refresh()
+            if self._signatures or os.path.exists(self.path) or not os.path.isdir(folder):
+                return
+            for filename in os.listdir(folder):
+                if filename.endswith('.txt'):
+                    with open(os.path.join(folder, filename), 'r', encoding='utf-8') as f:
+                        signature = minhash(f.read())
+                    if signature is not None:
+                        self.add(os.path.splitext(filename)[0], signature)
+            logging.info(f"🧬 Built near-duplicate index for {len(self._signatures)} resumes")
+
+    def query(self, signature, exclude=None):
+        """(key, similarity) pairs at or above the threshold, most similar first"""
+        with self._lock:
+            candidates = set()
+            for band_key in self._band_keys(signature):
+                candidates |= self._buckets.get(band_key, set())
+            candidates.discard(exclude)
+            matches = [(key, similarity(signature, self._signatures[key])) for key in candidates]
+        matches = [(key, round(score, 3)) for key, score in matches if score >= self.threshold]
+        return sorted(matches, key=lambda match: (-match[1], match[0]))
+
+    def add(self, key, signature):
+        with self._lock:
+            self._discard(key)
+            self._insert(key, signature)
+            self._dirty = True
+
+    def save(self):
+        """Write unsaved additions (atomically)"""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {
+                'num_perm': NUM_PERM,
+                'seed': SEED,
+                'signatures': {key: base64.b64encode(signature.tobytes()).decode('ascii')
+                               for key, signature in self._signatures.items()}
+            }
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+            self._mtime = os.stat(self.path).st_mtime_ns
+            self._dirty = False
+
+    def clear(self):
+        """Forget every signature and delete the saved index"""
+        with self._lock:
+            self._signatures, self._buckets = {}, {}
+            self._mtime = None
+            self._dirty = False
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+
+    def __len__(self):
+        return len(self._signatures)
+
+
+# --------------------------
+# Near-duplicate verdicts
+# --------------------------
+# {resume filename: {'duplicate_of', 'similarity', 'action', 'source'}} where
+# action is 'skipped' or 'flagged' and source is the resume's SHA-256, so a
+# verdict only applies while the resume file is unchanged.
+def load_near_duplicates(path=NEAR_DUPLICATES_FILE):
+    """Verdicts recorded by the parse stage, or {} if there are none"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        logging.warning(f"⚠️ Could not load near-duplicate verdicts: {e}")
+        return {}
+
+
+def save_near_duplicates(verdicts, path=NEAR_DUPLICATES_FILE):
+    """Write the verdicts (atomically)"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(verdicts, f)
+    os.replace(tmp_path, path)
+
+
+# Shared by the parse stage (in the API process and the stage subprocess)
+near_duplicate_index = NearDuplicateIndex()
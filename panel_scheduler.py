@@ -0,0 +1,167 @@
+# panel_scheduler.py
+import logging
+from datetime import datetime, timedelta, timezone
+
+from calendar_availability import (
+    parse_busy_intervals, find_free_windows, working_windows, split_into_slots,
+    DEFAULT_WORK_HOURS, DEFAULT_GRANULARITY_MINUTES
+)
+
+# --------------------------
+# Defaults
+# --------------------------
+DEFAULT_PANEL_HORIZON_DAYS = 14
+
+
+# --------------------------
+# Freebusy for many calendars
+# --------------------------
+def query_panel_busy(service, calendar_ids, start, end):
+    """
+    Issue a single freebusy query for every interviewer calendar.
+    Returns {calendar_id: merged busy intervals}. Calendars the API reports
+    errors for are treated as fully busy so nobody gets double-booked.
+    """
+    body = {
+        "timeMin": start.isoformat(),
+        "timeMax": end.isoformat(),
+        "items": [{"id": calendar_id} for calendar_id in calendar_ids]
+    }
+    result = service.freebusy().query(body=body).execute()
+    calendars = result.get('calendars', {})
+
+    busy_by_calendar = {}
+    for calendar_id in calendar_ids:
+        info = calendars.get(calendar_id, {})
+        if info.get('errors'):
+            logging.warning(f"⚠️ Freebusy error for {calendar_id}: {info['errors']}; treating as busy")
+            busy_by_calendar[calendar_id] = [(start, end)]
+        else:
+            busy_by_calendar[calendar_id] = parse_busy_intervals(info.get('busy', []))
+    return busy_by_calendar
+
+
+# --------------------------
+# Panel scheduler
+# --------------------------
+class PanelScheduler:
+    """
+    Assign candidates to the earliest slots where a panel of interviewers is free.
+
+    With `panel_size` smaller than the interviewer pool, each slot takes the
+    least-loaded free interviewers, and several panels can run in parallel.
+    """
+
+    def __init__(
+        self,
+        busy_by_calendar,
+        start,
+        end,
+        panel_size=None,
+        duration_minutes=45,
+        buffer_minutes=15,
+        granularity_minutes=DEFAULT_GRANULARITY_MINUTES,
+        work_hours=DEFAULT_WORK_HOURS,
+        skip_weekends=True,
+        initial_load=None
+    ):
+        self.interviewers = list(busy_by_calendar)
+        if not self.interviewers:
+            raise ValueError("At least one interviewer calendar is required")
+
+        self.panel_size = panel_size or len(self.interviewers)
+        if not (1 <= self.panel_size <= len(self.interviewers)):
+            raise ValueError(f"panel_size must be between 1 and {len(self.interviewers)}")
+
+        self.duration = timedelta(minutes=duration_minutes)
+        self.buffer = timedelta(minutes=buffer_minutes)
+        self.load = {calendar_id: 0 for calendar_id in self.interviewers}
+        for calendar_id, count in (initial_load or {}).items():
+            if calendar_id in self.load:
+                self.load[calendar_id] = count
+
+        # Free windows per interviewer, computed once
+        self.free_windows = {
+            calendar_id: find_free_windows(busy, start, end, work_hours, skip_weekends)
+            for calendar_id, busy in busy_by_calendar.items()
+        }
+        # Candidate slot grid over the shared working hours
+        self.slots = split_into_slots(
+            list(working_windows(start, end, work_hours, skip_weekends)),
+            duration_minutes,
+            granularity_minutes
+        )
+        self.booked_until = {calendar_id: None for calendar_id in self.interviewers}
+
+    @classmethod
+    def from_service(cls, service, interviewers, start=None, horizon_days=DEFAULT_PANEL_HORIZON_DAYS, **kwargs):
+        """Build a scheduler from one freebusy query over all interviewer calendars"""
+        start = start or datetime.now(timezone.utc)
+        end = start + timedelta(days=horizon_days)
+        busy_by_calendar = query_panel_busy(service, interviewers, start, end)
+        return cls(busy_by_calendar, start, end, **kwargs)
+
+    def _free_interviewers(self, slot_start, slot_end, pointers):
+        """Interviewers whose calendars are free for the slot (pointers only move forward)"""
+        free = []
+        for calendar_id, windows in self.free_windows.items():
+            i = pointers[calendar_id]
+            while i < len(windows) and windows[i][1] < slot_end:
+                i += 1
+            pointers[calendar_id] = i
+
+            booked_until = self.booked_until[calendar_id]
+            if booked_until is not None and booked_until > slot_start:
+                continue
+            if i < len(windows) and windows[i][0] <= slot_start:
+                free.append(calendar_id)
+        return free
+
+    def _pick_panel(self, free):
+        """Least-loaded interviewers first, ties broken by pool order"""
+        order = {calendar_id: index for index, calendar_id in enumerate(self.interviewers)}
+        ranked = sorted(free, key=lambda calendar_id: (self.load[calendar_id], order[calendar_id]))
+        return ranked[:self.panel_size]
+
+    def _book(self, panel, slot_end):
+        for calendar_id in panel:
+            self.load[calendar_id] += 1
+            self.booked_until[calendar_id] = slot_end + self.buffer
+
+    def assign(self, candidates):
+        """
+        Assign candidates, in order, to the earliest common slots.
+        Returns a list of (candidate, start, end, panel); candidates that
+        don't fit in the horizon are left out and logged.
+        """
+        assignments = []
+        candidates = list(candidates)
+        next_index = 0
+        pointers = {calendar_id: 0 for calendar_id in self.interviewers}
+
+        for slot_start, slot_end in self.slots:
+            if next_index >= len(candidates):
+                break
+            free = self._free_interviewers(slot_start, slot_end, pointers)
+            while next_index < len(candidates) and len(free) >= self.panel_size:
+                panel = self._pick_panel(free)
+                self._book(panel, slot_end)
+                assignments.append((candidates[next_index], slot_start, slot_end, panel))
+                next_index += 1
+                free = [calendar_id for calendar_id in free if calendar_id not in panel]
+
+        unplaced = len(candidates) - next_index
+        if unplaced:
+            logging.warning(f"⚠️ {unplaced} candidate(s) could not be placed within the scheduling horizon")
+        return assignments
+
+    def panel_at(self, slot_start):
+        """Return a panel free for the slot starting at `slot_start`, or None"""
+        slot_end = slot_start + self.duration
+        pointers = {calendar_id: 0 for calendar_id in self.interviewers}
+        free = self._free_interviewers(slot_start, slot_end, pointers)
+        if len(free) < self.panel_size:
+            return None
+        panel = self._pick_panel(free)
+        self._book(panel, slot_end)
+        return panel
@@ -3,17 +3,31 @@ import os
 import logging
 import hashlib
 import json
+import time
 from PyPDF2 import PdfReader
 import docx2txt
+from progress_events import emit
+from metrics import registry
+from profiling import profile_stage
+from tracing import install_trace_logging, span, trace_index
+from near_duplicates import (near_duplicate_index, minhash, NEAR_DUPLICATE_MODE, NEAR_DUPLICATES_FILE,
+                             load_near_duplicates, save_near_duplicates)
+from resume_text_cache import file_digest, PARSED_SOURCES_FILE
 
 # Setup logging
 logging.basicConfig(
     format="%(asctime)s [%(levelname)s] %(message)s",
     level=logging.INFO
 )
+install_trace_logging()
 
 PROCESSED_HASHES_FILE = 'processed_text_hashes.json'
 
+EXTRACT_SECONDS = registry.histogram('resume_extract_seconds', 'Text extraction time per resume', ['type'])
+PDF_PAGES = registry.counter('resume_pdf_pages_total', 'PDF pages read during extraction')
+RESUMES_EXTRACTED = registry.counter('resumes_extracted_total', 'Resumes run through text extraction', ['type', 'result'])
+NEAR_DUPLICATES = registry.counter('resume_near_duplicates_total', 'Resumes matching an earlier one above the similarity threshold', ['action'])
+
 def load_processed_text_hashes():
     """Load hashes of already processed text content"""
     if os.path.exists(PROCESSED_HASHES_FILE):
@@ -31,6 +45,23 @@ def save_text_hash(text_hash):
     with open(PROCESSED_HASHES_FILE, 'w') as f:
         json.dump(list(processed), f)
 
+def load_parsed_sources():
+    """Load {parsed text filename: SHA-256 of the resume it was extracted from}"""
+    if os.path.exists(PARSED_SOURCES_FILE):
+        try:
+            with open(PARSED_SOURCES_FILE, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    return {}
+
+def save_parsed_sources(sources):
+    """Save the parsed text -> source digest map read by the resume view cache"""
+    tmp_path = PARSED_SOURCES_FILE + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(sources, f)
+    os.replace(tmp_path, PARSED_SOURCES_FILE)
+
 def calculate_text_hash(text):
     """Calculate hash of text content for duplicate detection"""
     # Normalize text by removing extra whitespace and converting to lowercase
@@ -43,12 +74,14 @@ def extract_text_from_file(file_path):
     """
     ext = os.path.splitext(file_path)[1].lower()
     text = ""
+    started = time.perf_counter()
     
     if ext == ".pdf":
         try:
             with open(file_path, "rb") as f:
                 reader = PdfReader(f)
                 logging.info(f"📄 Reading PDF with {len(reader.pages)} pages")
+                PDF_PAGES.inc(len(reader.pages))
                 
                 for i, page in enumerate(reader.pages):
                     try:
@@ -78,7 +111,11 @@ def extract_text_from_file(file_path):
             logging.error(f"❌ Error reading DOCX {file_path}: {e}")
     else:
         logging.warning(f"⚠️ Skipping unsupported file type: {file_path}")
+        return text
     
+    file_type = ext.lstrip('.')
+    EXTRACT_SECONDS.observe(time.perf_counter() - started, type=file_type)
+    RESUMES_EXTRACTED.inc(type=file_type, result='ok' if text.strip() else 'empty')
     return text
 
 def parse_all_resumes(input_folder="resumes", output_folder="parsed_text"):
@@ -95,7 +132,12 @@ def parse_all_resumes(input_folder="resumes", output_folder="parsed_text"):
     
     # Load existing text hashes
     existing_hashes = load_processed_text_hashes()
-    results = {'success': 0, 'failed': 0, 'skipped': 0, 'duplicates': 0}
+    parsed_sources = load_parsed_sources()
+    near_duplicates = load_near_duplicates()
+    near_duplicates_changed = False
+    results = {'success': 0, 'failed': 0, 'skipped': 0, 'duplicates': 0,
+               'near_duplicates': 0, 'near_duplicate_files': []}
+    near_duplicate_index.build_from_folder(output_folder)
     
     files = [f for f in os.listdir(input_folder) if os.path.isfile(os.path.join(input_folder, f))]
     logging.info(f"📊 Found {len(files)} files in {input_folder}")
@@ -109,44 +151,103 @@ def parse_all_resumes(input_folder="resumes", output_folder="parsed_text"):
             results['skipped'] += 1
             continue
         
-        logging.info(f"\n{'='*60}")
-        logging.info(f"Processing: {filename}")
-        logging.info(f"{'='*60}")
+        # Resumes that arrived without a trace (e.g. copied into the folder) get one here
+        trace_id = trace_index.ensure(filename, source='folder')
+        with span('parse', trace_id, resume=filename) as trace:
+            logging.info(f"\n{'='*60}")
+            logging.info(f"Processing: {filename}")
+            logging.info(f"{'='*60}")
+
+            # A near-duplicate skipped on an earlier run stays skipped until the file changes
+            source_digest = None
+            verdict = near_duplicates.get(filename)
+            if verdict is not None:
+                source_digest = file_digest(file_path)
+                if NEAR_DUPLICATE_MODE == 'skip' and verdict['action'] == 'skipped' \
+                        and verdict['source'] == source_digest:
+                    trace.update(status='near_duplicate', near_duplicate_of=verdict['duplicate_of'])
+                    logging.info(f"⏭️  Skipping {filename} (near-duplicate of {verdict['duplicate_of']})")
+                    results['skipped'] += 1
+                    continue
         
-        text = extract_text_from_file(file_path)
+            extract_started = time.perf_counter()
+            text = extract_text_from_file(file_path)
+            extract_seconds = time.perf_counter() - extract_started
         
-        if text.strip():
-            # Calculate content hash
-            text_hash = calculate_text_hash(text)
+            if text.strip():
+                # Calculate content hash
+                text_hash = calculate_text_hash(text)
             
-            # Check for duplicate content
-            if text_hash in existing_hashes:
-                logging.info(f"🔄 Skipping duplicate content: {filename}")
-                results['duplicates'] += 1
-                continue
+                # Check for duplicate content
+                if text_hash in existing_hashes:
+                    trace['status'] = 'duplicate'
+                    logging.info(f"🔄 Skipping duplicate content: {filename}")
+                    results['duplicates'] += 1
+                    continue
+                
+                # Near-duplicate check: a slightly edited resend shouldn't reach the LLM stage again
+                resume_key = os.path.splitext(filename)[0]
+                signature = minhash(text)
+                matches = near_duplicate_index.query(signature, exclude=resume_key) if signature else []
+                if source_digest is None:
+                    source_digest = file_digest(file_path)
+                if matches:
+                    duplicate_of, score = matches[0]
+                    action = 'skipped' if NEAR_DUPLICATE_MODE == 'skip' else 'flagged'
+                    NEAR_DUPLICATES.inc(action=action)
+                    results['near_duplicates'] += 1
+                    results['near_duplicate_files'].append(
+                        {'filename': filename, 'duplicate_of': duplicate_of, 'similarity': score, 'action': action})
+                    # Recorded for later runs (skips) and for the API / later stages (flags)
+                    near_duplicates[filename] = {'duplicate_of': duplicate_of, 'similarity': score,
+                                                 'action': action, 'source': source_digest}
+                    near_duplicates_changed = True
+                    trace.update(near_duplicate_of=duplicate_of, similarity=score)
+                    if action == 'skipped':
+                        trace['status'] = 'near_duplicate'
+                        logging.info(f"🧬 Skipping near-duplicate of {duplicate_of} ({score:.0%} similar): {filename}")
+                        continue
+                    logging.warning(f"🧬 {filename} is a near-duplicate of {duplicate_of} ({score:.0%} similar)")
+                elif near_duplicates.pop(filename, None) is not None:
+                    near_duplicates_changed = True
             
-            txt_filename = os.path.splitext(filename)[0] + ".txt"
-            output_path = os.path.join(output_folder, txt_filename)
+                txt_filename = resume_key + ".txt"
+                output_path = os.path.join(output_folder, txt_filename)
             
-            try:
-                with open(output_path, "w", encoding="utf-8") as f:
-                    f.write(text)
+                try:
+                    # Forget the old source first so the text is never served for the wrong resume
+                    if parsed_sources.pop(txt_filename, None) is not None:
+                        save_parsed_sources(parsed_sources)
+                    with open(output_path, "w", encoding="utf-8") as f:
+                        f.write(text)
+                    parsed_sources[txt_filename] = source_digest
+                    save_parsed_sources(parsed_sources)
                 
-                # Save hash and mark as processed
-                save_text_hash(text_hash)
-                existing_hashes.add(text_hash)
+                    # Save hash and mark as processed
+                    save_text_hash(text_hash)
+                    existing_hashes.add(text_hash)
+                    if signature is not None:
+                        near_duplicate_index.add(resume_key, signature)
                 
-                word_count = len(text.split())
-                logging.info(f"✅ Parsed text saved: {txt_filename}")
-                logging.info(f"   📊 Stats: {len(text)} chars, {word_count} words")
-                results['success'] += 1
+                    word_count = len(text.split())
+                    logging.info(f"✅ Parsed text saved: {txt_filename}")
+                    logging.info(f"   📊 Stats: {len(text)} chars, {word_count} words")
+                    results['success'] += 1
+                    emit('parse', 'extracted', filename=filename, chars=len(text),
+                         seconds=round(extract_seconds, 4), extracted=results['success'])
                 
-            except Exception as e:
-                logging.error(f"❌ Error saving text file: {e}")
+                except Exception as e:
+                    trace['status'] = 'error'
+                    logging.error(f"❌ Error saving text file: {e}")
+                    results['failed'] += 1
+            else:
+                trace['status'] = 'empty'
+                logging.warning(f"⚠️ No text extracted from {filename}")
                 results['failed'] += 1
-        else:
-            logging.warning(f"⚠️ No text extracted from {filename}")
-            results['failed'] += 1
+    
+    near_duplicate_index.save()
+    if near_duplicates_changed:
+        save_near_duplicates(near_duplicates)
     
     # Print summary
     logging.info(f"\n{'='*60}")
@@ -154,6 +255,7 @@ def parse_all_resumes(input_folder="resumes", output_folder="parsed_text"):
     logging.info(f"{'='*60}")
     logging.info(f"✅ Success: {results['success']}")
     logging.info(f"🔄 Duplicates: {results['duplicates']}")
+    logging.info(f"🧬 Near-duplicates: {results['near_duplicates']}")
     logging.info(f"❌ Failed: {results['failed']}")
     logging.info(f"⏭️  Skipped: {results['skipped']}")
     logging.info(f"{'='*60}\n")
@@ -161,10 +263,11 @@ def parse_all_resumes(input_folder="resumes", output_folder="parsed_text"):
     return results
 
 if __name__ == "__main__":
-    logging.info("🚀 Starting resume text extraction...")
-    results = parse_all_resumes()
+    with profile_stage('parse'):
+        logging.info("🚀 Starting resume text extraction...")
+        results = parse_all_resumes()
     
-    if results['success'] > 0:
-        logging.info(f"✅ Step 2 completed! Parsed text is in 'parsed_text/' folder.")
-    else:
-        logging.info("ℹ️ No new resumes parsed (all were duplicates or failed)")
\ No newline at end of file
+        if results['success'] > 0:
+            logging.info(f"✅ Step 2 completed! Parsed text is in 'parsed_text/' folder.")
+        else:
+            logging.info("ℹ️ No new resumes parsed (all were duplicates or failed)")
\ No newline at end of file
@@ -0,0 +1,281 @@
+# pipeline_dag.py
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime
+
+# --------------------------
+# Configuration
+# --------------------------
+PIPELINE_STATE_FILE = 'pipeline_state.json'   # Input fingerprints of each stage's last successful run
+PIPELINE_WORKERS = int(os.environ.get('PIPELINE_WORKERS', '2'))
+
+STATUS_OK = 'ok'
+STATUS_FAILED = 'failed'
+STATUS_SKIPPED = 'skipped'
+
+
+class Stage:
+    """
+    One pipeline script with the files and folders it reads and writes.
+    `inputs=None` marks a stage fed from outside (e.g. Gmail), and
+    `skippable=False` one whose work depends on more than its input files;
+    both always run.
+    """
+
+    __slots__ = ('script', 'description', 'inputs', 'outputs', 'skippable')
+
+    def __init__(self, script, description, inputs=None, outputs=(), skippable=True):
+        self.script = script
+        self.description = description
+        self.inputs = tuple(inputs) if inputs is not None else None
+        self.outputs = tuple(outputs)
+        self.skippable = skippable and inputs is not None
+
+
+# Dependencies are derived from the declared paths: a stage runs after every
+# stage whose outputs it reads
+PIPELINE_DAG = (
+    Stage('fetch_resumes.py', '1. Fetch resumes from Gmail',
+          inputs=None, outputs=('resumes',)),
+    Stage('parse_resumes.py', '2. Parse resume files to text',
+          inputs=('resumes',), outputs=('parsed_text',)),
+    Stage('gemini_parser.py', '3. Extract structured data with Gemini',
+          inputs=('parsed_text',), outputs=('parsed_json',)),
+    Stage('linkedin_enricher.py', '4. Enrich candidate data',
+          inputs=('parsed_json',), outputs=('enriched_json', 'enriched_candidates.json')),
+    # Free calendar slots change without any file changing, so always run
+    Stage('schedule_interviews.py', '5. Schedule interviews',
+          inputs=('enriched_json',), outputs=('scheduled_interviews', 'scheduled_candidates.json'),
+          skippable=False),
+)
+
+
+def fingerprint(paths):
+    """
+    Digest of the name, size and mtime of every file under `paths` (a
+    folder's direct entries, or a single file). Cheap: stat calls only.
+    """
+    digest = hashlib.sha1()
+    for path in sorted(paths):
+        digest.update(path.encode('utf-8') + b'\0')
+        try:
+            if os.path.isdir(path):
+                with os.scandir(path) as entries:
+                    listing = sorted((entry.name, entry.stat()) for entry in entries if entry.is_file())
+            else:
+                listing = [('', os.stat(path))]
+        except FileNotFoundError:
+            digest.update(b'missing\0')
+            continue
+        for name, stat in listing:
+            digest.update(f'{name}\0{stat.st_size}\0{stat.st_mtime_ns}\0'.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def dependencies(stages):
+    """
+    {script: [upstream scripts]} for stages reading another stage's
+    outputs. Raises ValueError if the declared paths form a cycle.
+    """
+    writers = {}
+    for stage in stages:
+        for path in stage.outputs:
+            writers.setdefault(os.path.normpath(path), []).append(stage.script)
+    deps = {}
+    for stage in stages:
+        upstream = []
+        for path in stage.inputs or ():
+            upstream.extend(s for s in writers.get(os.path.normpath(path), ()) if s != stage.script)
+        deps[stage.script] = list(dict.fromkeys(upstream))
+    topological_order([stage.script for stage in stages], deps)
+    return deps
+
+
+def topological_order(scripts, deps):
+    """Scripts ordered so every stage comes after the stages it depends on"""
+    order, state = [], {}
+
+    def visit(script):
+        if state.get(script) == 'done':
+            return
+        if state.get(script) == 'visiting':
+            raise ValueError(f"pipeline stages form a cycle through {script}")
+        state[script] = 'visiting'
+        for upstream in deps.get(script, ()):
+            visit(upstream)
+        state[script] = 'done'
+        order.append(script)
+
+    for script in scripts:
+        visit(script)
+    return order
+
+
+def critical_path(results, deps):
+    """
+    Longest chain of dependent stages by duration: the run can't finish
+    faster than this however many workers there are.
+    Returns (scripts along the path, seconds).
+    """
+    seconds = {r['script']: r.get('seconds') or 0.0 for r in results}
+    best = {}   # script -> (seconds up to and including it, path)
+    for script in topological_order(list(seconds), deps):
+        upstream = max((best[u] for u in deps.get(script, ()) if u in best), key=lambda item: item[0],
+                       default=(0.0, []))
+        best[script] = (upstream[0] + seconds[script], upstream[1] + [script])
+    total, path = max(best.values(), key=lambda item: item[0], default=(0.0, []))
+    return path, round(total, 3)
+
+
+class PipelineScheduler:
+    """
+    Runs a stage DAG: each stage starts as soon as every stage it reads
+    from has finished, with up to `workers` stages at once.
+
+    - Skipping: before a stage runs, its inputs, outputs and script are
+      fingerprinted; if they match the stage's last successful run there is
+      nothing new for it and it is skipped. A run only counts as successful
+      if the stage also reported no failed items, so those are retried.
+    - Failures don't stop the run. Stages below a failed one still run on
+      whatever their inputs hold (stages are idempotent), so a Gmail outage
+      doesn't hold up enriching candidates that were already parsed - and
+      when the failed stage produced nothing new they are simply skipped.
+
+    `run_stage(script, description)` runs one stage and returns a result
+    dict with 'success' and optionally 'item_failures' and 'profile'; its
+    keys are added to the stage's entry in the results. `on_result`, if
+    given, is called with each stage's entry as it finishes.
+    """
+
+    def __init__(self, run_stage, stages=PIPELINE_DAG, state_file=PIPELINE_STATE_FILE,
+                 workers=PIPELINE_WORKERS, force=False, on_result=None):
+        self.run_stage = run_stage
+        self.on_result = on_result
+        self.stages = list(stages)
+        self.state_file = state_file
+        self.workers = max(1, workers)
+        self.force = force
+        self.deps = dependencies(self.stages)
+        self._lock = threading.Lock()
+        self._state = self._load_state()
+
+    # --------------------------
+    # Fingerprint state
+    # --------------------------
+    def _load_state(self):
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logging.warning(f"⚠️ Ignoring pipeline state {self.state_file}: {e}")
+            return {}
+
+    def _save_state(self):
+        tmp_path = self.state_file + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._state, f, indent=2)
+        os.replace(tmp_path, self.state_file)
+
+    def _fingerprints(self, stage):
+        return {
+            'inputs': fingerprint(stage.inputs),
+            'outputs': fingerprint(stage.outputs),
+            'script': fingerprint([stage.script])
+        }
+
+    def _skip_reason(self, stage):
+        if self.force or not stage.skippable:
+            return None
+        with self._lock:
+            last = self._state.get(stage.script)
+        if last and last.get('fingerprints') == self._fingerprints(stage):
+            return f"inputs unchanged since {last.get('finished_at')}"
+        return None
+
+    # --------------------------
+    # Execution
+    # --------------------------
+    def _execute(self, stage, started_at):
+        result = {
+            'script': stage.script,
+            'description': stage.description,
+            'depends_on': self.deps[stage.script],
+            'start_offset_seconds': round(time.perf_counter() - started_at, 3),
+            'profile': None
+        }
+        reason = self._skip_reason(stage)
+        if reason:
+            logging.info(f"⏭️ SKIPPED: {stage.description} ({reason})")
+            result.update(status=STATUS_SKIPPED, success=True, seconds=0.0, skip_reason=reason)
+            return result
+
+        inputs = fingerprint(stage.inputs) if stage.skippable else None
+        stage_started = time.perf_counter()
+        outcome = self.run_stage(stage.script, stage.description)
+        success = bool(outcome.get('success'))
+        result.update(outcome)
+        result.update(status=STATUS_OK if success else STATUS_FAILED, success=success,
+                      seconds=round(time.perf_counter() - stage_started, 3))
+        if not stage.skippable:
+            return result
+
+        with self._lock:
+            if success and not outcome.get('item_failures'):
+                # Inputs as the stage saw them; anything arriving mid-run is picked up next time
+                fingerprints = self._fingerprints(stage)
+                fingerprints['inputs'] = inputs
+                self._state[stage.script] = {'fingerprints': fingerprints,
+                                             'finished_at': datetime.now().isoformat()}
+            elif self._state.pop(stage.script, None) is None:
+                return result
+            self._save_state()
+        return result
+
+    def run(self):
+        """Run the DAG; returns (stage results in declared order, schedule summary)"""
+        started_at = time.perf_counter()
+        pending = {stage.script: stage for stage in self.stages}
+        results = {}
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='stage') as executor:
+            while pending or running:
+                ready = [stage for script, stage in pending.items()
+                         if all(upstream in results for upstream in self.deps[script])]
+                for stage in ready:
+                    del pending[stage.script]
+                    running[executor.submit(self._execute, stage, started_at)] = stage
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage = running.pop(future)
+                    try:
+                        results[stage.script] = future.result()
+                    except Exception as e:
+                        logging.error(f"❌ UNEXPECTED ERROR in {stage.description}: {e}")
+                        results[stage.script] = {
+                            'script': stage.script, 'description': stage.description,
+                            'depends_on': self.deps[stage.script], 'status': STATUS_FAILED,
+                            'success': False, 'seconds': 0.0, 'profile': None, 'error': str(e)
+                        }
+                    if self.on_result is not None:
+                        self.on_result(results[stage.script])
+
+        ordered = [results[stage.script] for stage in self.stages]
+        path, path_seconds = critical_path(ordered, self.deps)
+        schedule = {
+            'workers': self.workers,
+            'wall_seconds': round(time.perf_counter() - started_at, 3),
+            'stage_seconds_total': round(sum(r['seconds'] for r in ordered), 3),
+            'critical_path': path,
+            'critical_path_seconds': path_seconds,
+            'ran': [r['script'] for r in ordered if r['status'] == STATUS_OK],
+            'skipped': [r['script'] for r in ordered if r['status'] == STATUS_SKIPPED],
+            'failed': [r['script'] for r in ordered if r['status'] == STATUS_FAILED]
+        }
+        return ordered, schedule
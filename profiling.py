@@ -0,0 +1,169 @@
+# profiling.py
+import os
+import re
+import sys
+import json
+import time
+import pstats
+import cProfile
+import logging
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from progress_events import PROGRESS_ENV
+
+# --------------------------
+# Configuration
+# --------------------------
+PROFILE_ENV = 'PIPELINE_PROFILE'   # "1" profiles every pipeline stage subprocess
+API_PROFILE_ENV = 'API_PROFILE'    # "1" profiles every API request and in-process job
+PROFILE_HEADER = 'X-Profile'       # Per-request opt-in ("1")
+PROFILE_PREFIX = '@@profile '      # Stage profile summary in subprocess output
+PROFILE_FOLDER = 'profiles'
+STATS_LINES = 60                   # Functions listed in the .txt stats dump
+TOP_FUNCTIONS = 10                 # Functions kept in the JSON summary
+
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users = 0
+
+
+def is_enabled(value):
+    return str(value or '').strip().lower() not in ('', '0', 'false', 'no', 'off')
+
+
+def _start_tracemalloc():
+    global _tracemalloc_users
+    with _tracemalloc_lock:
+        if _tracemalloc_users == 0:
+            if tracemalloc.is_tracing():
+                tracemalloc.reset_peak()
+            else:
+                tracemalloc.start()
+        _tracemalloc_users += 1
+
+
+def _stop_tracemalloc():
+    """Return (current, peak) bytes; tracing stops with the last session"""
+    global _tracemalloc_users
+    with _tracemalloc_lock:
+        memory = tracemalloc.get_traced_memory()
+        _tracemalloc_users -= 1
+        if _tracemalloc_users == 0:
+            tracemalloc.stop()
+        return memory
+
+
+def _function_label(func):
+    filename, line, name = func
+    return f"{os.path.basename(filename)}:{line}({name})" if line else name
+
+
+class ProfileSession:
+    """
+    cProfile plus tracemalloc peak memory for one stage, route or job.
+
+    cProfile only sees the thread that calls start(). tracemalloc is
+    process-wide, so sessions that overlap report the peak of the whole
+    process while they ran.
+    """
+
+    def __init__(self, name, folder=PROFILE_FOLDER):
+        self.name = re.sub(r'[^A-Za-z0-9_.-]+', '_', name).strip('_') or 'profile'
+        self.folder = folder
+        self._profiler = None
+        self._started = None
+
+    def start(self):
+        _start_tracemalloc()
+        self._profiler = cProfile.Profile()
+        try:
+            self._profiler.enable()
+        except ValueError as e:
+            # Another profiler is already active in this thread
+            logging.warning(f"⚠️ Profiling disabled for {self.name}: {e}")
+            self._profiler = None
+        self._started = time.perf_counter()
+        return self
+
+    def stop(self):
+        """Stop profiling, write the dumps and return a JSON-able summary"""
+        seconds = time.perf_counter() - self._started
+        if self._profiler is not None:
+            self._profiler.disable()
+        current, peak = _stop_tracemalloc()
+
+        summary = {
+            'name': self.name,
+            'seconds': round(seconds, 3),
+            'peak_memory_bytes': peak,
+            'end_memory_bytes': current
+        }
+        if self._profiler is None:
+            return summary
+
+        os.makedirs(self.folder, exist_ok=True)
+        base = os.path.join(self.folder, f"{self.name}_{datetime.now().strftime('%Y%m%dT%H%M%S')}_{os.getpid()}")
+        self._profiler.dump_stats(base + '.prof')
+        with open(base + '.txt', 'w', encoding='utf-8') as f:
+            stats = pstats.Stats(self._profiler, stream=f)
+            f.write(f"{self.name}: {seconds:.3f}s, peak traced memory {peak / 1048576:.1f} MB\n\n")
+            stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(STATS_LINES)
+
+        stats = pstats.Stats(self._profiler)
+        ranked = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)
+        summary.update({
+            'profile_file': base + '.prof',
+            'stats_file': base + '.txt',
+            'top_functions': [
+                {
+                    'function': _function_label(func),
+                    'calls': calls,
+                    'total_seconds': round(total, 4),
+                    'cumulative_seconds': round(cumulative, 4)
+                }
+                for func, (_, calls, total, cumulative, _) in ranked[:TOP_FUNCTIONS]
+            ]
+        })
+        logging.info(f"🔬 Profile for {self.name} written to {base}.txt")
+        return summary
+
+
+def profiled_call(name, func, *args, **kwargs):
+    """Run func under a ProfileSession; return (result, summary)"""
+    session = ProfileSession(name).start()
+    try:
+        result = func(*args, **kwargs)
+    finally:
+        summary = session.stop()
+    return result, summary
+
+
+@contextmanager
+def profile_stage(stage):
+    """
+    Profile a pipeline stage's entry point when PIPELINE_PROFILE is set.
+    When run by the API or pipeline runner the summary is written to
+    stdout so the parent can add it to the run report.
+    """
+    if not is_enabled(os.environ.get(PROFILE_ENV)):
+        yield
+        return
+    session = ProfileSession(stage).start()
+    try:
+        yield
+    finally:
+        summary = session.stop()
+        if os.environ.get(PROGRESS_ENV) == 'stdout':
+            sys.stdout.write(PROFILE_PREFIX + json.dumps(summary) + '\n')
+            sys.stdout.flush()
+
+
+def parse_profile_line(line):
+    """Return the profile summary from a subprocess output line, or None"""
+    if not line.startswith(PROFILE_PREFIX):
+        return None
+    try:
+        return json.loads(line[len(PROFILE_PREFIX):])
+    except ValueError:
+        return None
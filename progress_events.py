@@ -0,0 +1,112 @@
+# progress_events.py
+import os
+import sys
+import json
+import time
+import queue
+import threading
+from collections import deque
+
+# --------------------------
+# Configuration
+# --------------------------
+PROGRESS_ENV = 'PIPELINE_PROGRESS'     # "stdout" when a stage runs as a subprocess
+PROGRESS_PREFIX = '@@progress '        # Marks structured lines in subprocess output
+SUBSCRIBER_QUEUE_SIZE = 1000
+RECENT_EVENTS = 200
+
+
+class ProgressBus:
+    """
+    In-process publish/subscribe channel for pipeline progress events.
+
+    Every subscriber has a bounded queue; a slow client loses its oldest
+    events instead of growing memory. Per-stage counters and first/last
+    timestamps are kept so throughput can be reported at any time.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._recent = deque(maxlen=RECENT_EVENTS)
+        self._counters = {}   # (stage, event) -> {'count', 'first', 'last'}
+
+    def publish(self, event):
+        now = event.setdefault('ts', time.time())
+        key = (event.get('stage'), event.get('event'))
+        with self._lock:
+            counter = self._counters.get(key)
+            if counter is None:
+                counter = self._counters[key] = {'count': 0, 'first': now, 'last': now}
+            counter['count'] += 1
+            counter['last'] = now
+            event['count'] = counter['count']
+
+            self._recent.append(event)
+            subscribers = list(self._subscribers)
+
+        for q in subscribers:
+            try:
+                q.put_nowait(event)
+            except queue.Full:
+                try:
+                    q.get_nowait()  # Drop the oldest event for this slow client
+                    q.put_nowait(event)
+                except (queue.Empty, queue.Full):
+                    pass
+
+    def subscribe(self):
+        q = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        with self._lock:
+            self._subscribers.add(q)
+        return q
+
+    def unsubscribe(self, q):
+        with self._lock:
+            self._subscribers.discard(q)
+
+    def snapshot(self):
+        """Counters with throughput (items/sec) per stage and event type"""
+        with self._lock:
+            counters = {key: dict(value) for key, value in self._counters.items()}
+            recent = list(self._recent)[-20:]
+
+        stages = {}
+        for (stage, event), counter in counters.items():
+            elapsed = counter['last'] - counter['first']
+            stages.setdefault(stage, {})[event] = {
+                'count': counter['count'],
+                'per_second': round(counter['count'] / elapsed, 2) if elapsed > 0 else None
+            }
+        return {'stages': stages, 'recent': recent}
+
+
+# Process-wide bus used by the API
+progress_bus = ProgressBus()
+
+
+def emit(stage, event, **fields):
+    """
+    Report one processed item, e.g. emit('parse', 'extracted', filename=...).
+    Inside a pipeline subprocess the event is written to stdout as a
+    prefixed JSON line for the parent to relay; otherwise it goes straight
+    to the in-process bus.
+    """
+    payload = {'stage': stage, 'event': event, 'ts': time.time()}
+    payload.update(fields)
+
+    if os.environ.get(PROGRESS_ENV) == 'stdout':
+        sys.stdout.write(PROGRESS_PREFIX + json.dumps(payload, default=str) + '\n')
+        sys.stdout.flush()
+    else:
+        progress_bus.publish(payload)
+
+
+def parse_progress_line(line):
+    """Return the event from a subprocess output line, or None for ordinary output"""
+    if not line.startswith(PROGRESS_PREFIX):
+        return None
+    try:
+        return json.loads(line[len(PROGRESS_PREFIX):])
+    except ValueError:
+        return None
@@ -0,0 +1,139 @@
+# resume_text_cache.py
+import os
+import json
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+# --------------------------
+# Configuration
+# --------------------------
+PARSED_TEXT_FOLDER = 'parsed_text'   # Written by parse_resumes.py
+PARSED_SOURCES_FILE = 'parsed_text_sources.json'  # parsed_text file -> SHA-256 of the resume it came from
+CACHE_FOLDER = '.text_cache'         # <sha256 of resume bytes>.txt
+MAX_MEMORY_CHARS = 32 * 1024 * 1024  # In-memory LRU budget
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def file_digest(path):
+    """SHA-256 of a file's bytes"""
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+class ResumeTextCache:
+    """
+    Extracted resume text keyed by the SHA-256 of the resume file.
+
+    Lookup order: in-memory LRU -> parse_resumes output in parsed_text/
+    (used only when parse_resumes recorded it as extracted from these exact
+    bytes) -> on-disk cache -> extraction.
+    The digest of each file is remembered per (mtime, size), so a repeat
+    view costs one stat call and a dict lookup.
+    """
+
+    def __init__(self, parsed_folder=PARSED_TEXT_FOLDER, cache_folder=CACHE_FOLDER,
+                 max_memory_chars=MAX_MEMORY_CHARS, sources_file=PARSED_SOURCES_FILE):
+        self.parsed_folder = parsed_folder
+        self.sources_file = sources_file
+        self.cache_folder = cache_folder
+        self.max_memory_chars = max_memory_chars
+        self._lock = threading.Lock()
+        self._digests = {}          # path -> (mtime_ns, size, digest)
+        self._texts = OrderedDict() # digest -> text, least recently used first
+        self._chars = 0
+        self._sources = (None, {})  # (mtime_ns, parsed_text file -> source digest)
+
+    def digest(self, path):
+        """Content hash of a resume file, recomputed only when it changes"""
+        stat = os.stat(path)
+        with self._lock:
+            cached = self._digests.get(path)
+        if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            return cached[2]
+        digest = file_digest(path)
+        with self._lock:
+            self._digests[path] = (stat.st_mtime_ns, stat.st_size, digest)
+        return digest
+
+    def _remember(self, digest, text):
+        with self._lock:
+            if digest in self._texts:
+                self._texts.move_to_end(digest)
+                return
+            self._texts[digest] = text
+            self._chars += len(text)
+            while self._chars > self.max_memory_chars and len(self._texts) > 1:
+                _, evicted = self._texts.popitem(last=False)
+                self._chars -= len(evicted)
+
+    def _read_text(self, path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return f.read()
+        except (OSError, UnicodeDecodeError):
+            return None
+
+    def _source_digests(self):
+        """parse_resumes' record of which resume bytes each parsed_text file came from"""
+        try:
+            mtime = os.stat(self.sources_file).st_mtime_ns
+        except FileNotFoundError:
+            return {}
+        with self._lock:
+            if self._sources[0] == mtime:
+                return self._sources[1]
+        try:
+            with open(self.sources_file, 'r', encoding='utf-8') as f:
+                sources = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        with self._lock:
+            self._sources = (mtime, sources)
+        return sources
+
+    def _parsed_text(self, path, digest):
+        """parse_resumes output for this resume, if it was extracted from the same content"""
+        txt_name = os.path.splitext(os.path.basename(path))[0] + '.txt'
+        # foo.pdf and foo.docx share foo.txt, and a replaced upload keeps its name
+        if self._source_digests().get(txt_name) != digest:
+            return None
+        return self._read_text(os.path.join(self.parsed_folder, txt_name))
+
+    def text_for(self, path, extract):
+        """
+        Return (text, digest) for a resume; `extract(path)` is called only
+        on a full miss. Empty extractions are not cached.
+        """
+        digest = self.digest(path)
+        with self._lock:
+            text = self._texts.get(digest)
+            if text is not None:
+                self._texts.move_to_end(digest)
+                return text, digest
+
+        cache_path = os.path.join(self.cache_folder, digest + '.txt')
+        text = self._parsed_text(path, digest) or self._read_text(cache_path)
+        if not text:
+            text = extract(path)
+            if not text:
+                return text, digest
+            try:
+                os.makedirs(self.cache_folder, exist_ok=True)
+                tmp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    f.write(text)
+                os.replace(tmp_path, cache_path)
+            except OSError as e:
+                logging.warning(f"Could not write text cache for {path}: {e}")
+
+        self._remember(digest, text)
+        return text, digest
+
+
+# Shared by the resume view endpoint
+resume_text_cache = ResumeTextCache()
@@ -0,0 +1,181 @@
+# resume_uploads.py
+import os
+import hashlib
+import logging
+import tempfile
+import threading
+from flask import Request
+
+# --------------------------
+# Configuration
+# --------------------------
+UPLOAD_FOLDER = 'resumes'
+INCOMING_FOLDER = '.incoming'          # Inside the upload folder, so commits are a rename
+MAX_FILE_SIZE = 16 * 1024 * 1024       # Per file; the request limit covers bulk uploads
+MAX_UPLOAD_FILES = 500
+
+
+class HashingUploadStream:
+    """
+    Writable temp file for one multipart file part that computes the MD5
+    and size as the parser writes into it, so the upload is hashed in the
+    same pass that receives it. Data past `max_size` is discarded and the
+    part is flagged `too_large`. Unless committed, the temp file is
+    removed on close.
+    """
+
+    def __init__(self, folder, max_size=MAX_FILE_SIZE):
+        os.makedirs(folder, exist_ok=True)
+        fd, self.path = tempfile.mkstemp(dir=folder, suffix='.part')
+        self._file = os.fdopen(fd, 'w+b')
+        self._hasher = hashlib.md5()
+        self.size = 0
+        self.max_size = max_size
+        self.too_large = False
+        self.committed = False
+
+    def write(self, data):
+        self.size += len(data)
+        if self.size > self.max_size:
+            self.too_large = True
+            return len(data)
+        self._hasher.update(data)
+        return self._file.write(data)
+
+    def hexdigest(self):
+        return self._hasher.hexdigest()
+
+    def commit(self, target_path):
+        """Atomically move the received file into place"""
+        self._file.flush()
+        os.chmod(self.path, 0o644)  # mkstemp creates owner-only files
+        os.replace(self.path, target_path)
+        self.committed = True
+
+    def close(self):
+        if self._file.closed:
+            return
+        self._file.close()
+        if not self.committed:
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+
+    def __getattr__(self, name):
+        # read/readline/seek/tell/... for the multipart parser and FileStorage
+        return getattr(self._file, name)
+
+
+class UploadRequest(Request):
+    """Flask request whose file parts are received into HashingUploadStreams"""
+
+    max_form_parts = MAX_UPLOAD_FILES * 2
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return HashingUploadStream(os.path.join(UPLOAD_FOLDER, INCOMING_FOLDER))
+
+
+def _file_md5(path):
+    hasher = hashlib.md5()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+class UploadHashIndex:
+    """
+    MD5 -> filename index of the upload folder for duplicate detection.
+    Each check rescans the folder with stat calls only; files are hashed
+    again only when their mtime or size changed, instead of re-reading
+    every resume on every upload.
+    """
+
+    def __init__(self, folder=UPLOAD_FOLDER, accept=None):
+        self.folder = folder
+        self.accept = accept or (lambda filename: True)
+        self.lock = threading.Lock()   # Held across check + commit by callers
+        self._files = {}    # filename -> (mtime_ns, size, md5)
+        self._hashes = {}   # md5 -> set of filenames
+
+    def _set(self, filename, entry):
+        old = self._files.pop(filename, None)
+        if old is not None:
+            names = self._hashes.get(old[2])
+            if names is not None:
+                names.discard(filename)
+                if not names:
+                    del self._hashes[old[2]]
+        if entry is not None:
+            self._files[filename] = entry
+            self._hashes.setdefault(entry[2], set()).add(filename)
+
+    def refresh(self):
+        seen = set()
+        if os.path.exists(self.folder):
+            with os.scandir(self.folder) as entries:
+                for entry in entries:
+                    if not entry.is_file() or not self.accept(entry.name):
+                        continue
+                    seen.add(entry.name)
+                    stat = entry.stat()
+                    cached = self._files.get(entry.name)
+                    if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+                        continue
+                    try:
+                        self._set(entry.name, (stat.st_mtime_ns, stat.st_size, _file_md5(entry.path)))
+                    except OSError as e:
+                        logging.warning(f"Could not calculate hash for {entry.name}: {e}")
+        for filename in [name for name in self._files if name not in seen]:
+            self._set(filename, None)
+
+    def find(self, md5):
+        """A stored filename with this content hash, or None"""
+        for filename in self._hashes.get(md5, ()):
+            return filename
+        return None
+
+    def record(self, filename, path, md5):
+        stat = os.stat(path)
+        self._set(filename, (stat.st_mtime_ns, stat.st_size, md5))
+
+
+def save_upload(file_storage, filename, hash_index):
+    """
+    Commit one received upload. Returns a result dict with status
+    'uploaded', 'duplicate' or 'too_large'.
+    The caller holds `hash_index.lock` and has refreshed the index, so a
+    bulk upload rescans the folder once rather than once per file.
+    """
+    stream = file_storage.stream
+    if not isinstance(stream, HashingUploadStream):
+        # Not received through UploadRequest; hash it the slow way
+        stream = HashingUploadStream(os.path.join(hash_index.folder, INCOMING_FOLDER))
+        try:
+            for chunk in iter(lambda: file_storage.stream.read(1024 * 1024), b''):
+                stream.write(chunk)
+            return save_upload_stream(stream, filename, hash_index)
+        finally:
+            stream.close()
+    return save_upload_stream(stream, filename, hash_index)
+
+
+def save_upload_stream(stream, filename, hash_index):
+    result = {'filename': filename, 'file_hash': None}
+    if stream.too_large:
+        result.update(status='too_large', size=stream.size)
+        return result
+
+    md5 = stream.hexdigest()
+    result['file_hash'] = md5
+    duplicate_of = hash_index.find(md5)
+    if duplicate_of is not None:
+        result.update(status='duplicate', duplicate_of=duplicate_of)
+        return result
+
+    target_path = os.path.join(hash_index.folder, filename)
+    stream.commit(target_path)
+    hash_index.record(filename, target_path, md5)
+    result.update(status='uploaded', size=stream.size)
+    return result
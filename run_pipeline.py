@@ -2,14 +2,26 @@
 #!/usr/bin/env python3
 """
 Master controller for the resume processing pipeline
-Runs all stages with comprehensive duplicate prevention
+Runs the stage DAG (pipeline_dag.py) with comprehensive duplicate prevention:
+stages whose inputs haven't changed are skipped, and a failed stage doesn't
+stop the others.
+
+    python run_pipeline.py [--force] [--workers N]
 """
 
 import os
 import logging
+import argparse
 import subprocess
 import sys
 from datetime import datetime
+from progress_events import PROGRESS_ENV, PROGRESS_PREFIX
+from metrics import registry, parse_metrics_line, item_failures, write_run_report
+from profiling import parse_profile_line
+from tracing import install_trace_logging
+from pipeline_dag import PipelineScheduler, PIPELINE_WORKERS
+from candidate_store import CandidateRepository
+from candidate_snapshot import save_repository_snapshot
 
 # Setup logging
 logging.basicConfig(
@@ -20,52 +32,75 @@ logging.basicConfig(
         logging.StreamHandler()
     ]
 )
+install_trace_logging()
+
+def collect_stage_output(stdout):
+    """
+    Merge metrics snapshots from a stage's stdout.
+    Returns (remaining output, profile summary or None, failed items).
+    """
+    output = []
+    profile = None
+    failures = 0
+    for line in stdout.splitlines(keepends=True):
+        snapshot = parse_metrics_line(line)
+        if snapshot is not None:
+            registry.merge(snapshot)
+            failures += item_failures(snapshot)
+            continue
+        summary = parse_profile_line(line)
+        if summary is not None:
+            profile = summary
+        elif not line.startswith(PROGRESS_PREFIX):
+            output.append(line)
+    return ''.join(output), profile, failures
 
 def run_stage(script_name, description):
-    """Run a pipeline stage with proper error handling"""
+    """
+    Run a pipeline stage with proper error handling.
+    Returns a dict with 'success', 'item_failures' and 'profile' (a
+    summary when PIPELINE_PROFILE is set, else None).
+    """
     logging.info(f"\n{'='*80}")
     logging.info(f"🚀 STARTING: {description}")
     logging.info(f"{'='*80}")
     
+    # Stages report progress and metrics on stdout when this is set
+    env = dict(os.environ)
+    env[PROGRESS_ENV] = 'stdout'
     try:
         result = subprocess.run([sys.executable, script_name], 
-                              capture_output=True, text=True, check=True)
+                              capture_output=True, text=True, check=True, env=env)
+        output, profile, failures = collect_stage_output(result.stdout)
         logging.info(f"✅ COMPLETED: {description}")
-        if result.stdout:
-            logging.info(f"Output: {result.stdout[-500:]}")  # Last 500 chars
-        return True
+        if failures:
+            logging.warning(f"⚠️ {failures} items failed in {description}; they are retried next run")
+        if output:
+            logging.info(f"Output: {output[-500:]}")  # Last 500 chars
+        return {'success': True, 'item_failures': failures, 'profile': profile}
     except subprocess.CalledProcessError as e:
+        _, profile, failures = collect_stage_output(e.stdout or '')
         logging.error(f"❌ FAILED: {description}")
         logging.error(f"Error: {e.stderr}")
-        return False
+        return {'success': False, 'item_failures': failures, 'profile': profile}
     except Exception as e:
         logging.error(f"❌ UNEXPECTED ERROR in {description}: {e}")
-        return False
+        return {'success': False, 'item_failures': 0, 'profile': None}
 
-def main():
+def main(force=False, workers=PIPELINE_WORKERS):
     """Run the complete pipeline"""
     start_time = datetime.now()
     logging.info(f"🎯 STARTING RESUME PROCESSING PIPELINE")
     logging.info(f"📅 Started at: {start_time}")
     logging.info(f"🔍 Duplicate prevention: ENABLED at all stages")
     
-    # Pipeline stages
-    stages = [
-        ("fetch_resumes.py", "1. Fetch resumes from Gmail"),
-        ("parse_resumes.py", "2. Parse resume files to text"),
-        ("gemini_parser.py", "3. Extract structured data with Gemini"),
-        ("linkedin_enricher.py", "4. Enrich candidate data"),
-        ("schedule_interviews.py", "5. Schedule interviews")
-    ]
-    
-    # Run all stages
-    success_count = 0
-    for script, description in stages:
-        if run_stage(script, description):
-            success_count += 1
-        else:
-            logging.error(f"⏹️ Pipeline stopped at: {description}")
-            break
+    # Independent stages run concurrently; unchanged ones are skipped
+    scheduler = PipelineScheduler(run_stage, workers=workers, force=force)
+    stage_results, schedule = scheduler.run()
+    success_count = sum(1 for r in stage_results if r['success'])
+    for r in stage_results:
+        if not r['success']:
+            logging.error(f"❌ Stage failed: {r['description']}")
     
     # Summary
     end_time = datetime.now()
@@ -74,14 +109,33 @@ def main():
     logging.info(f"\n{'='*80}")
     logging.info("📊 PIPELINE EXECUTION SUMMARY")
     logging.info(f"{'='*80}")
-    logging.info(f"✅ Completed stages: {success_count}/{len(stages)}")
+    logging.info(f"✅ Completed stages: {success_count}/{len(stage_results)} "
+                 f"({len(schedule['skipped'])} skipped as unchanged)")
     logging.info(f"⏱️ Total duration: {duration}")
+    logging.info(f"🧭 Critical path: {' -> '.join(schedule['critical_path']) or 'none'} "
+                 f"({schedule['critical_path_seconds']}s of {schedule['stage_seconds_total']}s stage time)")
     logging.info(f"🏁 Finished at: {end_time}")
     
-    if success_count == len(stages):
+    # Per-run JSON report with stage timings and metrics from every stage
+    report_file = write_run_report(stage_results, start_time, end_time, registry, schedule=schedule)
+    logging.info(f"📈 Run report: {report_file}")
+    
+    # Compact snapshot of the corpus for analytics and a warm API start
+    repository = CandidateRepository()
+    repository.refresh(force=True)
+    try:
+        save_repository_snapshot(repository)
+    except OSError as e:
+        logging.warning(f"⚠️ Could not write candidate snapshot: {e}")
+    
+    if success_count == len(stage_results):
         logging.info("🎉 ALL STAGES COMPLETED SUCCESSFULLY!")
     else:
-        logging.warning(f"⚠️ Pipeline incomplete: {success_count}/{len(stages)} stages completed")
+        logging.warning(f"⚠️ Pipeline incomplete: {success_count}/{len(stage_results)} stages completed")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Run the resume processing pipeline')
+    parser.add_argument('--force', action='store_true', help='Run every stage even if its inputs are unchanged')
+    parser.add_argument('--workers', type=int, default=PIPELINE_WORKERS, help='Stages run at once')
+    args = parser.parse_args()
+    main(force=args.force, workers=args.workers)
\ No newline at end of file
@@ -2,11 +2,16 @@
 import os
 import json
 import logging
+import time
 import hashlib
 from datetime import datetime, timedelta, timezone
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+from google_clients import client_pool
+from panel_scheduler import PanelScheduler, DEFAULT_PANEL_HORIZON_DAYS
+from calendar_cache import calendar_cache
+from progress_events import emit
+from metrics import registry, ITEM_FAILURES
+from profiling import profile_stage
+from tracing import install_trace_logging, span, log_span, trace_index
 
 # --------------------------
 # Setup logging
@@ -15,6 +20,7 @@ logging.basicConfig(
     format="%(asctime)s [%(levelname)s] %(message)s",
     level=logging.INFO
 )
+install_trace_logging()
 
 # --------------------------
 # Google Calendar setup
@@ -24,6 +30,12 @@ CREDENTIALS_FILE = "credentials.json"
 TOKEN_FILE = "token2.json"
 SCHEDULE_LOG_FOLDER = "scheduled_interviews"
 SCHEDULED_CANDIDATES_FILE = 'scheduled_candidates.json'
+BATCH_SIZE = 50  # Calendar API recommends at most 50 requests per batch
+# Comma-separated interviewer calendar IDs for panel scheduling (optional)
+INTERVIEWER_CALENDARS = [c.strip() for c in os.environ.get('INTERVIEWER_CALENDARS', '').split(',') if c.strip()]
+
+CALENDAR_INSERTS = registry.counter('calendar_inserts_total', 'Interview events sent to Google Calendar', ['status'])
+CALENDAR_BATCH_SECONDS = registry.histogram('calendar_batch_seconds', 'Calendar batch insert round-trip time')
 
 
 # --------------------------
@@ -42,9 +54,14 @@ def load_scheduled_candidates():
 
 def save_scheduled_candidate(candidate_data):
     """Save hash of scheduled candidate"""
+    save_scheduled_candidates([candidate_data])
+
+
+def save_scheduled_candidates(candidates):
+    """Save hashes of several scheduled candidates with a single file rewrite"""
     scheduled = load_scheduled_candidates()
-    candidate_id = create_candidate_id(candidate_data)
-    scheduled.add(candidate_id)
+    for candidate_data in candidates:
+        scheduled.add(create_candidate_id(candidate_data))
 
     with open(SCHEDULED_CANDIDATES_FILE, 'w', encoding='utf-8') as f:
         json.dump(list(scheduled), f)
@@ -68,56 +85,54 @@ def ensure_folder(folder):
 
 
 def get_calendar_service():
-    creds = None
-    if os.path.exists(TOKEN_FILE):
-        creds = Credentials.from_authorized_user_file(TOKEN_FILE, SCOPES)
-    if not creds or not creds.valid:
-        flow = InstalledAppFlow.from_client_secrets_file(CREDENTIALS_FILE, SCOPES)
-        creds = flow.run_local_server(port=0)
-        with open(TOKEN_FILE, 'w', encoding='utf-8') as token:
-            token.write(creds.to_json())
-    service = build('calendar', 'v3', credentials=creds)
-    return service
+    """Return the Calendar service from the shared client pool"""
+    return client_pool.service('calendar', 'v3', SCOPES, TOKEN_FILE, CREDENTIALS_FILE)
 
 
 # --------------------------
 # Core scheduling logic
 # --------------------------
-def schedule_interview(service, candidate, start_time, calendar_id='primary', duration_minutes=30):
+def build_interview_event(candidate, start_time, duration_minutes=30, interviewers=None):
+    """Build the Calendar event body for a candidate, or None if they have no email"""
     name = candidate.get("full_name", "Unknown")
     email = candidate.get("email")
 
     if not email:
-        logging.warning(f"Skipping {name}: no email found.")
         return None
 
-    ensure_folder(SCHEDULE_LOG_FOLDER)
     end_time = start_time + timedelta(minutes=duration_minutes)
+    description = f'Interview with {name}\nEmail: {email}\nLinkedIn: {candidate.get("linkedin_url", "N/A")}'
+    if interviewers:
+        description += f'\nPanel: {", ".join(interviewers)}'
 
-    event = {
+    return {
         'summary': f'Interview: {name}',
-        'description': f'Interview with {name}\nEmail: {email}\nLinkedIn: {candidate.get("linkedin_url", "N/A")}',
+        'description': description,
         'start': {'dateTime': start_time.isoformat(), 'timeZone': 'UTC'},
         'end': {'dateTime': end_time.isoformat(), 'timeZone': 'UTC'},
-        'attendees': [{'email': email}],
+        'attendees': [{'email': email}] + [{'email': interviewer} for interviewer in interviewers or []],
         'reminders': {'useDefault': True},
     }
 
-    created_event = service.events().insert(calendarId=calendar_id, body=event).execute()
 
-    # Log scheduled interview info
-    event_id = created_event.get("id")
-    calendar_link = created_event.get("htmlLink")
+def record_scheduled_interview(candidate, start_time, end_time, created_event, interviewers=None):
+    """Write the local JSON record for a created Calendar event and return its path"""
+    name = candidate.get("full_name", "Unknown")
+    email = candidate.get("email")
 
     schedule_record = {
         "candidate_name": name,
         "email": email,
         "start_time": start_time.isoformat(),
         "end_time": end_time.isoformat(),
-        "event_id": event_id,
-        "calendar_link": calendar_link,
+        "event_id": created_event.get("id"),
+        "calendar_link": created_event.get("htmlLink"),
         "timestamp": datetime.now(timezone.utc).isoformat()
     }
+    if interviewers:
+        schedule_record["interviewers"] = list(interviewers)
+    if candidate.get("trace_id"):
+        schedule_record["trace_id"] = candidate["trace_id"]
 
     safe_name = name.replace(" ", "_").lower()
     filename = f"{safe_name}_{start_time.strftime('%Y%m%dT%H%M')}.json"
@@ -126,13 +141,161 @@ def schedule_interview(service, candidate, start_time, calendar_id='primary', du
     with open(filepath, "w", encoding="utf-8") as f:
         json.dump(schedule_record, f, indent=2)
 
+    return filepath
+
+
+def schedule_interview(service, candidate, start_time, calendar_id='primary', duration_minutes=30, interviewers=None):
+    name = candidate.get("full_name", "Unknown")
+    email = candidate.get("email")
+
+    event = build_interview_event(candidate, start_time, duration_minutes, interviewers)
+    if event is None:
+        logging.warning(f"Skipping {name}: no email found.")
+        CALENDAR_INSERTS.inc(status='skipped')
+        return None
+
+    ensure_folder(SCHEDULE_LOG_FOLDER)
+    end_time = start_time + timedelta(minutes=duration_minutes)
+
+    with span('schedule', candidate.get("trace_id"), candidate_name=name):
+        try:
+            created_event = service.events().insert(calendarId=calendar_id, body=event).execute()
+        except Exception:
+            CALENDAR_INSERTS.inc(status='failed')
+            raise
+    CALENDAR_INSERTS.inc(status='scheduled')
+    calendar_cache.invalidate(calendar_id)
+
+    filepath = record_scheduled_interview(candidate, start_time, end_time, created_event, interviewers)
     save_scheduled_candidate(candidate)
 
     logging.info(f"✅ Scheduled interview for {name} ({email}) at {start_time.strftime('%Y-%m-%d %H:%M')} UTC")
     logging.info(f"🗓️  Saved to {filepath}")
+    emit('schedule', 'scheduled', candidate_name=name, start_time=start_time.isoformat())
     return end_time
 
 
+def schedule_interviews_batch(service, bookings, calendar_id='primary', duration_minutes=30, batch_size=BATCH_SIZE):
+    """
+    Schedule many interviews through the Calendar batch endpoint.
+
+    `bookings` is a list of (candidate, start_time) pairs, or
+    (candidate, start_time, interviewers) for panel interviews. Inserts are sent in
+    groups of `batch_size`; a failed insert only affects its own booking.
+    Returns a consolidated result with scheduled, failed and skipped entries.
+    """
+    ensure_folder(SCHEDULE_LOG_FOLDER)
+    results = {'scheduled': [], 'failed': [], 'skipped': []}
+
+    pending = []
+    for booking in bookings:
+        candidate, start_time = booking[0], booking[1]
+        interviewers = booking[2] if len(booking) > 2 else None
+        event = build_interview_event(candidate, start_time, duration_minutes, interviewers)
+        if event is None:
+            name = candidate.get("full_name", "Unknown")
+            logging.warning(f"Skipping {name}: no email found.")
+            results['skipped'].append({'candidate_name': name, 'reason': 'no email'})
+            CALENDAR_INSERTS.inc(status='skipped')
+            continue
+        pending.append((candidate, start_time, event, interviewers))
+
+    for offset in range(0, len(pending), batch_size):
+        chunk = pending[offset:offset + batch_size]
+        responses = {}
+
+        def on_response(request_id, response, exception):
+            responses[request_id] = (response, exception)
+
+        batch = service.new_batch_http_request(callback=on_response)
+        for index, (candidate, start_time, event, interviewers) in enumerate(chunk):
+            batch.add(
+                service.events().insert(calendarId=calendar_id, body=event),
+                request_id=str(index)
+            )
+
+        batch_started_at = time.time()
+        batch_started = time.perf_counter()
+        try:
+            with CALENDAR_BATCH_SECONDS.time():
+                batch.execute()
+        except Exception as e:
+            # The whole HTTP batch failed; every item in it is reported as failed
+            logging.error(f"❌ Batch insert failed for {len(chunk)} interviews: {e}")
+            for index in range(len(chunk)):
+                responses.setdefault(str(index), (None, e))
+        # Every booking in the chunk shares the batch round-trip as its span
+        batch_seconds = time.perf_counter() - batch_started
+
+        confirmed = []
+        for index, (candidate, start_time, event, interviewers) in enumerate(chunk):
+            name = candidate.get("full_name", "Unknown")
+            response, exception = responses.get(str(index), (None, None))
+
+            if exception is not None or not response:
+                error = str(exception) if exception is not None else 'no response from Calendar API'
+                logging.error(f"❌ Failed to schedule {name}: {error}")
+                CALENDAR_INSERTS.inc(status='failed')
+                log_span('schedule', candidate.get("trace_id"), batch_started_at, batch_seconds,
+                         status='failed', candidate_name=name)
+                results['failed'].append({
+                    'candidate_name': name,
+                    'email': candidate.get("email"),
+                    'start_time': start_time.isoformat(),
+                    'error': error
+                })
+                continue
+
+            end_time = start_time + timedelta(minutes=duration_minutes)
+            filepath = record_scheduled_interview(candidate, start_time, end_time, response, interviewers)
+            confirmed.append(candidate)
+            CALENDAR_INSERTS.inc(status='scheduled')
+            log_span('schedule', candidate.get("trace_id"), batch_started_at, batch_seconds,
+                     candidate_name=name, event_id=response.get("id"))
+            results['scheduled'].append({
+                'candidate_name': name,
+                'email': candidate.get("email"),
+                'start_time': start_time.isoformat(),
+                'end_time': end_time.isoformat(),
+                'event_id': response.get("id"),
+                'interviewers': interviewers or [],
+                'record_file': filepath
+            })
+            logging.info(f"✅ Scheduled interview for {name} at {start_time.strftime('%Y-%m-%d %H:%M')} UTC")
+            emit('schedule', 'scheduled', candidate_name=name, start_time=start_time.isoformat(),
+                 scheduled=len(results['scheduled']))
+
+        if confirmed:
+            save_scheduled_candidates(confirmed)
+            calendar_cache.invalidate(calendar_id)
+
+    logging.info(
+        f"📦 Batch scheduling: {len(results['scheduled'])} scheduled, "
+        f"{len(results['failed'])} failed, {len(results['skipped'])} skipped"
+    )
+    return results
+
+
+def allocate_panel_slots(service, candidates, interviewers, start_time, panel_size=None,
+                         horizon_days=DEFAULT_PANEL_HORIZON_DAYS, duration_minutes=30,
+                         buffer_minutes=15, work_hours=(9, 17), skip_weekends=True):
+    """Place candidates into panel slots using one freebusy query for all interviewers"""
+    scheduler = PanelScheduler.from_service(
+        service,
+        interviewers,
+        start=start_time,
+        horizon_days=horizon_days,
+        panel_size=panel_size,
+        duration_minutes=duration_minutes,
+        buffer_minutes=buffer_minutes,
+        work_hours=work_hours,
+        skip_weekends=skip_weekends
+    )
+    assignments = scheduler.assign(candidates)
+    logging.info(f"👥 Panel load: {scheduler.load}")
+    return [(candidate, slot_start, panel) for candidate, slot_start, slot_end, panel in assignments]
+
+
 def process_all_candidates(
     input_folder="enriched_json",
     start_date=None,
@@ -140,9 +303,16 @@ def process_all_candidates(
     duration_minutes=30,
     buffer_minutes=15,
     work_hours=(9, 17),
-    skip_weekends=True
+    skip_weekends=True,
+    interviewers=None,
+    panel_size=None,
+    horizon_days=DEFAULT_PANEL_HORIZON_DAYS
 ):
-    """Schedule interviews with candidate-level deduplication"""
+    """
+    Schedule interviews with candidate-level deduplication.
+    When `interviewers` (calendar IDs) is given, candidates are placed in the
+    earliest slots where a panel of `panel_size` interviewers is free.
+    """
     service = get_calendar_service()
     ensure_folder(SCHEDULE_LOG_FOLDER)
 
@@ -164,16 +334,20 @@ def process_all_candidates(
         while start_time.weekday() >= 5:
             start_time += timedelta(days=1)
 
-    scheduled_count = 0
-    skipped_count = 0
     duplicate_count = 0
+    bookings = []
+    pending_candidates = []
 
-    # Process all candidate JSON files
+    # Allocate a slot to every candidate that still needs an interview
     for filename in sorted(os.listdir(input_folder)):
         if filename.endswith(".json"):
             file_path = os.path.join(input_folder, filename)
             with open(file_path, "r", encoding="utf-8") as f:
                 candidate = json.load(f)
+            if not candidate.get("trace_id"):
+                trace_id = trace_index.get(filename)
+                if trace_id:
+                    candidate["trace_id"] = trace_id
 
             candidate_name = candidate.get("full_name", "Unknown")
             candidate_id = create_candidate_id(candidate)
@@ -184,6 +358,25 @@ def process_all_candidates(
                 duplicate_count += 1
                 continue
 
+            # Candidates without an email don't consume a slot
+            if not candidate.get("email"):
+                bookings.append((candidate, start_time))
+                continue
+
+            pending_candidates.append(candidate)
+
+    if interviewers:
+        bookings.extend(allocate_panel_slots(
+            service, pending_candidates, interviewers, start_time,
+            panel_size=panel_size,
+            horizon_days=horizon_days,
+            duration_minutes=duration_minutes,
+            buffer_minutes=buffer_minutes,
+            work_hours=work_hours,
+            skip_weekends=skip_weekends
+        ))
+    else:
+        for candidate in pending_candidates:
             # Move to next day if work hours exceeded
             interview_end_hour = start_time.hour + (start_time.minute + duration_minutes) / 60
             if interview_end_hour >= work_hours[1]:
@@ -193,17 +386,22 @@ def process_all_candidates(
                         start_time += timedelta(days=1)
                 logging.info(f"Moving to next day: {start_time.strftime('%Y-%m-%d')}")
 
-            end_time = schedule_interview(service, candidate, start_time, duration_minutes=duration_minutes)
-            if end_time:
-                scheduled_count += 1
-                start_time = end_time + timedelta(minutes=buffer_minutes)
-            else:
-                skipped_count += 1
+            bookings.append((candidate, start_time))
+            start_time += timedelta(minutes=duration_minutes + buffer_minutes)
+
+    # Create all events through the batch endpoint
+    batch_results = schedule_interviews_batch(service, bookings, duration_minutes=duration_minutes)
+    scheduled_count = len(batch_results['scheduled'])
+    skipped_count = len(batch_results['skipped'])
+    failed_count = len(batch_results['failed'])
+    if failed_count:
+        ITEM_FAILURES.inc(failed_count, stage='schedule')
 
     summary = {
         "timestamp": datetime.now(timezone.utc).isoformat(),
         "scheduled_count": scheduled_count,
         "skipped_count": skipped_count,
+        "failed_count": failed_count,
         "duplicate_count": duplicate_count
     }
 
@@ -212,21 +410,26 @@ def process_all_candidates(
         json.dump(summary, f, indent=2)
 
     logging.info("✅ Scheduling complete!")
-    logging.info(f"📊 Scheduled: {scheduled_count}, Skipped: {skipped_count}, Duplicates: {duplicate_count}")
+    logging.info(f"📊 Scheduled: {scheduled_count}, Skipped: {skipped_count}, Failed: {failed_count}, Duplicates: {duplicate_count}")
     logging.info(f"🗂️  Summary saved to {summary_file}")
 
+    summary['failed'] = batch_results['failed']
+    return summary
+
 
 # --------------------------
 # Entry point
 # --------------------------
 if __name__ == "__main__":
-    logging.info("Starting to schedule interviews...")
-
-    process_all_candidates(
-        duration_minutes=45,      # 45-minute interviews
-        buffer_minutes=15,        # 15-minute buffer between interviews
-        work_hours=(9, 17),       # 9 AM to 5 PM
-        skip_weekends=True        # Skip Saturday/Sunday
-    )
+    with profile_stage('schedule'):
+        logging.info("Starting to schedule interviews...")
+
+        process_all_candidates(
+            duration_minutes=45,      # 45-minute interviews
+            buffer_minutes=15,        # 15-minute buffer between interviews
+            work_hours=(9, 17),       # 9 AM to 5 PM
+            skip_weekends=True,       # Skip Saturday/Sunday
+            interviewers=INTERVIEWER_CALENDARS or None
+        )
 
-    logging.info("✅ Interview scheduling completed!")
+        logging.info("✅ Interview scheduling completed!")
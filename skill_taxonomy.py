@@ -0,0 +1,287 @@
+# skill_taxonomy.py
+import os
+import re
+import json
+import logging
+import threading
+
+# --------------------------
+# Configuration
+# --------------------------
+SKILL_TAXONOMY_FILE = 'skill_taxonomy.json'   # Optional local additions: {"Canonical": ["alias", ...]}
+MAX_SKILL_WORDS = 5                           # Longest multi-word skill matched inside text
+CACHE_LIMIT = 100000                          # Raw skill strings memoized before the cache is reset
+
+# Canonical skill -> aliases. Matching ignores case and punctuation
+# ("Node.js", "node js" and "NODE-JS" are the same key), so aliases only
+# need to cover genuinely different spellings.
+SKILL_ALIASES = {
+    # Languages
+    'Python': ['python3', 'python 3', 'py'],
+    'Java': ['core java', 'java se', 'j2ee', 'java ee'],
+    'JavaScript': ['js', 'java script', 'ecmascript', 'es6', 'vanilla js'],
+    'TypeScript': ['ts'],
+    'Go': ['golang', 'go lang'],
+    'Rust': ['rustlang'],
+    'C': ['c language', 'ansi c'],
+    'C++': ['cpp', 'c plus plus'],
+    'C#': ['c sharp', 'csharp'],
+    'Ruby': [],
+    'PHP': [],
+    'Kotlin': [],
+    'Swift': [],
+    'Scala': [],
+    'R': ['r language', 'r programming'],
+    'MATLAB': [],
+    'Bash': ['shell scripting', 'shell script', 'bash scripting', 'shell'],
+    'SQL': ['structured query language'],
+    'HTML': ['html5'],
+    'CSS': ['css3'],
+    # Frameworks and libraries
+    'React': ['reactjs', 'react js', 'react.js'],
+    'React Native': ['reactnative'],
+    'Angular': ['angularjs', 'angular js'],
+    'Vue.js': ['vue', 'vuejs'],
+    'Next.js': ['nextjs'],
+    'Node.js': ['node', 'nodejs'],
+    'Express': ['expressjs', 'express js'],
+    'Django': [],
+    'Flask': [],
+    'FastAPI': ['fast api'],
+    'Spring Boot': ['springboot', 'spring'],
+    '.NET': ['dotnet', 'dot net', 'asp.net', 'asp net'],
+    'Tailwind CSS': ['tailwind', 'tailwindcss'],
+    'Pandas': [],
+    'NumPy': [],
+    'scikit-learn': ['sklearn', 'scikit learn', 'scikit'],
+    'TensorFlow': ['tensor flow', 'tf'],
+    'PyTorch': ['torch', 'py torch'],
+    'Keras': [],
+    # Data and ML
+    'Machine Learning': ['ml'],
+    'Deep Learning': ['dl'],
+    'Natural Language Processing': ['nlp'],
+    'Computer Vision': ['cv'],
+    'Artificial Intelligence': ['ai'],
+    'Generative AI': ['genai', 'gen ai'],
+    'Large Language Models': ['llm', 'llms'],
+    'Data Analysis': ['data analytics'],
+    'Data Science': [],
+    'Power BI': ['powerbi'],
+    'Tableau': [],
+    'Apache Spark': ['spark', 'pyspark'],
+    'Hadoop': ['apache hadoop'],
+    'Kafka': ['apache kafka'],
+    'Airflow': ['apache airflow'],
+    # Databases
+    'PostgreSQL': ['postgres', 'postgre sql', 'psql'],
+    'MySQL': ['my sql'],
+    'MongoDB': ['mongo', 'mongo db'],
+    'Redis': [],
+    'Elasticsearch': ['elastic search', 'elastic'],
+    'SQLite': [],
+    'Oracle Database': ['oracle', 'oracle db'],
+    'DynamoDB': ['dynamo db'],
+    # Cloud and DevOps
+    'AWS': ['amazon web services'],
+    'Google Cloud': ['gcp', 'google cloud platform'],
+    'Azure': ['microsoft azure'],
+    'Docker': [],
+    'Kubernetes': ['k8s'],
+    'Terraform': [],
+    'Ansible': [],
+    'Jenkins': [],
+    'CI/CD': ['cicd', 'ci cd', 'continuous integration'],
+    'Git': ['github', 'gitlab', 'version control'],
+    'Linux': ['unix'],
+    'Microservices': ['microservice', 'micro services'],
+    # Web and APIs
+    'REST APIs': ['rest', 'rest api', 'restful', 'restful apis', 'restful api'],
+    'GraphQL': ['graph ql'],
+    # Design and process
+    'Figma': [],
+    'UI/UX Design': ['ui ux', 'uiux', 'ux design', 'ui design'],
+    'Agile': ['scrum', 'agile methodologies'],
+    'Data Structures and Algorithms': ['dsa', 'data structures', 'algorithms'],
+    'Object-Oriented Programming': ['oop', 'oops'],
+}
+
+# Single-word keys that are ordinary words in running text ("ready to go");
+# they only match a whole skill string, never inside a phrase
+_EXACT_ONLY = frozenset(['go', 'r', 'c', 'ts', 'py', 'tf', 'cv', 'dl', 'spring', 'express',
+                         'node', 'shell', 'elastic', 'oracle', 'rest', 'swift', 'spark', 'torch'])
+
+# Words that may surround a skill in a compound string ("Python programming")
+_FILLER = frozenset('''
+a an and or the in of with using basic basics advanced intermediate proficient proficiency knowledge
+familiar familiarity strong good working hands on expert expertise programming language languages
+framework frameworks library libraries development developer tools tool concepts skills experience
+'''.split())
+
+_KEY_RE = re.compile(r'[a-z0-9][a-z0-9+#]*')          # Keeps "c++" and "c#" whole
+_SPLIT_RE = re.compile(r'\s*(?:[,;|&/()\[\]]|\band\b)\s*', re.IGNORECASE)
+
+
+def skill_tokens(text):
+    return _KEY_RE.findall(str(text).lower())
+
+
+def skill_key(text):
+    """Case- and punctuation-insensitive lookup key ("Node.JS " -> "node js")"""
+    return ' '.join(skill_tokens(text))
+
+
+def clean_skill(text):
+    """Display form for a skill not in the taxonomy"""
+    return ' '.join(str(text).split()).strip(' .,;:-')
+
+
+class SkillTaxonomy:
+    """
+    Canonical skills with compact integer IDs.
+
+    Aliases compile into one hash lookup (normalized key -> skill ID) and a
+    word trie for finding multi-word skills inside longer strings ("React
+    and Redux", a job description). Skills outside the taxonomy get an ID
+    the first time they are seen, keyed the same way, so "Foo bar" and
+    "foo  Bar" still share one. IDs are stable for the life of the process;
+    persisted data stores canonical names, not IDs.
+    """
+
+    def __init__(self, aliases=SKILL_ALIASES, path=SKILL_TAXONOMY_FILE):
+        self._lock = threading.Lock()
+        self._names = []     # skill ID -> canonical name
+        self._lookup = {}    # normalized key -> skill ID
+        self._trie = {}      # word -> child node; None -> skill ID
+        self._cache = {}     # raw skill string -> tuple of skill IDs
+        self._compile(aliases)
+        if path and os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self._compile(json.load(f))
+            except (OSError, ValueError, AttributeError) as e:
+                logging.warning(f"⚠️ Could not load skill taxonomy {path}: {e}")
+
+    def _compile(self, aliases):
+        for canonical, names in aliases.items():
+            skill_id = self._lookup.get(skill_key(canonical))
+            if skill_id is None:
+                skill_id = self._register(clean_skill(canonical))
+            for alias in names or ():
+                self._index(skill_key(alias), skill_id)
+
+    def _register(self, name):
+        skill_id = len(self._names)
+        self._names.append(name)
+        self._index(skill_key(name), skill_id)
+        return skill_id
+
+    def _index(self, key, skill_id):
+        if not key:
+            return
+        self._lookup[key] = skill_id
+        words = key.split()
+        if len(words) > MAX_SKILL_WORDS or key in _EXACT_ONLY:
+            return
+        node = self._trie
+        for word in words:
+            node = node.setdefault(word, {})
+        node[None] = skill_id
+
+    # --------------------------
+    # Matching
+    # --------------------------
+    def _scan(self, words):
+        """Longest trie matches in a word list as (start, end, skill ID)"""
+        matches = []
+        i = 0
+        while i < len(words):
+            node, end, found = self._trie, i, None
+            while end < len(words):
+                node = node.get(words[end])
+                if node is None:
+                    break
+                end += 1
+                if None in node:
+                    found = (i, end, node[None])
+            if found:
+                matches.append(found)
+                i = found[1]
+            else:
+                i += 1
+        return matches
+
+    def _resolve(self, piece):
+        """IDs for one piece of a skill string, registering it if unknown"""
+        key = skill_key(piece)
+        if not key:
+            return ()
+        skill_id = self._lookup.get(key)
+        if skill_id is not None:
+            return (skill_id,)
+        words = key.split()
+        matches = self._scan(words)
+        covered = set()
+        for start, end, _ in matches:
+            covered.update(range(start, end))
+        if matches and all(i in covered or word in _FILLER for i, word in enumerate(words)):
+            return tuple(skill_id for _, _, skill_id in matches)
+        name = clean_skill(piece)
+        return (self._register(name),) if name else ()
+
+    def ids(self, skill):
+        """Skill IDs for one raw skill string ("Python/Django" -> two IDs)"""
+        cached = self._cache.get(skill)
+        if cached is not None:
+            return cached
+        with self._lock:
+            key = skill_key(skill)
+            skill_id = self._lookup.get(key)
+            if skill_id is not None:
+                result = (skill_id,)
+            elif not key:
+                result = ()
+            else:
+                result = []
+                for piece in _SPLIT_RE.split(str(skill)):
+                    result.extend(self._resolve(piece))
+                result = tuple(dict.fromkeys(result))
+            if len(self._cache) >= CACHE_LIMIT:
+                self._cache = {}
+            self._cache[skill] = result
+            return result
+
+    def canonical_ids(self, skills):
+        """Distinct skill IDs for a candidate's skills (a list or comma-separated string)"""
+        if not skills:
+            return []
+        if isinstance(skills, str):
+            skills = skills.split(',')
+        result = {}
+        for skill in skills:
+            if isinstance(skill, str):
+                for skill_id in self.ids(skill):
+                    result[skill_id] = None
+        return list(result)
+
+    def canonicalize(self, skills):
+        """Canonical skill names, de-duplicated, in first-seen order"""
+        return [self._names[skill_id] for skill_id in self.canonical_ids(skills)]
+
+    def lookup(self, skill):
+        """Skill ID for a whole skill name or alias, or None (never registers)"""
+        return self._lookup.get(skill_key(skill))
+
+    def find_in_text(self, text):
+        """Skill IDs named anywhere in free text, e.g. a job description"""
+        return [skill_id for _, _, skill_id in self._scan(skill_tokens(text))]
+
+    def name(self, skill_id):
+        return self._names[skill_id]
+
+    def __len__(self):
+        return len(self._names)
+
+
+# Shared by the enricher, the API indexes and aggregates
+skill_taxonomy = SkillTaxonomy()
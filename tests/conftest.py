@@ -0,0 +1,17 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Stage modules install the JSON-lines trace log on import; keep tests from writing it
+os.environ.setdefault('PIPELINE_TRACE_LOG', 'off')
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Run in an empty directory: the stages read and write state files in the cwd"""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
@@ -0,0 +1,67 @@
+from datetime import datetime, timedelta, timezone
+
+from calendar_availability import (compute_available_slots, merge_intervals, parse_busy_intervals,
+                                   split_into_slots, subtract_busy)
+
+MONDAY = datetime(2026, 1, 5, tzinfo=timezone.utc)
+
+
+def at(hour, minute=0, day=0):
+    return MONDAY + timedelta(days=day, hours=hour, minutes=minute)
+
+
+def busy(*pairs):
+    return [{'start': start.isoformat().replace('+00:00', 'Z'), 'end': end.isoformat()} for start, end in pairs]
+
+
+def starts(slots):
+    return [start.strftime('%a %H:%M') for start, _ in slots]
+
+
+def test_overlapping_adjacent_and_contained_intervals_merge():
+    merged = parse_busy_intervals(busy(
+        (at(13), at(14)),
+        (at(10), at(11, 30)), (at(11), at(12)),   # Overlapping
+        (at(12), at(12, 30)),                     # Adjacent to the previous one
+        (at(13, 15), at(13, 45)),                 # Contained in 13:00-14:00
+        (at(15), at(15)),                         # Empty
+    ))
+    assert merged == [(at(10), at(12, 30)), (at(13), at(14))]
+    assert merge_intervals([]) == []
+
+
+def test_free_windows_are_the_gaps_between_merged_intervals():
+    windows = [(at(9), at(17)), (at(9, day=1), at(17, day=1))]
+    merged = [(at(8), at(9, 30)), (at(10), at(12, 30)), (at(13), at(14)), (at(16), at(10, day=1))]
+    assert subtract_busy(windows, merged) == [
+        (at(9, 30), at(10)), (at(12, 30), at(13)), (at(14), at(16)),
+        (at(10, day=1), at(17, day=1)),
+    ]
+
+
+def test_busy_covering_window_edges_or_the_whole_window():
+    window = [(at(9), at(17))]
+    assert subtract_busy(window, [(at(9), at(10)), (at(16), at(17))]) == [(at(10), at(16))]
+    assert subtract_busy(window, [(at(7), at(18))]) == []
+    assert subtract_busy(window, [(at(7), at(9)), (at(17), at(18))]) == window
+    assert subtract_busy(window, []) == window
+
+
+def test_slots_fill_the_window_up_to_its_edges():
+    # A slot may start at the window start and end exactly at the window end
+    assert starts(split_into_slots([(at(9), at(17))], 60, 60)) == [f'Mon {h:02d}:00' for h in range(9, 17)]
+    # Unaligned window starts round up to the grid; a slot that would overrun the end is dropped
+    assert starts(split_into_slots([(at(9, 10), at(11, 40))], 45, 30)) == ['Mon 09:30', 'Mon 10:00', 'Mon 10:30']
+    assert split_into_slots([(at(9, 30), at(10, 10))], 45, 30) == []
+
+
+def test_compute_available_slots_end_to_end():
+    entries = busy((at(9), at(10)), (at(9, 30), at(11)), (at(11), at(12)), (at(12, 15), at(12, 45)))
+    slots = compute_available_slots(entries, at(0), at(0, day=7), duration_minutes=60, granularity_minutes=60,
+                                    work_hours=(9, 15))
+    assert starts(slots)[:3] == ['Mon 13:00', 'Mon 14:00', 'Tue 09:00']
+    assert all(start.weekday() < 5 for start, _ in slots)
+    assert len(slots) == 2 + 6 * 4
+
+    weekend = compute_available_slots([], at(0, day=5), at(0, day=7), skip_weekends=False, work_hours=(9, 11))
+    assert starts(weekend) == ['Sat 09:00', 'Sat 10:00', 'Sun 09:00', 'Sun 10:00']
@@ -0,0 +1,185 @@
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from googleapiclient.errors import HttpError
+
+import calendar_cache as calendar_cache_module
+from calendar_cache import CalendarCache, _bucket_floor
+
+NOW = datetime.now(timezone.utc).replace(microsecond=0)
+
+
+def event(event_id, hours_from_now, summary='Interview: Jane', status='confirmed'):
+    start = NOW + timedelta(hours=hours_from_now)
+    return {'id': event_id, 'status': status, 'summary': summary,
+            'start': {'dateTime': start.isoformat()},
+            'end': {'dateTime': (start + timedelta(minutes=30)).isoformat()}}
+
+
+class FakeResponse(dict):
+    def __init__(self, status):
+        super().__init__()
+        self.status = status
+        self.reason = 'Gone'
+
+
+class FakeRequest:
+    def __init__(self, result):
+        self.result = result
+
+    def execute(self):
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result() if callable(self.result) else self.result
+
+
+class FakeCalendar:
+    """events().list answers from scripted pages; freebusy().query records its bodies"""
+
+    def __init__(self):
+        self.full_pages = []      # Responses for list calls without a sync token, in order
+        self.delta_pages = []     # Responses (or exceptions) for calls with a sync token
+        self.list_calls = []
+        self.freebusy_bodies = []
+        self.gate = None          # Event a list call waits on, to hold a sync in flight
+
+    def events(self):
+        return self
+
+    def list(self, **kwargs):
+        self.list_calls.append(kwargs)
+        if self.gate is not None:
+            self.gate.wait(5)
+        pages = self.delta_pages if kwargs.get('syncToken') else self.full_pages
+        return FakeRequest(pages.pop(0))
+
+    def freebusy(self):
+        return self
+
+    def query(self, body):
+        self.freebusy_bodies.append(body)
+        return FakeRequest({'calendars': {'primary': {'busy': []}}})
+
+
+def ids(events):
+    return [e['id'] for e in events]
+
+
+def window():
+    return NOW - timedelta(hours=1), NOW + timedelta(days=7)
+
+
+def test_full_sync_follows_pages_and_skips_cancelled():
+    service = FakeCalendar()
+    service.full_pages = [
+        {'items': [event('a', 2), event('gone', 3, status='cancelled')], 'nextPageToken': 'p2'},
+        {'items': [event('b', 1)], 'nextSyncToken': 'sync-1'},
+    ]
+    cache = CalendarCache()
+    assert ids(cache.events(lambda: service, 'primary', *window())) == ['b', 'a']
+    assert service.list_calls[1]['pageToken'] == 'p2'
+    assert cache._sync_tokens['primary'] == 'sync-1'
+
+
+def test_ttl_serves_the_mirror_then_merges_the_delta():
+    service = FakeCalendar()
+    service.full_pages = [{'items': [event('a', 2), event('b', 3)], 'nextSyncToken': 'sync-1'}]
+    service.delta_pages = [{'items': [event('b', 3, status='cancelled'), event('a', 4, summary='Moved'),
+                                      event('c', 5)], 'nextSyncToken': 'sync-2'}]
+    cache = CalendarCache(ttl_seconds=60)
+    cache.events(lambda: service, 'primary', *window())
+    cache.events(lambda: service, 'primary', *window())
+    assert len(service.list_calls) == 1
+
+    cache.invalidate('primary')
+    events = cache.events(lambda: service, 'primary', *window())
+    assert service.list_calls[-1]['syncToken'] == 'sync-1'
+    assert ids(events) == ['a', 'c']
+    assert events[0]['summary'] == 'Moved'
+    assert ids(cache.events(lambda: service, 'primary', *window(), query='moved')) == ['a']
+    assert cache._sync_tokens['primary'] == 'sync-2'
+
+
+def test_expired_sync_token_falls_back_to_a_full_sync():
+    service = FakeCalendar()
+    service.full_pages = [{'items': [event('a', 2)], 'nextSyncToken': 'sync-1'},
+                          {'items': [event('z', 1)], 'nextSyncToken': 'sync-fresh'}]
+    service.delta_pages = [HttpError(FakeResponse(410), b'gone')]
+    cache = CalendarCache(ttl_seconds=0)
+    cache.events(lambda: service, 'primary', *window())
+
+    assert ids(cache.events(lambda: service, 'primary', *window())) == ['z']
+    assert cache._sync_tokens['primary'] == 'sync-fresh'
+
+
+def test_other_http_errors_propagate_and_release_the_sync():
+    service = FakeCalendar()
+    service.full_pages = [HttpError(FakeResponse(500), b'boom'),
+                          {'items': [event('a', 2)], 'nextSyncToken': 'sync-1'}]
+    cache = CalendarCache()
+    with pytest.raises(HttpError):
+        cache.events(lambda: service, 'primary', *window())
+    assert ids(cache.events(lambda: service, 'primary', *window())) == ['a']
+
+
+def test_sync_runs_outside_the_lock_and_only_once_per_calendar():
+    service = FakeCalendar()
+    service.full_pages = [{'items': [event('a', 2)], 'nextSyncToken': 'sync-1'}]
+    service.gate = threading.Event()
+    cache = CalendarCache()
+    results = []
+    readers = [threading.Thread(target=lambda: results.append(cache.events(lambda: service, 'primary', *window())))
+               for _ in range(3)]
+    for reader in readers:
+        reader.start()
+
+    # While the sync is held up, freebusy and invalidate still go through
+    start, end = window()
+    assert cache.freebusy(lambda: service, ['primary'], start, end) == {'primary': {'busy': []}}
+    cache.invalidate('other')
+    service.gate.set()
+    for reader in readers:
+        reader.join(5)
+
+    assert len(service.list_calls) == 1
+    assert [ids(r) for r in results] == [['a']] * 3
+
+
+def test_freebusy_is_cached_per_bucket_and_dropped_on_invalidate():
+    service = FakeCalendar()
+    cache = CalendarCache(ttl_seconds=60)
+    start = _bucket_floor(NOW) + timedelta(minutes=1)
+    cache.freebusy(lambda: service, ['primary'], start, start + timedelta(days=1))
+    cache.freebusy(lambda: service, ['primary'], start + timedelta(minutes=5), start + timedelta(days=1))
+    assert len(service.freebusy_bodies) == 1
+    assert service.freebusy_bodies[0]['timeMin'] == _bucket_floor(NOW).isoformat()
+
+    cache.invalidate('primary')
+    cache.freebusy(lambda: service, ['primary'], start, start + timedelta(days=1))
+    assert len(service.freebusy_bodies) == 2
+
+
+def test_bucket_floor_rounds_down_to_the_bucket():
+    moment = datetime(2026, 1, 5, 9, 44, 59, tzinfo=timezone.utc)
+    assert _bucket_floor(moment) == datetime(2026, 1, 5, 9, 30, tzinfo=timezone.utc)
+    assert _bucket_floor(moment, minutes=60) == datetime(2026, 1, 5, 9, 0, tzinfo=timezone.utc)
+    assert calendar_cache_module.FREEBUSY_BUCKET_MINUTES == 15
+
+
+def test_invalidate_during_a_sync_leaves_the_result_stale():
+    service = FakeCalendar()
+    service.full_pages = [{'items': [event('a', 2)], 'nextSyncToken': 'sync-1'}]
+    service.delta_pages = [{'items': [event('b', 3)], 'nextSyncToken': 'sync-2'}]
+    service.gate = threading.Event()
+    cache = CalendarCache()
+    reader = threading.Thread(target=lambda: cache.events(lambda: service, 'primary', *window()))
+    reader.start()
+    while not service.list_calls:
+        pass
+    cache.invalidate('primary')
+    service.gate.set()
+    reader.join(5)
+
+    assert ids(cache.events(lambda: service, 'primary', *window())) == ['a', 'b']
+    assert service.list_calls[-1]['syncToken'] == 'sync-1'
@@ -0,0 +1,80 @@
+import os
+import random
+
+import pytest
+
+from candidate_ranking import CandidateRankingIndex
+
+ROLES = ['Backend Developer', 'Data Scientist', 'Frontend Developer', 'DevOps Engineer']
+SKILLS = ['Python', 'Django', 'React', 'Docker', 'Kubernetes', 'Machine Learning', 'PostgreSQL', 'Go']
+WORDS = 'designed built scalable services pipelines latency platform distributed systems cloud api'.split()
+JOB = 'Backend developer building Python and Django services on Kubernetes with PostgreSQL'
+
+
+def make_candidate(rng):
+    return {
+        'current_role': rng.choice(ROLES),
+        'skills': rng.sample(SKILLS, 3),
+        'experience_summary': ' '.join(rng.choice(WORDS) for _ in range(20))
+    }
+
+
+def build(folder, candidates):
+    index = CandidateRankingIndex(text_folder=str(folder))
+    for candidate_id, candidate in candidates.items():
+        index.on_change('added', candidate_id, candidate, None)
+    index.warm()
+    return index
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    rng = random.Random(7)
+    candidates = {f'c{i:03d}': make_candidate(rng) for i in range(200)}
+    for candidate_id in candidates:
+        (tmp_path / f'{candidate_id}.txt').write_text(' '.join(rng.choice(WORDS) for _ in range(50)))
+    return tmp_path, candidates, rng
+
+
+def scores(index):
+    return {candidate_id: score for candidate_id, score, _ in index.rank(JOB, top_k=500)['results']}
+
+
+def test_warm_builds_the_index_without_a_query(corpus):
+    folder, candidates, _ = corpus
+    index = build(folder, candidates)
+    assert not index._pending
+    assert len(index) == len(candidates)
+
+
+def test_small_change_keeps_unrelated_cached_weights(corpus):
+    folder, candidates, _ = corpus
+    index = build(folder, candidates)
+    index.rank(JOB)
+    cached = set(index._weights) | set(index._dense)
+    assert 'kubernetes' in cached or 'services' in cached
+
+    index.on_change('updated', 'c000', {'current_role': 'Chef', 'skills': ['Cooking']}, candidates['c000'])
+    index.rank('chef')
+    kept = set(index._weights) | set(index._dense)
+    assert kept & (cached - {'backend', 'developer', 'chef'})
+    assert index.rank('chef')['results'][0][0] == 'c000'
+
+
+def test_incremental_updates_match_a_rebuilt_index(corpus):
+    folder, candidates, rng = corpus
+    index = build(folder, candidates)
+    index.rank(JOB)
+
+    for candidate_id in rng.sample(sorted(candidates), 4):
+        new = make_candidate(rng)
+        index.on_change('updated', candidate_id, new, candidates[candidate_id])
+        candidates[candidate_id] = new
+    removed = sorted(candidates)[-1]
+    index.on_change('removed', removed, None, candidates.pop(removed))
+
+    incremental, rebuilt = scores(index), scores(build(folder, candidates))
+    assert removed not in incremental
+    assert set(incremental) == set(rebuilt)
+    for candidate_id, score in rebuilt.items():
+        assert incremental[candidate_id] == pytest.approx(score, rel=0.1)
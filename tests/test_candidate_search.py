@@ -0,0 +1,142 @@
+import candidate_search
+from candidate_search import CandidateSearchIndex, CandidateSortIndex
+
+
+def make_index():
+    index = CandidateSearchIndex()
+    index.add('jane', {'full_name': 'Jane Doe', 'email': 'jane@acme.io', 'current_company': 'Acme',
+                       'skills': ['Python', 'React']})
+    index.add('dan', {'full_name': 'Dan Brown', 'email': 'dan@globex.com', 'current_company': 'Globex',
+                      'skills': 'Java, Docker'})
+    index.add('wei', {'full_name': 'Wei Chen', 'email': 'wei@initech.com', 'current_company': 'Initech',
+                      'skills': ['JavaScript', 'Python', 'Machine Learning']})
+    return index
+
+
+def test_short_queries_match_any_substring():
+    index = make_index()
+    assert index.search('an') == {'jane', 'dan'}
+    assert index.search('n') == {'jane', 'dan', 'wei'}
+    assert index.search('oe') == {'jane'}
+
+
+def test_trigram_queries_are_verified_substrings():
+    index = make_index()
+    assert index.search('Brow') == {'dan'}
+    assert index.search('  JANE   doe ') == {'jane'}
+    assert index.search('.com') == {'dan', 'wei'}
+    assert index.search('acme globex') == set()   # Grams from two candidates, no single match
+    assert index.search('zzz') == set()
+    assert index.search('') == {'jane', 'dan', 'wei'}
+
+
+def test_skill_prefix_and_alias_matching():
+    index = make_index()
+    assert index.match_skills(['java']) == {'dan', 'wei'}           # Java and JavaScript
+    assert index.match_skills(['java'], prefix=False) == {'dan'}
+    assert index.match_skills(['js']) == {'wei'}                    # Alias of JavaScript
+    assert index.match_skills(['mach']) == {'wei'}
+
+
+def test_skill_all_and_any_modes():
+    index = make_index()
+    assert index.match_skills(['python', 'react']) == {'jane'}
+    assert index.match_skills(['python', 'react'], mode='any') == {'jane', 'wei'}
+    assert index.match_skills(['python', 'docker']) == set()
+    assert index.match_skills(['  ']) == {'jane', 'dan', 'wei'}
+
+
+def test_incremental_add_update_and_remove():
+    index = make_index()
+    index.on_change('updated', 'dan', {'full_name': 'Dan Smith', 'skills': ['Rust']}, None)
+    assert index.search('brown') == set()
+    assert index.search('smith') == {'dan'}
+    assert index.match_skills(['docker']) == set()
+    assert index.match_skills(['rust']) == {'dan'}
+
+    index.on_change('removed', 'wei', None, None)
+    assert index.search('chen') == set()
+    assert index.match_skills(['machine learning']) == set()
+    assert index.match_skills(['python']) == {'jane'}
+    assert len(index) == 2
+    assert list(index._skill_terms.with_prefix('machine')) == []
+
+
+def sorted_index(count=30):
+    index = CandidateSortIndex()
+    for n in range(count):
+        index.on_change('added', f'c{n:02d}', {'full_name': f'Name {n:02d}', 'profile_completeness': n % 3}, None)
+    return index
+
+
+def walk(index, sort='completeness', descending=False, limit=4, allowed=None):
+    """Every page in order, following the cursor each page returns"""
+    pages, after = [], None
+    while True:
+        ids, after = index.page(sort, descending=descending, after=after, limit=limit, allowed=allowed)
+        pages.append(ids)
+        if after is None:
+            return pages
+
+
+def expected(ids, descending=False):
+    return sorted(ids, key=lambda c: (int(c[1:]) % 3, c), reverse=descending)
+
+
+def test_sort_pages_break_key_ties_by_id_in_both_directions():
+    index = sorted_index()
+    everyone = [f'c{n:02d}' for n in range(30)]
+    for descending in (False, True):
+        pages = walk(index, descending=descending)
+        assert [len(p) for p in pages] == [4] * 7 + [2]
+        assert sum(pages, []) == expected(everyone, descending)
+    assert walk(index, sort='name', limit=30) == [everyone]
+
+
+def test_small_allowed_sort_and_full_walk_return_the_same_pages():
+    index = sorted_index()
+    allowed = {f'c{n:02d}' for n in range(30) if n % 5}   # 24 matches
+    for descending in (False, True):
+        full_walk = walk(index, descending=descending, limit=1, allowed=allowed)      # 24 > 20 * limit
+        small_sort = walk(index, descending=descending, limit=2, allowed=allowed)     # 24 <= 20 * limit
+        assert sum(full_walk, []) == sum(small_sort, []) == expected(allowed, descending)
+        assert [len(p) for p in small_sort] == [2] * 12
+
+
+def test_after_cursor_resumes_after_the_entry():
+    index = sorted_index()
+    ids, last = index.page('completeness', limit=3)
+    assert ids == ['c00', 'c03', 'c06'] and last == (0, 'c06')
+    assert index.page('completeness', after=last, limit=2)[0] == ['c09', 'c12']
+    assert index.page('completeness', after=last, limit=2, allowed={'c09', 'c12', 'c01'})[0] == ['c09', 'c12']
+    assert index.page('completeness', descending=True, after=(1, 'c04'), limit=3)[0] == ['c01', 'c27', 'c24']
+    assert index.page('completeness', descending=True, after=(1, 'c04'), limit=3, allowed={'c01', 'c07'}) \
+        == (['c01'], None)
+
+
+def change(index, candidate_id, completeness):
+    index.on_change('updated', candidate_id, {'full_name': candidate_id, 'profile_completeness': completeness}, None)
+
+
+def test_changes_between_pages_are_applied_in_place(monkeypatch):
+    index = sorted_index()
+    ids, last = index.page('completeness', limit=4)
+    assert ids == ['c00', 'c03', 'c06', 'c09']
+
+    change(index, 'c12', 5)        # Moves from the next page to the end
+    change(index, 'c01', 0)        # Moves ahead of the cursor
+    index.on_change('removed', 'c15', None, None)
+    ids, last = index.page('completeness', after=last, limit=4)
+    assert ids == ['c18', 'c21', 'c24', 'c27']
+    assert sum(walk(index, descending=True, limit=30), [])[0] == 'c12'
+    assert 'c15' not in sum(walk(index), [])
+
+    # A large batch of changes re-sorts once instead of bisecting each one
+    monkeypatch.setattr(candidate_search, 'REBUILD_THRESHOLD', 3)
+    moved = [f'c{n:02d}' for n in range(20) if n != 15]
+    for candidate_id in moved:
+        change(index, candidate_id, 9)
+    assert index._rebuild['completeness']
+    pages = sum(walk(index), [])
+    assert not index._rebuild['completeness'] and not index._pending['completeness']
+    assert pages == expected([f'c{n:02d}' for n in range(20, 30)]) + moved
@@ -0,0 +1,121 @@
+import json
+import os
+import struct
+
+import pytest
+
+import candidate_snapshot
+from candidate_snapshot import MAGIC, boot_repository, read_snapshot, save_repository_snapshot, write_snapshot
+from candidate_store import CandidateRecord, CandidateRepository
+
+
+def record(candidate_id, **data):
+    data = dict(data, id=candidate_id, filename=candidate_id + '.json')
+    return CandidateRecord(candidate_id, candidate_id + '.json', 1700000000000000000 + len(candidate_id), 120, data)
+
+
+def as_dicts(records):
+    return [(r.candidate_id, r.filename, r.mtime_ns, r.size, r.data) for r in records]
+
+
+def test_columnar_round_trip_keeps_every_field(tmp_path):
+    records = [
+        record('ann', full_name='Ann Lee', current_company='Acme', current_role='Engineer',
+               skills=['Python', 'SQL'], email='ann@example.com'),
+        # Non-string interned fields and non-list skills are kept in the JSON column as-is
+        record('bob', full_name='Bøb', years_of_experience=7, education=['BSc', 'MSc'],
+               current_company=None, skills='Python, Go'),
+        record('cy', full_name='Cy', skills=['Go', 3], enrichment_status='done'),
+        record('dee', skills=[]),
+        record('eve'),
+    ]
+    path = str(tmp_path / 'snapshot.bin')
+    summary = write_snapshot(records, 'enriched_json', path)
+    assert summary['candidates'] == 5 and summary['format'] == 'columnar'
+
+    folder, loaded = read_snapshot(path)
+    assert folder == 'enriched_json'
+    assert as_dicts(loaded) == as_dicts(records)
+    assert isinstance(loaded[1].data['years_of_experience'], int)
+    assert loaded[1].data['current_company'] is None
+    # The writer works on copies of the records' data
+    assert records[0].data['current_company'] == 'Acme' and 'skills' in records[0].data
+    assert not os.path.exists(path + '.tmp')
+
+
+def test_strings_are_interned_across_candidates(tmp_path):
+    path = str(tmp_path / 'snapshot.bin')
+    write_snapshot([record('a', current_company='Acme', skills=['Python']),
+                    record('b', current_company='Acme', skills=['Python'])], 'enriched_json', path)
+    _, (a, b) = read_snapshot(path)
+    assert a.data['current_company'] is b.data['current_company']
+    assert a.data['skills'][0] is b.data['skills'][0]
+
+
+def test_empty_corpus_round_trips(tmp_path):
+    path = str(tmp_path / 'snapshot.bin')
+    write_snapshot([], 'parsed_resumes', path)
+    assert read_snapshot(path) == ('parsed_resumes', [])
+
+
+def test_version_mismatch_is_rejected_and_ignored_at_boot(tmp_path, monkeypatch):
+    path = str(tmp_path / 'snapshot.bin')
+    monkeypatch.setattr(candidate_snapshot, 'FORMAT_VERSION', 99)
+    write_snapshot([record('a')], 'enriched_json', path)
+    monkeypatch.undo()
+
+    with open(path, 'rb') as f:
+        prefix = f.read(len(MAGIC) + 4)
+        (header_length,) = struct.unpack_from('<I', prefix, len(MAGIC))
+        assert json.loads(f.read(header_length))['version'] == 99
+    with pytest.raises(ValueError, match='unsupported snapshot version 99'):
+        read_snapshot(path)
+    assert boot_repository(CandidateRepository(), path) == 0
+
+
+def test_unknown_file_is_not_a_snapshot(tmp_path):
+    path = tmp_path / 'snapshot.bin'
+    path.write_bytes(b'not a snapshot')
+    with pytest.raises(ValueError, match='not a candidate snapshot'):
+        read_snapshot(str(path))
+
+
+def write_candidate(folder, candidate_id, name):
+    with open(os.path.join(folder, candidate_id + '.json'), 'w', encoding='utf-8') as f:
+        json.dump({'full_name': name, 'skills': ['Python']}, f)
+
+
+def make_repository(tmp_path):
+    return CandidateRepository(enriched_folder=str(tmp_path / 'enriched_json'), parsed_folder=str(tmp_path / 'parsed'),
+                               resume_folder=str(tmp_path / 'resumes'), refresh_interval=3600)
+
+
+def test_boot_then_refresh_rereads_only_changed_files(tmp_path):
+    folder = tmp_path / 'enriched_json'
+    folder.mkdir()
+    for n in range(5):
+        write_candidate(str(folder), f'c{n}', f'Candidate {n}')
+    source = make_repository(tmp_path)
+    source.refresh(force=True)
+    path = str(tmp_path / 'snapshot.bin')
+    save_repository_snapshot(source, path)
+
+    write_candidate(str(folder), 'c1', 'Renamed')
+    os.utime(folder / 'c1.json', ns=(0, 0))
+    write_candidate(str(folder), 'c9', 'New')
+    os.remove(folder / 'c4.json')
+
+    repository = make_repository(tmp_path)
+    assert boot_repository(repository, path) == 5
+    assert repository._records['c0'].data['full_name'] == 'Candidate 0'
+    loaded = []
+    load = repository._load
+    repository._load = lambda folder, filename, candidate_id, stat: loaded.append(candidate_id) or load(
+        folder, filename, candidate_id, stat)
+
+    assert repository.refresh(force=True) == (1, 1, 1)
+    assert sorted(loaded) == ['c1', 'c9']
+    assert repository.get('c1')['full_name'] == 'Renamed'
+    assert sorted(c['id'] for c in repository.all()) == ['c0', 'c1', 'c2', 'c3', 'c9']
+    # A booted repository ignores a second seed
+    assert boot_repository(repository, path) == 0
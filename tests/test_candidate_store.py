@@ -0,0 +1,65 @@
+import json
+import os
+
+from candidate_store import CandidateRepository
+
+
+def write_candidate(folder, candidate_id, name):
+    with open(os.path.join(folder, candidate_id + '.json'), 'w', encoding='utf-8') as f:
+        json.dump({'full_name': name, 'skills': ['Python']}, f)
+
+
+def make_repository(tmp_path):
+    folder = tmp_path / 'enriched_json'
+    folder.mkdir()
+    # Only the test's forced refreshes rescan; readers use what is loaded
+    repository = CandidateRepository(enriched_folder=str(folder), parsed_folder=str(tmp_path / 'parsed'),
+                                     resume_folder=str(tmp_path / 'resumes'), refresh_interval=3600)
+    return str(folder), repository
+
+
+def test_refresh_swaps_in_a_new_dict_only_when_something_changed(tmp_path):
+    folder, repository = make_repository(tmp_path)
+    write_candidate(folder, 'a', 'Ann')
+    repository.refresh(force=True)
+    published = repository._records
+
+    repository.refresh(force=True)
+    assert repository._records is published
+
+    write_candidate(folder, 'b', 'Bob')
+    os.remove(os.path.join(folder, 'a.json'))
+    repository.refresh(force=True)
+    assert set(published) == {'a'}
+    assert set(repository._records) == {'b'}
+
+
+
+def test_resume_changes_swap_in_new_records_and_notify(tmp_path):
+    folder, repository = make_repository(tmp_path)
+    write_candidate(folder, 'a', 'Ann')
+    write_candidate(folder, 'b', 'Bob')
+    repository.refresh(force=True)
+    events = []
+    repository.add_listener(lambda event, candidate_id, new, old: events.append((event, candidate_id, new, old)))
+    events.clear()
+    published = repository._records
+    old_data = repository.get('a')
+
+    resumes = tmp_path / 'resumes'
+    resumes.mkdir()
+    (resumes / 'a.pdf').write_bytes(b'%PDF')
+    assert repository.refresh(force=True) == (0, 1, 0)
+
+    assert 'resume_filename' not in old_data
+    assert published['a'].data is old_data
+    assert repository.get('a')['resume_filename'] == 'a.pdf'
+    assert repository._records['b'] is published['b']
+    assert [(e, cid, new['resume_filename'], old) for e, cid, new, old in events] == [('updated', 'a', 'a.pdf', old_data)]
+
+    os.remove(resumes / 'a.pdf')
+    os.utime(resumes, ns=(0, 0))
+    events.clear()
+    repository.refresh(force=True)
+    assert 'resume_filename' not in repository.get('a')
+    assert [(e, cid) for e, cid, _, _ in events] == [('updated', 'a')]
@@ -0,0 +1,71 @@
+import threading
+
+from google.oauth2.credentials import Credentials
+
+import google_clients
+from google_clients import ClientPool, PooledHttp
+
+
+class FakeResponse(dict):
+    status = 200
+
+
+class FakeHttp:
+    """Stands in for httplib2.Http; fails if two threads use one at once"""
+    created = 0
+
+    def __init__(self, timeout=None):
+        FakeHttp.created += 1
+        self.busy = threading.Lock()
+        self.timeout = timeout
+
+    def request(self, uri, method='GET', **kwargs):
+        assert self.busy.acquire(blocking=False), 'transport shared between threads'
+        try:
+            threading.Event().wait(0.005)
+            return FakeResponse(), b'{}'
+        finally:
+            self.busy.release()
+
+    def close(self):
+        pass
+
+
+def test_pooled_http_reuses_transports_across_threads(monkeypatch):
+    monkeypatch.setattr(google_clients.httplib2, 'Http', FakeHttp)
+    FakeHttp.created = 0
+    http = PooledHttp(Credentials(token='token'), max_idle=4)
+
+    def worker():
+        for _ in range(10):
+            response, _ = http.request('https://example.com/', 'GET')
+            assert response.status == 200
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert FakeHttp.created <= 4
+    for _ in range(3):
+        http.request('https://example.com/', 'GET')
+    assert FakeHttp.created <= 4
+
+
+def test_service_is_shared_by_every_thread(workdir, monkeypatch):
+    pool = ClientPool()
+    creds = Credentials(token='token')
+    monkeypatch.setattr(pool, 'credentials', lambda *args: creds)
+    services = []
+
+    def request_thread():
+        services.append(pool.service('calendar', 'v3', [], 'token.json'))
+
+    threads = [threading.Thread(target=request_thread) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+        thread.join()
+
+    assert services[0] is services[1] is services[2]
+    assert isinstance(services[0]._http, PooledHttp)
@@ -0,0 +1,43 @@
+import threading
+
+from job_queue import JobQueue, QUEUED, SUCCEEDED
+
+
+def blocking_job(release):
+    def work(job):
+        release.wait(5)
+        return job.job_type
+    return work
+
+
+def test_shared_limit_serializes_different_job_types():
+    queue = JobQueue()
+    queue.share_limit('stages', 'parse', 'schedule')
+    release = threading.Event()
+
+    first = queue.submit('parse', blocking_job(release))
+    second = queue.submit('schedule', blocking_job(release))
+    other = queue.submit('report', lambda job: 'done')
+
+    assert other.wait(5) and other.status == SUCCEEDED
+    assert second.status == QUEUED
+    release.set()
+    assert first.wait(5) and second.wait(5)
+    assert (first.result, second.result) == ('parse', 'schedule')
+
+
+def test_shared_limit_can_be_raised():
+    queue = JobQueue()
+    queue.share_limit('stages', 'parse', 'schedule')
+    queue.set_limit('stages', 2)
+    release = threading.Event()
+
+    first = queue.submit('parse', blocking_job(release))
+    second = queue.submit('schedule', blocking_job(release))
+    for _ in range(50):
+        if second.status != QUEUED:
+            break
+        threading.Event().wait(0.01)
+    assert second.status != QUEUED
+    release.set()
+    assert first.wait(5) and second.wait(5)
@@ -0,0 +1,41 @@
+import json
+import os
+
+import linkedin_enricher
+
+
+def write_candidate(folder, filename, candidate):
+    os.makedirs(folder, exist_ok=True)
+    with open(os.path.join(folder, filename), 'w', encoding='utf-8') as f:
+        json.dump(candidate, f)
+
+
+def test_rerun_skips_candidates_whose_skills_were_canonicalized(workdir):
+    write_candidate('parsed_json', 'jane.json', {
+        'full_name': 'Jane Doe',
+        'email': 'jane@example.com',
+        'skills': ['JS', ' Javascript', 'python'],
+        'trace_id': 'trace-1'
+    })
+    write_candidate('parsed_json', 'raj.json', {
+        'full_name': 'Raj Patel',
+        'email': 'raj@example.com',
+        'skills': 'Node.js, ML',
+        'trace_id': 'trace-2'
+    })
+
+    first = linkedin_enricher.process_all_candidates()
+    assert first == {'success': 2, 'failed': 0, 'duplicates': 0}
+    with open(os.path.join('enriched_json', 'jane.json'), encoding='utf-8') as f:
+        assert json.load(f)['skills'] == ['JavaScript', 'Python']
+
+    second = linkedin_enricher.process_all_candidates()
+    assert second == {'success': 0, 'failed': 0, 'duplicates': 2}
+
+
+def test_candidate_id_is_stable_across_enrichment():
+    candidate = {'full_name': 'Jane Doe', 'email': 'jane@example.com', 'skills': 'JS, python'}
+    before = linkedin_enricher.create_candidate_id(dict(candidate))
+    enriched = linkedin_enricher.enrich_candidate(dict(candidate))
+    assert enriched['skills'] == ['JavaScript', 'Python']
+    assert linkedin_enricher.create_candidate_id(enriched) == before
@@ -0,0 +1,77 @@
+import json
+import os
+
+from near_duplicates import NearDuplicateIndex, minhash
+
+TEXT = ' '.join(f'word{i}' for i in range(300))
+
+
+def test_clear_forgets_signatures_and_the_saved_file(workdir):
+    index = NearDuplicateIndex(path='index.json')
+    index.add('jane', minhash(TEXT))
+    index.save()
+    assert index.query(minhash(TEXT))
+
+    index.clear()
+    assert not os.path.exists('index.json')
+    assert len(index) == 0
+    assert index.query(minhash(TEXT)) == []
+
+
+def parse_folder(files, monkeypatch, mode):
+    """Run the parse stage over resumes whose 'extracted' text is their file content"""
+    import parse_resumes
+    os.makedirs('resumes', exist_ok=True)
+    for filename, text in files.items():
+        with open(os.path.join('resumes', filename), 'w', encoding='utf-8') as f:
+            f.write(text)
+    extracted = []
+
+    def extract(path):
+        extracted.append(os.path.basename(path))
+        with open(path, encoding='utf-8') as f:
+            return f.read()
+
+    monkeypatch.setattr(parse_resumes, 'extract_text_from_file', extract)
+    monkeypatch.setattr(parse_resumes, 'NEAR_DUPLICATE_MODE', mode)
+    return parse_resumes.parse_all_resumes('resumes', 'parsed_text'), sorted(extracted)
+
+
+def test_skipped_near_duplicates_stay_skipped_until_the_file_changes(workdir, monkeypatch):
+    from near_duplicates import near_duplicate_index, load_near_duplicates
+    near_duplicate_index.clear()
+    edited = TEXT.replace('word150', 'changed')
+    results, extracted = parse_folder({'a.pdf': TEXT}, monkeypatch, 'skip')
+    results, extracted = parse_folder({'b.pdf': edited}, monkeypatch, 'skip')
+    assert results['near_duplicates'] == 1
+    verdict = load_near_duplicates()['b.pdf']
+    assert verdict['duplicate_of'] == 'a' and verdict['action'] == 'skipped'
+    assert not os.path.exists(os.path.join('parsed_text', 'b.txt'))
+
+    # Not re-extracted or re-counted on the next run
+    results, extracted = parse_folder({}, monkeypatch, 'skip')
+    assert extracted == ['a.pdf']
+    assert results['near_duplicates'] == 0 and results['skipped'] == 1
+
+    # A changed file is checked again; unrelated text clears the verdict
+    results, extracted = parse_folder({'b.pdf': 'a completely different resume'}, monkeypatch, 'skip')
+    assert 'b.pdf' in extracted and results['success'] == 1
+    assert load_near_duplicates() == {}
+    near_duplicate_index.clear()
+
+
+def test_flagged_near_duplicates_are_recorded_for_the_api(workdir, monkeypatch):
+    from near_duplicates import near_duplicate_index, load_near_duplicates
+    from resume_text_cache import PARSED_SOURCES_FILE, file_digest
+    near_duplicate_index.clear()
+    parse_folder({'a.pdf': TEXT}, monkeypatch, 'flag')
+    results, _ = parse_folder({'b.pdf': TEXT.replace('word150', 'changed')}, monkeypatch, 'flag')
+
+    assert results['success'] == 1 and results['near_duplicates'] == 1
+    assert os.path.exists(os.path.join('parsed_text', 'b.txt'))
+    verdict = load_near_duplicates()['b.pdf']
+    assert verdict['action'] == 'flagged' and verdict['duplicate_of'] == 'a'
+    assert verdict['source'] == file_digest(os.path.join('resumes', 'b.pdf'))
+    with open(PARSED_SOURCES_FILE, encoding='utf-8') as f:
+        assert json.load(f)['b.txt'] == verdict['source']
+    near_duplicate_index.clear()
@@ -0,0 +1,62 @@
+import os
+
+from pipeline_dag import PipelineScheduler, Stage, STATUS_OK, STATUS_SKIPPED
+
+
+def make_stages():
+    os.makedirs('inbox', exist_ok=True)
+    with open(os.path.join('inbox', 'a.txt'), 'w', encoding='utf-8') as f:
+        f.write('a')
+    return [
+        Stage('parse.py', 'Parse', inputs=('inbox',), outputs=('parsed',)),
+        Stage('schedule.py', 'Schedule', inputs=('parsed',), outputs=('booked',), skippable=False),
+    ]
+
+
+class FakeRunner:
+    def __init__(self, item_failures=None):
+        self.calls = []
+        self.item_failures = item_failures or {}
+
+    def __call__(self, script, description):
+        self.calls.append(script)
+        return {'success': True, 'item_failures': self.item_failures.get(script, 0)}
+
+
+def run(runner, stages):
+    results, schedule = PipelineScheduler(runner, stages=stages, state_file='state.json').run()
+    return {r['script']: r for r in results}, schedule
+
+
+def test_unchanged_stage_is_skipped_but_schedule_always_runs(workdir):
+    stages = make_stages()
+    run(FakeRunner(), stages)
+
+    runner = FakeRunner()
+    results, schedule = run(runner, stages)
+    assert runner.calls == ['schedule.py']
+    assert results['parse.py']['status'] == STATUS_SKIPPED
+    assert results['schedule.py']['status'] == STATUS_OK
+    assert schedule['skipped'] == ['parse.py']
+
+
+def test_stage_with_item_failures_is_not_marked_up_to_date(workdir):
+    stages = make_stages()
+    results, _ = run(FakeRunner({'parse.py': 3}), stages)
+    assert results['parse.py']['success'] is True
+    assert results['parse.py']['item_failures'] == 3
+
+    runner = FakeRunner()
+    run(runner, stages)
+    assert runner.calls == ['parse.py', 'schedule.py']
+
+    runner = FakeRunner()
+    run(runner, stages)
+    assert runner.calls == ['schedule.py']
+
+
+def test_on_result_sees_every_stage(workdir):
+    seen = []
+    PipelineScheduler(FakeRunner(), stages=make_stages(), state_file='state.json',
+                      on_result=lambda r: seen.append(r['script'])).run()
+    assert seen == ['parse.py', 'schedule.py']
@@ -0,0 +1,61 @@
+import json
+import os
+
+from resume_text_cache import ResumeTextCache, file_digest
+
+
+def write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+
+def record_source(txt_name, resume_path):
+    with open('sources.json', 'w', encoding='utf-8') as f:
+        json.dump({txt_name: file_digest(resume_path)}, f)
+
+
+def make_cache():
+    return ResumeTextCache(parsed_folder='parsed_text', cache_folder='cache', sources_file='sources.json')
+
+
+def extract(path):
+    return 'extracted ' + os.path.basename(path)
+
+
+def test_parsed_text_is_used_for_the_resume_it_came_from(workdir):
+    write('resumes/foo.pdf', 'pdf bytes')
+    write('parsed_text/foo.txt', 'parsed pdf text')
+    record_source('foo.txt', 'resumes/foo.pdf')
+
+    text, _ = make_cache().text_for('resumes/foo.pdf', extract)
+    assert text == 'parsed pdf text'
+
+
+def test_same_base_name_with_other_extension_is_extracted(workdir):
+    write('resumes/foo.pdf', 'pdf bytes')
+    write('resumes/foo.docx', 'docx bytes')
+    write('parsed_text/foo.txt', 'parsed pdf text')
+    record_source('foo.txt', 'resumes/foo.pdf')
+
+    text, _ = make_cache().text_for('resumes/foo.docx', extract)
+    assert text == 'extracted foo.docx'
+
+
+def test_replaced_upload_is_not_served_stale_text(workdir):
+    write('resumes/foo.pdf', 'old bytes')
+    write('parsed_text/foo.txt', 'old text')
+    record_source('foo.txt', 'resumes/foo.pdf')
+    write('resumes/foo.pdf', 'new bytes')
+    os.utime('parsed_text/foo.txt', (2**31, 2**31))  # Text "newer" than the replaced resume
+
+    text, _ = make_cache().text_for('resumes/foo.pdf', extract)
+    assert text == 'extracted foo.pdf'
+
+
+def test_unrecorded_parsed_text_is_ignored(workdir):
+    write('resumes/foo.pdf', 'pdf bytes')
+    write('parsed_text/foo.txt', 'text of unknown origin')
+
+    text, _ = make_cache().text_for('resumes/foo.pdf', extract)
+    assert text == 'extracted foo.pdf'
@@ -0,0 +1,111 @@
+import hashlib
+import io
+import os
+
+from werkzeug.test import EnvironBuilder
+
+import resume_uploads
+from resume_uploads import (HashingUploadStream, UploadHashIndex, UploadRequest, save_upload, save_upload_stream,
+                            INCOMING_FOLDER, UPLOAD_FOLDER)
+
+PDF_A = b'%PDF-1.4 resume A' * 100
+PDF_B = b'%PDF-1.4 resume B' * 100
+
+
+class SmallUploadRequest(UploadRequest):
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return HashingUploadStream(os.path.join(UPLOAD_FOLDER, INCOMING_FOLDER), max_size=len(PDF_A))
+
+
+def upload_request(files, request_class=UploadRequest):
+    builder = EnvironBuilder(method='POST', data={'files': [(io.BytesIO(data), name) for name, data in files]})
+    return request_class(builder.get_environ())
+
+
+def bulk_upload(files, request_class=UploadRequest):
+    """What the upload endpoint does: one refresh, then each file under the index lock"""
+    hash_index = UploadHashIndex(UPLOAD_FOLDER)
+    request = upload_request(files, request_class)
+    try:
+        with hash_index.lock:
+            hash_index.refresh()
+            return [save_upload(file, file.filename, hash_index) for file in request.files.getlist('files')]
+    finally:
+        request.close()
+
+
+def incoming():
+    return os.listdir(os.path.join(UPLOAD_FOLDER, INCOMING_FOLDER))
+
+
+def test_parts_are_hashed_while_received(workdir):
+    request = upload_request([('a.pdf', PDF_A)])
+    stream = request.files['files'].stream
+    assert isinstance(stream, HashingUploadStream)
+    assert stream.hexdigest() == hashlib.md5(PDF_A).hexdigest()
+    assert stream.size == len(PDF_A)
+    request.close()
+
+
+def test_stream_truncates_past_the_per_file_limit(tmp_path):
+    stream = HashingUploadStream(str(tmp_path), max_size=10)
+    stream.write(b'12345678')
+    assert not stream.too_large
+    assert stream.write(b'abcd') == 4   # Accepted but discarded, so the parser keeps going
+    stream.write(b'more')
+    assert stream.too_large and stream.size == 16
+    stream.seek(0)
+    assert stream.read() == b'12345678'
+
+    result = save_upload_stream(stream, 'big.pdf', UploadHashIndex(str(tmp_path)))
+    assert result == {'filename': 'big.pdf', 'file_hash': None, 'status': 'too_large', 'size': 16}
+    stream.close()
+    assert os.listdir(tmp_path) == []
+
+
+def test_oversized_part_is_rejected_without_affecting_the_rest(workdir):
+    results = bulk_upload([('big.pdf', PDF_A + b'x'), ('a.pdf', PDF_A)], SmallUploadRequest)
+    assert [r['status'] for r in results] == ['too_large', 'uploaded']
+    assert sorted(os.listdir(UPLOAD_FOLDER)) == [INCOMING_FOLDER, 'a.pdf']
+    assert incoming() == []
+
+
+def test_duplicates_within_one_bulk_request_are_rejected(workdir):
+    results = bulk_upload([('a.pdf', PDF_A), ('b.pdf', PDF_B), ('a-copy.pdf', PDF_A)])
+
+    assert [r['status'] for r in results] == ['uploaded', 'uploaded', 'duplicate']
+    assert results[2]['duplicate_of'] == 'a.pdf'
+    assert results[2]['file_hash'] == results[0]['file_hash'] == hashlib.md5(PDF_A).hexdigest()
+    assert sorted(os.listdir(UPLOAD_FOLDER)) == [INCOMING_FOLDER, 'a.pdf', 'b.pdf']
+    with open(os.path.join(UPLOAD_FOLDER, 'b.pdf'), 'rb') as f:
+        assert f.read() == PDF_B
+    assert incoming() == []
+
+    # A later request sees the stored files through the rescanned index
+    assert [r['status'] for r in bulk_upload([('again.pdf', PDF_B)])] == ['duplicate']
+
+
+def test_uncommitted_temp_files_are_removed_on_close(workdir):
+    request = upload_request([('a.pdf', PDF_A), ('b.pdf', PDF_B)])
+    assert len(request.files.getlist('files')) == len(incoming()) == 2
+    request.close()
+    assert incoming() == []
+
+
+def test_index_rehashes_only_changed_files(tmp_path, monkeypatch):
+    (tmp_path / 'a.pdf').write_bytes(PDF_A)
+    (tmp_path / 'b.pdf').write_bytes(PDF_B)
+    hashed = []
+    file_md5 = resume_uploads._file_md5
+    monkeypatch.setattr(resume_uploads, '_file_md5', lambda path: hashed.append(os.path.basename(path)) or file_md5(path))
+    index = UploadHashIndex(str(tmp_path))
+    index.refresh()
+    assert sorted(hashed) == ['a.pdf', 'b.pdf']
+
+    hashed.clear()
+    (tmp_path / 'b.pdf').write_bytes(PDF_A + b'!')
+    os.remove(tmp_path / 'a.pdf')
+    index.refresh()
+    assert hashed == ['b.pdf']
+    assert index.find(hashlib.md5(PDF_A).hexdigest()) is None
+    assert index.find(hashlib.md5(PDF_A + b'!').hexdigest()) == 'b.pdf'
@@ -0,0 +1,182 @@
+import json
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import schedule_interviews
+from schedule_interviews import (schedule_interviews_batch, load_scheduled_candidates, create_candidate_id,
+                                 allocate_panel_slots)
+
+START = datetime(2026, 1, 5, 9, 0, tzinfo=timezone.utc)
+
+
+class FakeInsert:
+    def __init__(self, body):
+        self.body = body
+
+
+class FakeEvents:
+    def insert(self, calendarId, body):
+        return FakeInsert(body)
+
+
+class FakeBatch:
+    """Stands in for BatchHttpRequest: runs each insert and calls back once per request"""
+
+    def __init__(self, service, callback):
+        self.service = service
+        self.callback = callback
+        self.requests = []
+
+    def add(self, request, request_id):
+        self.requests.append((request_id, request))
+
+    def execute(self):
+        self.service.batch_sizes.append(len(self.requests))
+        if self.service.fail_batches:
+            raise RuntimeError('batch request timed out')
+        for request_id, request in self.requests:
+            email = request.body['attendees'][0]['email']
+            if email in self.service.rejected:
+                self.callback(request_id, None, RuntimeError(f'rejected {email}'))
+            else:
+                self.callback(request_id, {'id': 'evt-' + email, 'htmlLink': 'https://calendar/' + email}, None)
+
+
+class FakeCalendarService:
+    def __init__(self, rejected=(), fail_batches=False):
+        self.rejected = set(rejected)
+        self.fail_batches = fail_batches
+        self.batch_sizes = []
+
+    def events(self):
+        return FakeEvents()
+
+    def new_batch_http_request(self, callback):
+        return FakeBatch(self, callback)
+
+
+def candidate(n, email=True):
+    data = {'full_name': f'Candidate {n}', 'skills': ['Python']}
+    if email:
+        data['email'] = f'c{n}@example.com'
+    return data
+
+
+def bookings(count):
+    return [(candidate(n), START + timedelta(minutes=30 * n)) for n in range(count)]
+
+
+def test_each_response_is_recorded_per_request(workdir):
+    result = schedule_interviews_batch(FakeCalendarService(), bookings(3))
+
+    assert [s['event_id'] for s in result['scheduled']] == [
+        'evt-c0@example.com', 'evt-c1@example.com', 'evt-c2@example.com']
+    assert result['failed'] == [] and result['skipped'] == []
+    with open(result['scheduled'][1]['record_file'], encoding='utf-8') as f:
+        record = json.load(f)
+    assert record['event_id'] == 'evt-c1@example.com'
+    assert record['start_time'] == (START + timedelta(minutes=30)).isoformat()
+    assert load_scheduled_candidates() == {create_candidate_id(c) for c, _ in bookings(3)}
+
+
+def test_partial_failure_keeps_the_other_bookings(workdir):
+    service = FakeCalendarService(rejected={'c1@example.com'})
+    result = schedule_interviews_batch(service, bookings(3))
+
+    assert [s['candidate_name'] for s in result['scheduled']] == ['Candidate 0', 'Candidate 2']
+    assert [f['candidate_name'] for f in result['failed']] == ['Candidate 1']
+    assert 'rejected c1@example.com' in result['failed'][0]['error']
+    assert load_scheduled_candidates() == {create_candidate_id(candidate(0)), create_candidate_id(candidate(2))}
+    assert len(os.listdir(schedule_interviews.SCHEDULE_LOG_FOLDER)) == 2
+
+
+def test_failed_batch_fails_only_its_own_bookings(workdir):
+    result = schedule_interviews_batch(FakeCalendarService(fail_batches=True), bookings(2))
+
+    assert result['scheduled'] == []
+    assert len(result['failed']) == 2
+    assert load_scheduled_candidates() == set()
+
+
+def test_candidates_without_email_are_skipped(workdir):
+    service = FakeCalendarService()
+    result = schedule_interviews_batch(service, [(candidate(0, email=False), START)] + bookings(2)[1:])
+
+    assert result['skipped'] == [{'candidate_name': 'Candidate 0', 'reason': 'no email'}]
+    assert [s['candidate_name'] for s in result['scheduled']] == ['Candidate 1']
+    assert service.batch_sizes == [1]
+
+
+def test_inserts_are_chunked_at_batch_size(workdir):
+    service = FakeCalendarService()
+    count = schedule_interviews.BATCH_SIZE * 2 + 7
+    result = schedule_interviews_batch(service, bookings(count))
+
+    assert service.batch_sizes == [schedule_interviews.BATCH_SIZE, schedule_interviews.BATCH_SIZE, 7]
+    assert len(result['scheduled']) == count
+
+    service = FakeCalendarService()
+    schedule_interviews_batch(service, bookings(5), batch_size=2)
+    assert service.batch_sizes == [2, 2, 1]
+
+
+class FakeFreebusyService:
+    """Answers freebusy queries from {calendar_id: [(start, end)]} busy times"""
+
+    def __init__(self, busy):
+        self.busy = busy
+        self.bodies = []
+
+    def freebusy(self):
+        return self
+
+    def query(self, body):
+        self.bodies.append(body)
+        return self
+
+    def execute(self):
+        return {'calendars': {calendar_id: {'busy': [{'start': s.isoformat(), 'end': e.isoformat()} for s, e in busy]}
+                              for calendar_id, busy in self.busy.items()}}
+
+
+def allocate(busy, count, **kwargs):
+    service = FakeFreebusyService(busy)
+    kwargs.setdefault('horizon_days', 1)
+    kwargs.setdefault('work_hours', (9, 12))
+    placed = allocate_panel_slots(service, [candidate(n) for n in range(count)], list(busy), START, **kwargs)
+    assert len(service.bodies) == 1
+    return [(c['full_name'], start.strftime('%H:%M'), panel) for c, start, panel in placed]
+
+
+def test_slots_with_fewer_free_interviewers_than_the_panel_are_skipped():
+    busy = {'a': [(START, START + timedelta(hours=2))], 'b': [(START, START + timedelta(hours=1))], 'c': []}
+    assert allocate(busy, 3, panel_size=2) == [
+        ('Candidate 0', '10:00', ['b', 'c']),
+        # Everyone is free at 11:00; b and c tie on load, so pool order picks b
+        ('Candidate 1', '11:00', ['a', 'b']),
+    ]
+
+
+def test_whole_pool_panel_waits_for_everyone():
+    busy = {'a': [(START, START + timedelta(hours=1))], 'b': [(START + timedelta(hours=1), START + timedelta(hours=2))]}
+    assert allocate(busy, 2) == [('Candidate 0', '11:00', ['a', 'b'])]
+
+
+def test_ties_break_by_pool_order_then_spread_load():
+    busy = {'a': [], 'b': [], 'c': []}
+    assert allocate(busy, 4, panel_size=1) == [
+        ('Candidate 0', '09:00', ['a']), ('Candidate 1', '09:00', ['b']), ('Candidate 2', '09:00', ['c']),
+        ('Candidate 3', '10:00', ['a']),
+    ]
+    assert allocate(busy, 3, panel_size=2) == [
+        ('Candidate 0', '09:00', ['a', 'b']),
+        ('Candidate 1', '10:00', ['c', 'a']),
+        ('Candidate 2', '11:00', ['b', 'c']),
+    ]
+
+
+def test_panel_size_larger_than_the_pool_is_rejected():
+    with pytest.raises(ValueError, match='panel_size'):
+        allocate({'a': [], 'b': []}, 1, panel_size=3)
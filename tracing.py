@@ -0,0 +1,258 @@
+# tracing.py
+import os
+import json
+import time
+import uuid
+import queue
+import atexit
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+# --------------------------
+# Configuration
+# --------------------------
+TRACE_LOG_ENV = 'PIPELINE_TRACE_LOG'          # JSON-lines log path, or "off"
+TRACE_LOG_FILE = os.path.join('logs', 'pipeline.jsonl')
+TRACE_INDEX_FILE = 'trace_index.jsonl'        # Resume -> trace ID, append-only
+LOG_QUEUE_SIZE = 10000                        # Records beyond this are dropped, never block
+
+_context = contextvars.ContextVar('trace_context', default=None)
+logger = logging.getLogger('trace')
+
+# Attributes every LogRecord has; anything else came in through `extra`
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime'}
+
+
+def new_trace_id():
+    return uuid.uuid4().hex[:16]
+
+
+def resume_key(filename):
+    """Resume, text and JSON artifacts share a base name; that is the trace index key"""
+    return os.path.splitext(os.path.basename(filename))[0]
+
+
+# --------------------------
+# JSON-lines logging
+# --------------------------
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per record: time, level, logger, message and any `extra` fields"""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'pid': record.process,
+            'msg': record.getMessage()
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TraceContextFilter(logging.Filter):
+    """Stamp records with the current span's trace ID and stage"""
+
+    def filter(self, record):
+        context = _context.get()
+        if context:
+            for key, value in context.items():
+                if not hasattr(record, key):
+                    setattr(record, key, value)
+        return True
+
+
+class DroppingQueueHandler(QueueHandler):
+    """Hands records to the writer thread; drops them when the queue is full"""
+
+    def __init__(self, q):
+        super().__init__(q)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_listener = None
+_install_lock = threading.Lock()
+
+
+def install_trace_logging(path=None):
+    """
+    Write every log record (plus span events) as JSON lines to the trace
+    log, in addition to the existing console/file handlers. Records are
+    queued and written by a background thread so callers never wait on
+    disk. Call after logging.basicConfig; safe to call more than once.
+    """
+    global _listener
+    with _install_lock:
+        if _listener is not None:
+            return
+        path = path or os.environ.get(TRACE_LOG_ENV) or TRACE_LOG_FILE
+        if path.lower() in ('0', 'off', 'false', 'none'):
+            return
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+
+        file_handler = logging.FileHandler(path, encoding='utf-8')
+        file_handler.setFormatter(JsonLinesFormatter())
+        handler = DroppingQueueHandler(queue.Queue(LOG_QUEUE_SIZE))
+        handler.addFilter(TraceContextFilter())
+
+        logging.getLogger().addHandler(handler)
+        # Span events go to the trace log only, not the console
+        logger.addHandler(handler)
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+
+        _listener = QueueListener(handler.queue, file_handler)
+        _listener.start()
+        atexit.register(_listener.stop)
+
+
+# --------------------------
+# Spans
+# --------------------------
+def log_span(stage, trace_id, started_at, seconds, **fields):
+    """Log a span that was timed by the caller (e.g. one item of a batch)"""
+    if trace_id and logger.isEnabledFor(logging.INFO):
+        fields.setdefault('status', 'ok')
+        logger.info('span %s %s', stage, fields['status'], extra=dict(
+            fields, event='span', trace_id=trace_id, stage=stage, start=round(started_at, 6),
+            duration_ms=round(seconds * 1000, 3)))
+
+
+@contextmanager
+def span(stage, trace_id, **fields):
+    """
+    Time one stage of one resume's trace. Log records emitted inside carry
+    the trace ID; the yielded dict can add fields or set 'status'.
+    """
+    token = _context.set({'trace_id': trace_id, 'stage': stage})
+    started_at = time.time()
+    started = time.perf_counter()
+    fields.setdefault('status', 'ok')
+    try:
+        yield fields
+    except Exception:
+        fields['status'] = 'error'
+        raise
+    finally:
+        _context.reset(token)
+        log_span(stage, trace_id, started_at, time.perf_counter() - started, **fields)
+
+
+def read_trace(trace_id, path=None):
+    """Span events for one trace from the trace log, oldest first"""
+    path = path or os.environ.get(TRACE_LOG_ENV) or TRACE_LOG_FILE
+    spans = []
+    if not os.path.exists(path):
+        return spans
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if trace_id not in line:
+                continue  # Cheap pre-filter before parsing
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if entry.get('event') == 'span' and entry.get('trace_id') == trace_id:
+                spans.append(entry)
+    spans.sort(key=lambda entry: entry['start'])
+    return spans
+
+
+def summarize_trace(spans):
+    """End-to-end latency from ingestion to the last stage, and the slowest stage"""
+    # Re-runs log a 'duplicate' span for resumes already processed; ignore those
+    spans = [entry for entry in spans if entry.get('status') != 'duplicate'] or spans
+    if not spans:
+        return None
+    first = spans[0]['start']
+    last = max(entry['start'] + entry['duration_ms'] / 1000 for entry in spans)
+    slowest = max(spans, key=lambda entry: entry['duration_ms'])
+    stages = {}
+    for entry in spans:
+        stages[entry['stage']] = round(stages.get(entry['stage'], 0) + entry['duration_ms'], 3)
+    return {
+        'end_to_end_seconds': round(last - first, 3),
+        'processing_ms': round(sum(stages.values()), 3),
+        'stage_ms': stages,
+        'slowest_stage': slowest['stage'],
+        'stages_seen': list(dict.fromkeys(entry['stage'] for entry in spans))
+    }
+
+
+# --------------------------
+# Trace index
+# --------------------------
+class TraceIndex:
+    """
+    Resume base name -> trace ID, assigned when a resume is ingested.
+
+    Stored as append-only JSON lines so the API (uploads) and stage
+    subprocesses can add entries concurrently without clobbering each
+    other; readers pick up new lines incrementally.
+    """
+
+    def __init__(self, path=TRACE_INDEX_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._ids = {}
+        self._offset = 0
+
+    def _load(self):
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return
+        if size < self._offset:
+            self._ids, self._offset = {}, 0  # File was replaced
+        if size == self._offset:
+            return
+        with open(self.path, 'rb') as f:
+            f.seek(self._offset)
+            data = f.read()
+        end = data.rfind(b'\n') + 1  # A writer may be mid-line
+        for line in data[:end].splitlines():
+            try:
+                entry = json.loads(line)
+                self._ids[entry['resume']] = entry['trace_id']
+            except (ValueError, KeyError, TypeError):
+                continue
+        self._offset += end
+
+    def get(self, filename):
+        with self._lock:
+            self._load()
+            return self._ids.get(resume_key(filename))
+
+    def assign(self, filename, trace_id=None, source=None):
+        """Record the trace ID for a newly ingested resume and return it"""
+        key = resume_key(filename)
+        trace_id = trace_id or new_trace_id()
+        line = json.dumps({'resume': key, 'trace_id': trace_id, 'source': source,
+                           'ts': datetime.now(timezone.utc).isoformat()}) + '\n'
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line)
+            self._ids[key] = trace_id
+        return trace_id
+
+    def ensure(self, filename, source=None):
+        """Trace ID for a resume, assigning one if it arrived untraced"""
+        return self.get(filename) or self.assign(filename, source=source)
+
+
+# Shared by every module in the process
+trace_index = TraceIndex()